@@ -1,3 +1,5 @@
+from core.email_registry import register
+
 otp_email_template = """
 Hello {full_name},
 
@@ -21,4 +23,7 @@ This link will expire in 10 minutes.
 
 Regards,
 {site_name}
-"""
\ No newline at end of file
+"""
+
+otp_email = register('otp', 'Your OTP Code', otp_email_template)
+reset_password_email = register('reset_password', 'Reset Password', reset_password_template)
@@ -0,0 +1,54 @@
+# Generated by Django 4.2.16 on 2026-10-18 12:29
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from datetime import datetime, timezone
+
+
+def copy_pending_otps(apps, schema_editor):
+    # Carry over OTPs issued before the move so nobody has to ask for a new one.
+    CustomUser = apps.get_model('accounts', 'CustomUser')
+    PendingOTP = apps.get_model('accounts', 'PendingOTP')
+    rows = []
+    for user_id, otp, metadata in CustomUser.objects.filter(
+        is_otp_verified=False, otp__isnull=False, otp_metadata__isnull=False
+    ).values_list('id', 'otp', 'otp_metadata').iterator():
+        try:
+            created_at, attempts, resends = metadata.split(':')
+            rows.append(PendingOTP(
+                user_id=user_id, otp_hash=otp, created_at=datetime.fromtimestamp(float(created_at), timezone.utc),
+                attempts=int(attempts), resends=int(resends),
+            ))
+        except ValueError:
+            continue
+    PendingOTP.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0006_customuser_current_shifts_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PendingOTP',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='+', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('otp_hash', models.CharField(max_length=128)),
+                ('created_at', models.DateTimeField()),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('resends', models.PositiveSmallIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(copy_pending_otps, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='customuser',
+            name='otp',
+        ),
+        migrations.RemoveField(
+            model_name='customuser',
+            name='otp_metadata',
+        ),
+    ]
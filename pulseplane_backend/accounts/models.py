@@ -1,8 +1,5 @@
 from django.db import models
 from django.contrib.auth.models import AbstractUser, BaseUserManager
-import random
-from django.utils import timezone
-from django.contrib.auth.hashers import make_password, check_password
 from django.core.validators import RegexValidator
 
 class UserRoles(models.TextChoices):
@@ -39,9 +36,7 @@ class CustomUser(AbstractUser):
     role = models.CharField(max_length=20, choices=UserRoles.choices, default=UserRoles.STAFF, help_text='User role')
     phone_number = models.CharField(max_length=15, blank=True, null=True, help_text='Phone number', unique=True, validators=[RegexValidator(r'^\+?\d{9,15}$')])
 
-    # OTP fields
-    otp = models.CharField(max_length=128, blank=True, null=True, help_text='Hashed OTP')
-    otp_metadata = models.CharField(max_length=50, blank=True, null=True, help_text='created_at:validations_attempts:resend_attempts')
+    # Pending OTPs live in accounts.otp's store, not on the user row.
     is_otp_verified = models.BooleanField(default=False, help_text='OTP is verified')
 
     # Company
@@ -65,72 +60,6 @@ class CustomUser(AbstractUser):
     def __str__(self):
         return self.email
     
-    def generate_otp(self):
-        otp_raw = str(random.randint(100000, 999999))
-        self.otp = make_password(otp_raw)
-        # OTP metadata => created_at:attempts:resend_attempts
-        self.otp_metadata = f'{timezone.now().timestamp()}:0:0'
-        self.save()
-        return otp_raw
-    
-    def is_otp_valid(self, otp):
-        if not self.otp or not self.otp_metadata:
-            return False
-
-        created_at, attempts, resend_attempts = self.otp_metadata.split(':')
-        created_at = float(created_at)
-        attempts = int(attempts)
-        resend_attempts = int(resend_attempts)
-
-        # Lockout logic: max 5 attempts or 10 minutes expiration
-        if attempts >= 5 or timezone.now().timestamp() > created_at + 600:
-            return False
-        
-        if self.is_otp_verified:
-            return True
-
-        if check_password(otp, self.otp):
-            # Clear OTP fields upon successful verification
-            self.otp = None
-            self.otp_metadata = None
-            self.save()
-            return True
-        else:
-            # Increment failed attempts
-            self.otp_metadata = f'{created_at}:{attempts + 1}:{resend_attempts}'
-            self.save()
-            return False
-
-    def can_resend_otp(self):
-        if not self.otp_metadata:
-            return True
-        if self.is_otp_verified:
-            return False
-        created_at, _, resend_attempts = self.otp_metadata.split(':')
-        created_at = float(created_at)
-        resend_attempts = int(resend_attempts)
-
-        if resend_attempts >= 5:
-            if timezone.now().timestamp() > created_at + 1800:
-                # Clear OTP fields upon expiration
-                self.otp = None
-                self.otp_metadata = None
-                self.save()
-                return True
-            return False
-        # Allow resending OTP only after 60 seconds
-        return timezone.now().timestamp() > created_at + 60
-    
-    def add_resend_attempt(self):
-        if not self.otp_metadata:
-            return False
-
-        created_at, attempts, resend_attempts = self.otp_metadata.split(':')
-        resend_attempts = int(resend_attempts)
-        self.otp_metadata = f'{created_at}:{attempts}:{resend_attempts + 1}'
-        self.save()
-        return True
-
     @property
     def full_name(self):
         return f'{self.first_name} {self.last_name}'
@@ -153,4 +82,12 @@ class Company(models.Model):
     branch_name = models.CharField(max_length=100, help_text='Branch name', null=True, blank=True)
 
     def __str__(self):
-        return self.name
\ No newline at end of file
+        return self.name
+
+class PendingOTP(models.Model):
+    """OTP state for deployments without a shared Redis cache (see accounts.otp)."""
+    user = models.OneToOneField(CustomUser, on_delete=models.CASCADE, primary_key=True, related_name='+')
+    otp_hash = models.CharField(max_length=128)
+    created_at = models.DateTimeField()
+    attempts = models.PositiveSmallIntegerField(default=0)
+    resends = models.PositiveSmallIntegerField(default=0)
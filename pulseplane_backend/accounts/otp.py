@@ -0,0 +1,163 @@
+"""
+One-time passwords for account verification.
+
+The pending OTP (its hash, when it was issued, failed attempts and resends)
+is kept out of the user row, which is only written once, when verification
+succeeds. OTP_STORE picks where it lives:
+- 'cache' keeps it in the shared cache under a TTL, counting attempts
+  with the cache's atomic incr. This needs Redis; a file based cache's
+  incr is not atomic.
+- 'table' keeps one PendingOTP row per user and counts attempts with
+  F() updates.
+Attempts are counted before the code is checked, so concurrent guesses
+cannot get past MAX_ATTEMPTS.
+"""
+import math
+import random
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import check_password, make_password
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from .models import PendingOTP
+
+User = get_user_model()
+
+MAX_ATTEMPTS = 5
+MAX_RESENDS = 5
+# Seconds an OTP can be used for.
+OTP_VALIDITY = 600
+# Seconds between resends, and how long resending is locked after MAX_RESENDS.
+RESEND_INTERVAL = 60
+RESEND_LOCKOUT = 1800
+
+
+@dataclass
+class OTPState:
+    otp_hash: str
+    created_at: datetime
+    attempts: int = 0
+    resends: int = 0
+
+    @property
+    def expired(self):
+        return timezone.now() > self.created_at + timedelta(seconds=OTP_VALIDITY)
+
+    @property
+    def stale(self):
+        """Old enough to be forgotten, lockout included."""
+        return timezone.now() > self.created_at + timedelta(seconds=RESEND_LOCKOUT)
+
+
+class CacheOTPStore:
+    def _keys(self, user_id):
+        return f'otp:{user_id}', f'otp:{user_id}:attempts'
+
+    def get(self, user_id):
+        state_key, attempts_key = self._keys(user_id)
+        values = cache.get_many([state_key, attempts_key])
+        if state_key not in values:
+            return None
+        otp_hash, created_at, resends = values[state_key]
+        return OTPState(otp_hash, created_at, values.get(attempts_key, MAX_ATTEMPTS), resends)
+
+    def put(self, user_id, state):
+        state_key, attempts_key = self._keys(user_id)
+        cache.set_many({
+            state_key: (state.otp_hash, state.created_at, state.resends),
+            attempts_key: state.attempts,
+        }, timeout=RESEND_LOCKOUT)
+
+    def add_attempt(self, user_id):
+        """Count a verification attempt; returns the new count, or None if there is no pending OTP."""
+        try:
+            return cache.incr(self._keys(user_id)[1])
+        except ValueError:
+            return None
+
+    def delete(self, user_id):
+        cache.delete_many(self._keys(user_id))
+
+
+class TableOTPStore:
+    def get(self, user_id):
+        row = PendingOTP.objects.filter(user_id=user_id).first()
+        if row is None:
+            return None
+        state = OTPState(row.otp_hash, row.created_at, row.attempts, row.resends)
+        if state.stale:
+            row.delete()
+            return None
+        return state
+
+    def put(self, user_id, state):
+        PendingOTP.objects.update_or_create(user_id=user_id, defaults={
+            'otp_hash': state.otp_hash, 'created_at': state.created_at,
+            'attempts': state.attempts, 'resends': state.resends,
+        })
+
+    def add_attempt(self, user_id):
+        """Count a verification attempt; returns the new count, or None if there is no pending OTP."""
+        with transaction.atomic():
+            if not PendingOTP.objects.filter(user_id=user_id).update(attempts=F('attempts') + 1):
+                return None
+            return PendingOTP.objects.filter(user_id=user_id).values_list('attempts', flat=True).get()
+
+    def delete(self, user_id):
+        PendingOTP.objects.filter(user_id=user_id).delete()
+
+
+STORES = {'cache': CacheOTPStore, 'table': TableOTPStore}
+
+
+def get_store():
+    return STORES[settings.OTP_STORE]()
+
+
+def get_state(user):
+    """The user's pending OTP, or None."""
+    return get_store().get(user.pk)
+
+
+def issue(user, resend=False):
+    """
+    Start a new OTP for the user and return the raw code. A resend counts
+    towards MAX_RESENDS; a fresh one (e.g. on registration) starts over.
+    """
+    store = get_store()
+    previous = store.get(user.pk) if resend else None
+    otp_raw = str(random.randint(100000, 999999))
+    store.put(user.pk, OTPState(make_password(otp_raw), timezone.now(), resends=previous.resends + 1 if previous else 0))
+    return otp_raw
+
+
+def verify(user, state, otp):
+    """
+    Check `otp` against the pending `state`. Returns (verified, attempts
+    left). On success the user is marked verified with a single-column
+    UPDATE and the OTP is dropped.
+    """
+    store = get_store()
+    attempts = store.add_attempt(user.pk)
+    if attempts is None or attempts > MAX_ATTEMPTS:
+        return False, 0
+    if not check_password(otp, state.otp_hash):
+        return False, MAX_ATTEMPTS - attempts
+    User.objects.filter(pk=user.pk).update(is_otp_verified=True)
+    user.is_otp_verified = True
+    store.delete(user.pk)
+    return True, MAX_ATTEMPTS - attempts
+
+
+def resend_wait(user):
+    """Seconds until the user may be sent a new OTP; 0 means now."""
+    state = get_state(user)
+    if state is None:
+        return 0
+    lock = RESEND_LOCKOUT if state.resends >= MAX_RESENDS else RESEND_INTERVAL
+    wait = (state.created_at + timedelta(seconds=lock) - timezone.now()).total_seconds()
+    return max(math.ceil(wait), 0)
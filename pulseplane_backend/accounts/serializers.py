@@ -9,8 +9,9 @@ from django.core.validators import validate_email
 from django.utils import timezone
 from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
 from django.utils.encoding import force_bytes
-from .utils import CustomPasswordResetTokenGenerator,send_reset_password_email
+from .utils import CustomPasswordResetTokenGenerator, check_set_password_token, send_reset_password_email
 from .models import UserRoles, Company
+from . import otp as otp_store
 
 User = get_user_model()
 
@@ -133,21 +134,18 @@ class VerifyOTPSerializer(serializers.Serializer):
             raise serializers.ValidationError("Invalid email.")
         if user.is_otp_verified:
             raise serializers.ValidationError("User account is already verified.")
-        if not user.otp_metadata:
+        state = otp_store.get_state(user)
+        if state is None:
             raise serializers.ValidationError("No OTP request found. Please request a new OTP.")
         # Check if OTP is Expired
-        created_at, _, _ = user.otp_metadata.split(':')
-        created_at = float(created_at)
-        if timezone.now().timestamp() > created_at + 600:
+        if state.expired:
             raise serializers.ValidationError("OTP has expired. Please request a new OTP.")
         # Check if OTP is Valid
-        if user.is_otp_valid(otp):
-            user.is_otp_verified = True
-            user.save()
+        verified, attempts_left = otp_store.verify(user, state, otp)
+        if verified:
             attrs['user'] = user
             return attrs
         else:
-            attempts_left = 5 - int(user.otp_metadata.split(':')[1]) if user.otp_metadata else 5
             responce_message = f"Invalid or expired OTP. You have {attempts_left} attempts left."
             if attempts_left == 0:
                 responce_message = "You have exceeded the maximum number of attempts. Please request a new OTP."
@@ -166,14 +164,8 @@ class SendOTPSerializer(serializers.Serializer):
             raise serializers.ValidationError("Invalid email.")
         if user.is_otp_verified:
             raise serializers.ValidationError("User account is already verified.")
-        if not user.can_resend_otp():
-            if user.otp_metadata:
-                created_at, _, _ = user.otp_metadata.split(':')
-                created_at = float(created_at)
-            else:
-                created_at = timezone.now().timestamp()
-            time_passed = timezone.now().timestamp() - created_at
-            time_left = int(max(60 - time_passed, 0))
+        time_left = otp_store.resend_wait(user)
+        if time_left:
             raise serializers.ValidationError(f"You can only request a new OTP after {time_left} seconds.")
         attrs['user'] = user
         return attrs
@@ -224,7 +216,7 @@ class ResetPasswordSerializer(serializers.Serializer):
         except (TypeError, ValueError, OverflowError, User.DoesNotExist):
             raise serializers.ValidationError("Invalid token or UIDB64.")
         attrs['user'] = user
-        if not CustomPasswordResetTokenGenerator().check_token(attrs.get('user'), token):
+        if not check_set_password_token(attrs.get('user'), token):
             raise serializers.ValidationError("Invalid, expired, or too many attempts on the token.")
         return attrs
     
@@ -249,6 +241,6 @@ class VerifyResetPasswordRequestSerializer(serializers.Serializer):
         except (TypeError, ValueError, OverflowError, User.DoesNotExist):
             raise serializers.ValidationError("Invalid token or UIDB64.")
         attrs['user'] = user
-        if not CustomPasswordResetTokenGenerator().check_token(attrs.get('user'), token):
+        if not check_set_password_token(attrs.get('user'), token):
             raise serializers.ValidationError("Invalid, expired, or too many attempts on the token.")
         return attrs
\ No newline at end of file
@@ -0,0 +1,66 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from accounts import otp
+from core.benchmarks import seed_company
+
+User = get_user_model()
+
+# OTPs are stored hashed; the default hasher would make up most of the run time.
+FAST_HASHER = ['django.contrib.auth.hashers.MD5PasswordHasher']
+LOCMEM = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'otp-tests'}}
+
+
+class VerifyTests:
+    """Run against each store by the subclasses below."""
+
+    def setUp(self):
+        _, _, staff_ids = seed_company(1, name='OTP Co')
+        User.objects.filter(id__in=staff_ids).update(is_otp_verified=False)
+        self.user = User.objects.get(id=staff_ids[0])
+        self.code = otp.issue(self.user)
+
+    def verify(self, code):
+        return otp.verify(self.user, otp.get_state(self.user), code)
+
+    def wrong(self):
+        return '000000' if self.code != '000000' else '111111'
+
+    def test_correct_code_verifies_and_drops_the_otp(self):
+        self.assertEqual(self.verify(self.code), (True, otp.MAX_ATTEMPTS - 1))
+
+        self.assertTrue(User.objects.get(pk=self.user.pk).is_otp_verified)
+        self.assertIsNone(otp.get_state(self.user))
+
+    def test_wrong_code_does_not_write_the_user_row(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.verify(self.wrong()), (False, otp.MAX_ATTEMPTS - 1))
+
+        self.assertFalse([query for query in queries if query['sql'].startswith('UPDATE "accounts_customuser"')])
+        self.assertFalse(User.objects.get(pk=self.user.pk).is_otp_verified)
+
+    def test_correct_code_fails_once_attempts_are_used_up(self):
+        for _ in range(otp.MAX_ATTEMPTS):
+            self.verify(self.wrong())
+
+        self.assertEqual(self.verify(self.code), (False, 0))
+        self.assertFalse(User.objects.get(pk=self.user.pk).is_otp_verified)
+
+    def test_resend_keeps_count_and_waits_out_the_interval(self):
+        self.assertGreater(otp.resend_wait(self.user), 0)
+
+        otp.issue(self.user, resend=True)
+
+        self.assertEqual(otp.get_state(self.user).resends, 1)
+
+
+@override_settings(OTP_STORE='table', PASSWORD_HASHERS=FAST_HASHER)
+class TableStoreVerifyTests(VerifyTests, TestCase):
+    pass
+
+
+@override_settings(OTP_STORE='cache', CACHES=LOCMEM, PASSWORD_HASHERS=FAST_HASHER)
+class CacheStoreVerifyTests(VerifyTests, TestCase):
+    def tearDown(self):
+        otp.get_store().delete(self.user.pk)
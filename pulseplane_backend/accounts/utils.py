@@ -1,10 +1,11 @@
-from django.core.mail import EmailMessage
 from django.conf import settings
-import threading
 from django.contrib.auth import get_user_model
-from .email_templates import reset_password_template, otp_email_template
+from .email_templates import reset_password_email, otp_email
 from django.contrib.auth.tokens import PasswordResetTokenGenerator
 from django.utils import timezone
+from django.utils.crypto import constant_time_compare
+from django.utils.http import base36_to_int
+from core.outbox import enqueue, enqueue_messages
 
 User = get_user_model()
 
@@ -30,43 +31,55 @@ class CustomPasswordResetTokenGenerator(PasswordResetTokenGenerator):
                 return False
         return super().check_token(user, token)
 
-class EmailThread(threading.Thread):
-    def __init__(self, email):
-        self.email = email
-        threading.Thread.__init__(self)
+class OnboardingTokenGenerator(PasswordResetTokenGenerator):
+    """
+    Set-password links in the onboarding email. That email goes through the
+    outbox and may wait out its retries, so these links live for
+    ONBOARDING_LINK_TIMEOUT instead of PASSWORD_RESET_TIMEOUT. Their own salt
+    keeps either kind of token from being accepted as the other.
+    """
+    key_salt = 'accounts.utils.OnboardingTokenGenerator'
 
-    def run(self):
-        self.email.send(fail_silently=True)
+    def check_token(self, user, token):
+        if not (user and token):
+            return False
+        try:
+            ts = base36_to_int(token.split('-')[0])
+        except ValueError:
+            return False
+        if self._num_seconds(self._now()) - ts > settings.ONBOARDING_LINK_TIMEOUT:
+            return False
+        return any(
+            constant_time_compare(self._make_token_with_timestamp(user, ts, secret), token)
+            for secret in [self.secret, *self.secret_fallbacks]
+        )
+
+def check_set_password_token(user, token):
+    """Whether `token` is a valid password reset or onboarding link token for the user."""
+    return CustomPasswordResetTokenGenerator().check_token(user, token) or OnboardingTokenGenerator().check_token(user, token)
 
 def send_email(subject, message, recipient_list, content_subtype =None):
-    from_email = settings.DEFAULT_FROM_EMAIL
-    email = EmailMessage(
-        subject, 
-        message, 
-        from_email, 
-        recipient_list
+    enqueue(
+        subject,
+        message,
+        recipient_list,
+        content_subtype=content_subtype if content_subtype in ['html', 'plain'] else 'plain'
     )
-    if content_subtype in ['html', 'plain']:
-        email.content_subtype = content_subtype
-    EmailThread(email).start()
 
 def send_otp_email(user, otp):
-    subject = 'Your OTP Code'
-    message = otp_email_template.format(
+    message = otp_email.message(
+        user.email,
         full_name=user.full_name,
         otp=otp,
         site_name=settings.SITE_NAME
     )
-    from_email = settings.DEFAULT_FROM_EMAIL
-    recipient_list = [user.email]
-    send_email(subject, message, recipient_list, content_subtype='plain')
+    enqueue_messages([message])
 
 def send_reset_password_email(user, uidb64, token):
-    subject = 'Reset Password'
-    message = reset_password_template.format(
+    message = reset_password_email.message(
+        user.email,
         full_name=user.full_name,
         reset_password_url=f'{settings.FRONTEND_URL}/reset-password/{uidb64}/{token}',
         site_name=settings.SITE_NAME
     )
-    recipient_list = [user.email]
-    send_email(subject, message, recipient_list, content_subtype='plain')
\ No newline at end of file
+    enqueue_messages([message])
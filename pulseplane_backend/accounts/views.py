@@ -14,6 +14,7 @@ from .serializers import (
 )
 from rest_framework.exceptions import ValidationError, PermissionDenied
 from .utils import send_otp_email
+from . import otp as otp_store
 
 User = get_user_model()
 
@@ -35,7 +36,7 @@ class RegisterView(generics.CreateAPIView):
         return Response(serializer.data, status=201, headers=headers)
     
     def perform_otp_generation(self, user):
-        otp_raw = user.generate_otp()
+        otp_raw = otp_store.issue(user)
         try:
             send_otp_email(user, otp_raw)
         except Exception:
@@ -78,16 +79,17 @@ class SendOTPView(generics.GenericAPIView):
         except ValidationError as exc:
             return Response({"errors": exc.detail}, status=exc.status_code)
         user = serializer.validated_data.get('user')
-        otp_raw = user.generate_otp()
+        otp_raw = otp_store.issue(user, resend=True)
         try:
             send_otp_email(user, otp_raw)
         except Exception:
             raise ValidationError({"detail": "Failed to send OTP email."})
+        state = otp_store.get_state(user)
         responce_data = {
             "data": {
                 "email": user.email,
-                "resend_otp": "Available after 60 seconds.",
-                "resend_attempts_left": 4 - int(user.otp_metadata.split(':')[2]) if user.otp_metadata else 0
+                "resend_otp": f"Available after {otp_store.RESEND_INTERVAL} seconds.",
+                "resend_attempts_left": otp_store.MAX_RESENDS - state.resends if state else 0
             },
             "detail": "OTP resent successfully."
         }
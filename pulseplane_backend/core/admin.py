@@ -1,3 +1,13 @@
 from django.contrib import admin
+from .models import OutboxEmail, NotificationEvent
 
-# Register your models here.
+
+class OutboxEmailAdmin(admin.ModelAdmin):
+    # Bodies hold one-time links and codes, so they are not shown.
+    exclude = ('body', 'html_body')
+    list_display = ['subject', 'status', 'attempts', 'next_attempt_at', 'created_at', 'sent_at']
+    list_filter = ['status']
+
+
+admin.site.register(OutboxEmail, OutboxEmailAdmin)
+admin.site.register(NotificationEvent)
@@ -0,0 +1,97 @@
+from django.db import models
+
+
+class Metric:
+    """
+    A named aggregate over a queryset. `filter` is a Q object applied with the
+    aggregate's FILTER clause (CASE WHEN on databases without it), so several
+    differently-filtered metrics can share one scan of the same rows.
+    """
+    function = None
+
+    def __init__(self, name, expression='id', filter=None, distinct=False, default=None, output_field=None):
+        self.name = name
+        self.expression = expression
+        self.filter = filter
+        self.distinct = distinct
+        self.default = default
+        self.output_field = output_field
+
+    def as_aggregate(self):
+        kwargs = {'filter': self.filter}
+        if self.distinct:
+            kwargs['distinct'] = True
+        if self.output_field is not None:
+            kwargs['output_field'] = self.output_field
+        return self.function(self.expression, **kwargs)
+
+    def resolve(self, row):
+        value = row.get(self.name)
+        return self.default if value is None else value
+
+
+class CountMetric(Metric):
+    function = models.Count
+
+    def __init__(self, name, expression='id', **kwargs):
+        kwargs.setdefault('default', 0)
+        super().__init__(name, expression, **kwargs)
+
+
+class SumMetric(Metric):
+    function = models.Sum
+
+    def __init__(self, name, expression, **kwargs):
+        kwargs.setdefault('default', 0)
+        super().__init__(name, expression, **kwargs)
+
+
+class AvgMetric(Metric):
+    function = models.Avg
+
+
+class RatioMetric:
+    """Derived from two other metrics of the same statement; costs no extra SQL."""
+
+    def __init__(self, name, numerator, denominator, default=0):
+        self.name = name
+        self.numerator = numerator
+        self.denominator = denominator
+        self.default = default
+
+    def resolve(self, row):
+        denominator = row.get(self.denominator)
+        if not denominator:
+            return self.default
+        return (row.get(self.numerator) or 0) / denominator
+
+
+def _split(metrics):
+    names = [metric.name for metric in metrics]
+    if len(names) != len(set(names)):
+        raise ValueError('Metric names must be unique.')
+    return {metric.name: metric.as_aggregate() for metric in metrics if isinstance(metric, Metric)}
+
+
+def _resolve(row, metrics):
+    # Base metrics first so ratios see their defaults applied.
+    result = dict(row)
+    for metric in metrics:
+        if isinstance(metric, Metric):
+            result[metric.name] = metric.resolve(row)
+    for metric in metrics:
+        if isinstance(metric, RatioMetric):
+            result[metric.name] = metric.resolve(result)
+    return result
+
+
+def aggregate_metrics(queryset, metrics):
+    """Evaluate a list of metrics over a queryset in a single SELECT and return a dict keyed by metric name."""
+    row = queryset.aggregate(**_split(metrics))
+    return _resolve(row, metrics)
+
+
+def grouped_metrics(queryset, group_by, metrics):
+    """Evaluate metrics per group in a single GROUP BY query. Returns a list of dicts with the group fields."""
+    rows = queryset.values(*group_by).annotate(**_split(metrics)).order_by(*group_by)
+    return [_resolve(row, metrics) for row in rows]
@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+
+
+# `core/apps/` holds the scheduling and employee sub-apps, which shadows a
+# sibling `core/apps.py` module, so the config for `core` itself lives here.
+class CoreConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'core'
+
+    def ready(self):
+        from core import signals  # noqa: F401
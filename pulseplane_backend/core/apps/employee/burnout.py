@@ -0,0 +1,181 @@
+"""
+Batch burnout-risk scoring. A company's whole wellness history is pulled in
+one query into NumPy column arrays and every employee is scored at once with
+grouped reductions (np.bincount), so the cost is a handful of array passes
+regardless of team size.
+"""
+from datetime import timedelta
+import numpy as np
+from django.db import transaction
+from django.utils import timezone
+from .models import WellnessCheck, BurnoutRiskScore
+
+HISTORY_DAYS = 365
+RECENT_DAYS = 14
+TREND_DAYS = 30
+
+# Weights of the standardized signals in the raw risk score. Higher stress and
+# falling mood/sleep/balance all push the score up.
+WEIGHTS = {
+    'stress': 1.0,
+    'mood': 0.8,
+    'work_life_balance': 0.6,
+    'sleep': 0.4,
+    'stress_slope': 0.6,
+    'mood_slope': 0.6,
+    'mood_drop': 0.5,
+}
+# The raw score is scaled by the weight norm before the logistic, so an
+# employee who is average on every signal scores 50.
+MEDIUM_RISK = 65
+HIGH_RISK = 80
+
+
+def load_history(company_id, today):
+    """Return the company's checks as column arrays, with `day` as the offset of each check from today (0 = today)."""
+    rows = list(
+        WellnessCheck.objects.filter(
+            user__company_id=company_id,
+            date__gte=today - timedelta(days=HISTORY_DAYS),
+        ).order_by().values_list('user_id', 'date', 'mood', 'stress_level', 'sleep_hours', 'work_life_balance')
+    )
+    if not rows:
+        return None
+    user_ids, dates, mood, stress, sleep, wlb = zip(*rows)
+    days = (np.array(dates, dtype='datetime64[D]') - np.datetime64(today, 'D')).astype(np.int64)
+    return {
+        'user_id': np.array(user_ids, dtype=np.int64),
+        'day': days,
+        'mood': np.array(mood, dtype=np.float64),
+        'stress': np.array(stress, dtype=np.float64),
+        'sleep': np.array([np.nan if value is None else float(value) for value in sleep], dtype=np.float64),
+        'work_life_balance': np.array(wlb, dtype=np.float64),
+    }
+
+
+def _group_mean(groups, values, mask, size):
+    """Per-group mean of values where mask holds; NaN for groups without data."""
+    mask = mask & ~np.isnan(values)
+    counts = np.bincount(groups, weights=mask, minlength=size)
+    sums = np.bincount(groups, weights=np.where(mask, values, 0), minlength=size)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(counts > 0, sums / counts, np.nan)
+
+
+def _group_slope(groups, x, y, mask, size):
+    """Per-group least-squares slope of y over x; 0 where it is undefined."""
+    w = mask.astype(np.float64)
+    n = np.bincount(groups, weights=w, minlength=size)
+    sx = np.bincount(groups, weights=w * x, minlength=size)
+    sy = np.bincount(groups, weights=w * y, minlength=size)
+    sxx = np.bincount(groups, weights=w * x * x, minlength=size)
+    sxy = np.bincount(groups, weights=w * x * y, minlength=size)
+    denominator = n * sxx - sx * sx
+    with np.errstate(invalid='ignore', divide='ignore'):
+        slope = (n * sxy - sx * sy) / denominator
+    return np.where((n >= 2) & (denominator != 0), slope, 0.0)
+
+
+def _zscore(values):
+    """Standardize across employees, treating missing values as average."""
+    valid = ~np.isnan(values)
+    if valid.sum() < 2:
+        return np.zeros_like(values)
+    mean = values[valid].mean()
+    std = values[valid].std()
+    if std == 0:
+        return np.zeros_like(values)
+    return np.where(valid, (values - mean) / std, 0.0)
+
+
+def score_history(history):
+    """Score every employee in the history arrays. Returns (user ids, dict of per-user metric arrays)."""
+    users, groups = np.unique(history['user_id'], return_inverse=True)
+    size = len(users)
+    day = history['day']
+    recent = day > -RECENT_DAYS
+    trend = day > -TREND_DAYS
+    baseline = ~recent
+
+    metrics = {
+        'recent_mood': _group_mean(groups, history['mood'], recent, size),
+        'recent_stress': _group_mean(groups, history['stress'], recent, size),
+        'recent_sleep': _group_mean(groups, history['sleep'], recent, size),
+        'recent_work_life_balance': _group_mean(groups, history['work_life_balance'], recent, size),
+        'mood_slope': _group_slope(groups, day.astype(np.float64), history['mood'], trend, size),
+        'stress_slope': _group_slope(groups, day.astype(np.float64), history['stress'], trend, size),
+        'check_count': np.bincount(groups, minlength=size),
+    }
+    baseline_mood = _group_mean(groups, history['mood'], baseline, size)
+    mood_drop = np.nan_to_num(baseline_mood - metrics['recent_mood'])
+
+    metrics['stress_zscore'] = _zscore(metrics['recent_stress'])
+    raw = (
+        WEIGHTS['stress'] * metrics['stress_zscore']
+        - WEIGHTS['mood'] * _zscore(metrics['recent_mood'])
+        - WEIGHTS['work_life_balance'] * _zscore(metrics['recent_work_life_balance'])
+        - WEIGHTS['sleep'] * _zscore(metrics['recent_sleep'])
+        + WEIGHTS['stress_slope'] * _zscore(metrics['stress_slope'])
+        - WEIGHTS['mood_slope'] * _zscore(metrics['mood_slope'])
+        + WEIGHTS['mood_drop'] * _zscore(mood_drop)
+    )
+    raw /= np.sqrt(sum(weight ** 2 for weight in WEIGHTS.values()))
+    metrics['score'] = 100 / (1 + np.exp(-raw))
+    return users, metrics
+
+
+def _level(score):
+    if score >= HIGH_RISK:
+        return 'high'
+    if score >= MEDIUM_RISK:
+        return 'medium'
+    return 'low'
+
+
+def _float_or_none(value):
+    return None if np.isnan(value) else round(float(value), 3)
+
+
+def score_company(company_id, today=None):
+    """
+    Recompute and persist the burnout risk of every employee of a company.
+    Scores of employees with no checks in the history window are deleted.
+    Returns the number of scores written.
+    """
+    today = today or timezone.localdate()
+    history = load_history(company_id, today)
+    if history is None:
+        BurnoutRiskScore.objects.filter(user__company_id=company_id).delete()
+        return 0
+    users, metrics = score_history(history)
+    now = timezone.now()
+    scores = [
+        BurnoutRiskScore(
+            user_id=int(user_id),
+            score=round(float(metrics['score'][i]), 2),
+            level=_level(metrics['score'][i]),
+            recent_mood=_float_or_none(metrics['recent_mood'][i]),
+            recent_stress=_float_or_none(metrics['recent_stress'][i]),
+            recent_sleep=_float_or_none(metrics['recent_sleep'][i]),
+            recent_work_life_balance=_float_or_none(metrics['recent_work_life_balance'][i]),
+            mood_slope=round(float(metrics['mood_slope'][i]), 4),
+            stress_slope=round(float(metrics['stress_slope'][i]), 4),
+            stress_zscore=round(float(metrics['stress_zscore'][i]), 3),
+            check_count=int(metrics['check_count'][i]),
+            computed_at=now,
+        )
+        for i, user_id in enumerate(users)
+    ]
+    with transaction.atomic():
+        BurnoutRiskScore.objects.filter(user__company_id=company_id).exclude(user_id__in=users.tolist()).delete()
+        BurnoutRiskScore.objects.bulk_create(
+            scores,
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=['user'],
+            update_fields=[
+                'score', 'level', 'recent_mood', 'recent_stress', 'recent_sleep', 'recent_work_life_balance',
+                'mood_slope', 'stress_slope', 'stress_zscore', 'check_count', 'computed_at',
+            ],
+        )
+    return len(scores)
@@ -1,3 +1,5 @@
+from core.email_registry import register
+
 leave_approve_template = """
 Hello {full_name},
 
@@ -5,4 +7,6 @@ Your leave request on {date} has been approved.
 
 Thanks,
 {site_name}
-"""
\ No newline at end of file
+"""
+
+leave_approve_email = register('leave_approve', 'Leave Approved on {site_name}', leave_approve_template)
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from core.apps.employee.recognition import rebuild_leaderboard
+
+
+class Command(BaseCommand):
+    help = 'Recompute the all-time, monthly and weekly recognition leaderboards from the awards table.'
+
+    def handle(self, *args, **options):
+        rebuilt = rebuild_leaderboard()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {rebuilt} leaderboard entries.'))
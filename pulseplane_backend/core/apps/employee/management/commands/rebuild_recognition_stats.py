@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from core.apps.employee.recognition import rebuild_all_stats
+
+
+class Command(BaseCommand):
+    help = 'Recompute the denormalized recognition counters from the awards table.'
+
+    def handle(self, *args, **options):
+        rebuilt = rebuild_all_stats()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt recognition stats for {rebuilt} users.'))
@@ -0,0 +1,21 @@
+import time
+from django.core.management.base import BaseCommand
+from accounts.models import Company
+from core.apps.employee.burnout import score_company
+
+
+class Command(BaseCommand):
+    help = 'Recompute burnout risk scores from wellness history (run nightly).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--company', type=int, help='Only score this company id')
+
+    def handle(self, *args, **options):
+        companies = Company.objects.all()
+        if options['company']:
+            companies = companies.filter(id=options['company'])
+        for company in companies:
+            started = time.perf_counter()
+            scored = score_company(company.id)
+            self.stdout.write(f'{company}: scored {scored} employees in {time.perf_counter() - started:.2f}s')
+        self.stdout.write(self.style.SUCCESS('Burnout risk scores updated.'))
@@ -0,0 +1,20 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from core.apps.employee.wellness import expire_windows, rebuild_summaries
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Nightly sweep: move every rolling wellness window forward and drop the checks that expired.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rebuild', action='store_true', help='Recompute all summaries from the raw checks instead')
+
+    def handle(self, *args, **options):
+        if options['rebuild']:
+            rebuild_summaries(User.objects.all())
+            self.stdout.write(self.style.SUCCESS('Rebuilt all wellness summaries.'))
+            return
+        swept = expire_windows()
+        self.stdout.write(self.style.SUCCESS(f'Moved {swept} wellness windows forward.'))
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.16 on 2026-10-18 11:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employee', '0004_recognitionbadge_recognitionaward_wellnesscheck'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='leavemanagement',
+            index=models.Index(fields=['date', 'approved'], name='employee_le_date_cbe676_idx'),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 4.2.16 on 2026-10-18 11:52
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from datetime import timedelta
+from django.utils import timezone
+
+
+def seed_summaries(apps, schema_editor):
+    WellnessCheck = apps.get_model('employee', 'WellnessCheck')
+    WellnessRollingSummary = apps.get_model('employee', 'WellnessRollingSummary')
+    start = timezone.localdate() - timedelta(days=30)
+    rows = WellnessCheck.objects.filter(date__gte=start).values('user').annotate(
+        check_count=models.Count('id'),
+        mood_sum=models.Sum('mood'),
+        stress_level_sum=models.Sum('stress_level'),
+        work_life_balance_sum=models.Sum('work_life_balance'),
+    ).order_by('user')
+    WellnessRollingSummary.objects.bulk_create([
+        WellnessRollingSummary(
+            user_id=row['user'],
+            window_start=start,
+            check_count=row['check_count'],
+            mood_sum=row['mood_sum'],
+            stress_level_sum=row['stress_level_sum'],
+            work_life_balance_sum=row['work_life_balance_sum'],
+        )
+        for row in rows
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('employee', '0005_leavemanagement_employee_le_date_cbe676_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WellnessRollingSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('window_start', models.DateField()),
+                ('mood_sum', models.IntegerField(default=0)),
+                ('stress_level_sum', models.IntegerField(default=0)),
+                ('work_life_balance_sum', models.IntegerField(default=0)),
+                ('check_count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='wellness_summary', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.RunPython(seed_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.16 on 2026-10-18 11:53
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('employee', '0006_wellnessrollingsummary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BurnoutRiskScore',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField(help_text='0-100, higher is more at risk')),
+                ('level', models.CharField(choices=[('low', 'Low'), ('medium', 'Medium'), ('high', 'High')], max_length=10)),
+                ('recent_mood', models.FloatField(blank=True, null=True)),
+                ('recent_stress', models.FloatField(blank=True, null=True)),
+                ('recent_sleep', models.FloatField(blank=True, null=True)),
+                ('recent_work_life_balance', models.FloatField(blank=True, null=True)),
+                ('mood_slope', models.FloatField(default=0, help_text='Change in mood per day over the trend window')),
+                ('stress_slope', models.FloatField(default=0, help_text='Change in stress per day over the trend window')),
+                ('stress_zscore', models.FloatField(default=0, help_text='Recent stress relative to the rest of the company')),
+                ('check_count', models.IntegerField(default=0)),
+                ('computed_at', models.DateTimeField()),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='burnout_risk', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-score'],
+            },
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 4.2.16 on 2026-10-18 11:55
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def seed_stats(apps, schema_editor):
+    RecognitionAward = apps.get_model('employee', 'RecognitionAward')
+    RecognitionStats = apps.get_model('employee', 'RecognitionStats')
+    rows = {}
+    received = RecognitionAward.objects.values('recipient').annotate(
+        received_count=models.Count('id'), total_points=models.Sum('badge__points')
+    ).order_by()
+    for row in received:
+        rows.setdefault(row['recipient'], {}).update(
+            received_count=row['received_count'], total_points=row['total_points'] or 0
+        )
+    for row in RecognitionAward.objects.values('giver').annotate(given_count=models.Count('id')).order_by():
+        rows.setdefault(row['giver'], {})['given_count'] = row['given_count']
+    RecognitionStats.objects.bulk_create(
+        [RecognitionStats(user_id=user_id, **values) for user_id, values in rows.items()],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('employee', '0007_burnoutriskscore'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecognitionStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_points', models.IntegerField(default=0)),
+                ('received_count', models.IntegerField(default=0)),
+                ('given_count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='recognition_stats', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.RunPython(seed_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 4.2.16 on 2026-10-18 11:55
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from datetime import date, timedelta
+
+
+def period_start(period, day):
+    if period == 'week':
+        return day - timedelta(days=day.weekday())
+    if period == 'month':
+        return day.replace(day=1)
+    return date(1970, 1, 1)
+
+
+def seed_leaderboard(apps, schema_editor):
+    RecognitionAward = apps.get_model('employee', 'RecognitionAward')
+    RecognitionLeaderboardEntry = apps.get_model('employee', 'RecognitionLeaderboardEntry')
+    daily = RecognitionAward.objects.filter(recipient__company__isnull=False).values(
+        'recipient__company', 'recipient', 'created_at__date'
+    ).annotate(points=models.Sum('badge__points'), award_count=models.Count('id')).order_by()
+    totals = {}
+    for row in daily:
+        for period in ('all', 'month', 'week'):
+            key = (row['recipient__company'], row['recipient'], period, period_start(period, row['created_at__date']))
+            points, count = totals.get(key, (0, 0))
+            totals[key] = (points + (row['points'] or 0), count + row['award_count'])
+    RecognitionLeaderboardEntry.objects.bulk_create([
+        RecognitionLeaderboardEntry(
+            company_id=company_id, user_id=user_id, period=period, period_start=start,
+            points=points, award_count=count,
+        )
+        for (company_id, user_id, period, start), (points, count) in totals.items()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0006_customuser_current_shifts_count'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('employee', '0008_recognitionstats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecognitionLeaderboardEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('all', 'All time'), ('month', 'Monthly'), ('week', 'Weekly')], max_length=10)),
+                ('period_start', models.DateField()),
+                ('points', models.IntegerField(default=0)),
+                ('award_count', models.IntegerField(default=0)),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recognition_leaderboard', to='accounts.company')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard_entries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['company', 'period', 'period_start', '-points'], name='employee_re_company_b72cd0_idx')],
+                'unique_together': {('company', 'period', 'period_start', 'user')},
+            },
+        ),
+        migrations.RunPython(seed_leaderboard, migrations.RunPython.noop),
+    ]
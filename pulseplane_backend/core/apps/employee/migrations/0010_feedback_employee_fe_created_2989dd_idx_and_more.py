@@ -0,0 +1,21 @@
+# Generated by Django 4.2.16 on 2026-10-18 11:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employee', '0009_recognitionleaderboardentry'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='feedback',
+            index=models.Index(fields=['-created_at', '-id'], name='employee_fe_created_2989dd_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recognitionaward',
+            index=models.Index(fields=['-created_at', '-id'], name='employee_re_created_0ae9a4_idx'),
+        ),
+    ]
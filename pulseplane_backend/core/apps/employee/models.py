@@ -12,6 +12,9 @@ class LeaveManagement(models.Model):
 
     class Meta:
         unique_together = ['user', 'date']
+        indexes = [
+            models.Index(fields=['date', 'approved']),
+        ]
 
     def __str__(self):
         return f"Leave: {self.user.email} on {self.date}"
@@ -21,6 +24,11 @@ class Feedback(models.Model):
     feedback = models.IntegerField()
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['-created_at', '-id']),
+        ]
+
     def __str__(self):
         return f"Feedback: {self.user.email}"
 
@@ -75,6 +83,9 @@ class RecognitionAward(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at', '-id']),
+        ]
     
     def __str__(self):
         return f"{self.giver.full_name} recognized {self.recipient.full_name} with {self.badge.name}"
@@ -84,4 +95,85 @@ class RecognitionAward(models.Model):
         if self.recipient == self.giver:
             raise models.ValidationError("You cannot give yourself a recognition award.")
             
-        super().save(*args, **kwargs)
\ No newline at end of file
+        super().save(*args, **kwargs)
+
+class WellnessRollingSummary(models.Model):
+    """Running sums of a user's wellness checks dated on or after window_start."""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='wellness_summary')
+    window_start = models.DateField()
+    mood_sum = models.IntegerField(default=0)
+    stress_level_sum = models.IntegerField(default=0)
+    work_life_balance_sum = models.IntegerField(default=0)
+    check_count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Wellness Summary: {self.user.email} since {self.window_start}"
+
+
+class BurnoutRiskScore(models.Model):
+    LEVEL_CHOICES = [
+        ('low', 'Low'),
+        ('medium', 'Medium'),
+        ('high', 'High')
+    ]
+
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='burnout_risk')
+    score = models.FloatField(help_text="0-100, higher is more at risk")
+    level = models.CharField(max_length=10, choices=LEVEL_CHOICES)
+    recent_mood = models.FloatField(null=True, blank=True)
+    recent_stress = models.FloatField(null=True, blank=True)
+    recent_sleep = models.FloatField(null=True, blank=True)
+    recent_work_life_balance = models.FloatField(null=True, blank=True)
+    mood_slope = models.FloatField(default=0, help_text="Change in mood per day over the trend window")
+    stress_slope = models.FloatField(default=0, help_text="Change in stress per day over the trend window")
+    stress_zscore = models.FloatField(default=0, help_text="Recent stress relative to the rest of the company")
+    check_count = models.IntegerField(default=0)
+    computed_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ['-score']
+
+    def __str__(self):
+        return f"Burnout Risk: {self.user.email} {self.score:.0f}"
+
+
+class RecognitionStats(models.Model):
+    """Denormalized recognition counters, kept in step with RecognitionAward inserts and deletes."""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='recognition_stats')
+    total_points = models.IntegerField(default=0)
+    received_count = models.IntegerField(default=0)
+    given_count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Recognition Stats: {self.user.email}"
+
+
+class RecognitionLeaderboardEntry(models.Model):
+    """
+    Points a user collected in one leaderboard window. Rows are incremented
+    as awards arrive, and the (company, period, period_start, points) index
+    serves top-N reads and rank counts without sorting all awards.
+    """
+    PERIOD_CHOICES = [
+        ('all', 'All time'),
+        ('month', 'Monthly'),
+        ('week', 'Weekly')
+    ]
+
+    company = models.ForeignKey('accounts.Company', on_delete=models.CASCADE, related_name='recognition_leaderboard')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='leaderboard_entries')
+    period = models.CharField(max_length=10, choices=PERIOD_CHOICES)
+    period_start = models.DateField()
+    points = models.IntegerField(default=0)
+    award_count = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ['company', 'period', 'period_start', 'user']
+        indexes = [
+            models.Index(fields=['company', 'period', 'period_start', '-points']),
+        ]
+
+    def __str__(self):
+        return f"Leaderboard: {self.user.email} {self.period} {self.period_start} ({self.points})"
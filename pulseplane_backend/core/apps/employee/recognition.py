@@ -0,0 +1,151 @@
+from datetime import date, timedelta
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.utils import timezone
+from .models import RecognitionAward, RecognitionStats, RecognitionLeaderboardEntry
+
+LEADERBOARD_PERIODS = ('all', 'month', 'week')
+# period_start of the single all-time window.
+ALL_TIME = date(1970, 1, 1)
+
+
+def compute_stats(user_id):
+    received = RecognitionAward.objects.filter(recipient_id=user_id).aggregate(
+        received_count=Count('id'), total_points=Sum('badge__points')
+    )
+    return {
+        'total_points': received['total_points'] or 0,
+        'received_count': received['received_count'],
+        'given_count': RecognitionAward.objects.filter(giver_id=user_id).count(),
+    }
+
+
+def rebuild_stats(user_id):
+    stats, _ = RecognitionStats.objects.update_or_create(user_id=user_id, defaults=compute_stats(user_id))
+    return stats
+
+
+def get_stats(user_id):
+    stats = RecognitionStats.objects.filter(user_id=user_id).first()
+    return stats or rebuild_stats(user_id)
+
+
+def adjust_stats(user_id, seed=True, **deltas):
+    """
+    Apply counter deltas in one atomic UPDATE ... SET x = x + delta. With
+    seed, a user without a row yet gets one computed from their awards, which
+    already reflect the change being recorded. Deletes pass seed=False: the
+    row is rebuilt on next read anyway, and during a cascading user delete
+    the user is about to disappear.
+    """
+    updated = RecognitionStats.objects.filter(user_id=user_id).update(
+        updated_at=timezone.now(),
+        **{field: F(field) + delta for field, delta in deltas.items()}
+    )
+    if not updated and seed:
+        try:
+            with transaction.atomic():
+                RecognitionStats.objects.create(user_id=user_id, **compute_stats(user_id))
+        except IntegrityError:
+            adjust_stats(user_id, seed=seed, **deltas)
+
+
+def rebuild_all_stats():
+    """Recompute every user's counters with two grouped queries."""
+    received = RecognitionAward.objects.values('recipient').annotate(
+        received_count=Count('id'), total_points=Sum('badge__points')
+    ).order_by()
+    given = RecognitionAward.objects.values('giver').annotate(given_count=Count('id')).order_by()
+    rows = {}
+    for row in received:
+        rows.setdefault(row['recipient'], {}).update(
+            received_count=row['received_count'], total_points=row['total_points'] or 0
+        )
+    for row in given:
+        rows.setdefault(row['giver'], {})['given_count'] = row['given_count']
+    with transaction.atomic():
+        RecognitionStats.objects.all().delete()
+        RecognitionStats.objects.bulk_create(
+            [RecognitionStats(user_id=user_id, **values) for user_id, values in rows.items()],
+            batch_size=1000,
+        )
+    return len(rows)
+
+
+def period_start(period, day):
+    if period == 'week':
+        return day - timedelta(days=day.weekday())
+    if period == 'month':
+        return day.replace(day=1)
+    return ALL_TIME
+
+
+def adjust_leaderboard(award, sign=1):
+    """
+    Add (sign=1) or remove (sign=-1) an award's points in each window it falls
+    in: one UPDATE per period, plus an INSERT the first time a user scores in
+    a window. Removals match on user only so the recipient is never loaded
+    while it may be in the middle of a cascading delete.
+    """
+    day = timezone.localdate(award.created_at)
+    points = award.badge.points * sign
+    for period in LEADERBOARD_PERIODS:
+        key = {'period': period, 'period_start': period_start(period, day), 'user_id': award.recipient_id}
+        updated = RecognitionLeaderboardEntry.objects.filter(**key).update(
+            points=F('points') + points, award_count=F('award_count') + sign
+        )
+        if updated or sign < 0:
+            continue
+        company_id = award.recipient.company_id
+        if not company_id:
+            return
+        try:
+            with transaction.atomic():
+                RecognitionLeaderboardEntry.objects.create(company_id=company_id, points=points, award_count=1, **key)
+        except IntegrityError:
+            RecognitionLeaderboardEntry.objects.filter(**key).update(
+                points=F('points') + points, award_count=F('award_count') + 1
+            )
+
+
+def leaderboard(company_id, period, user_id=None, limit=10, today=None):
+    """Top-N entries of the current window plus the given user's rank; two or three indexed queries."""
+    start = period_start(period, today or timezone.localdate())
+    entries = RecognitionLeaderboardEntry.objects.filter(
+        company_id=company_id, period=period, period_start=start, points__gt=0
+    )
+    top = list(entries.select_related('user').order_by('-points', 'user_id')[:limit])
+    mine = None
+    if user_id:
+        entry = next((entry for entry in top if entry.user_id == user_id), None)
+        if entry is None:
+            entry = entries.filter(user_id=user_id).first()
+        if entry:
+            mine = {'points': entry.points, 'rank': entries.filter(points__gt=entry.points).count() + 1}
+        else:
+            mine = {'points': 0, 'rank': None}
+    return start, top, mine
+
+
+def rebuild_leaderboard():
+    """Recompute every window from the awards table with one query grouped by recipient and day."""
+    daily = RecognitionAward.objects.filter(recipient__company__isnull=False).values(
+        'recipient__company', 'recipient', 'created_at__date'
+    ).annotate(points=Sum('badge__points'), award_count=Count('id')).order_by()
+    totals = {}
+    for row in daily:
+        for period in LEADERBOARD_PERIODS:
+            key = (row['recipient__company'], row['recipient'], period, period_start(period, row['created_at__date']))
+            points, count = totals.get(key, (0, 0))
+            totals[key] = (points + (row['points'] or 0), count + row['award_count'])
+    entries = [
+        RecognitionLeaderboardEntry(
+            company_id=company_id, user_id=user_id, period=period, period_start=start,
+            points=points, award_count=count,
+        )
+        for (company_id, user_id, period, start), (points, count) in totals.items()
+    ]
+    with transaction.atomic():
+        RecognitionLeaderboardEntry.objects.all().delete()
+        RecognitionLeaderboardEntry.objects.bulk_create(entries, batch_size=1000)
+    return len(entries)
@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import LeaveManagement, Feedback, WellnessCheck, RecognitionBadge, RecognitionAward
+from .models import LeaveManagement, Feedback, WellnessCheck, RecognitionBadge, RecognitionAward, BurnoutRiskScore
 from core.serializers import EmployeeSerializer
 from django.contrib.auth import get_user_model
 
@@ -52,6 +52,20 @@ class WellnessCheckSerializer(serializers.ModelSerializer):
         
         return data
 
+class BurnoutRiskScoreSerializer(serializers.ModelSerializer):
+    user_name = serializers.SerializerMethodField()
+    department = serializers.CharField(source='user.department', read_only=True)
+    position = serializers.CharField(source='user.position', read_only=True)
+
+    class Meta:
+        model = BurnoutRiskScore
+        fields = ['user', 'user_name', 'department', 'position', 'score', 'level', 'recent_mood',
+                  'recent_stress', 'recent_sleep', 'recent_work_life_balance', 'mood_slope',
+                  'stress_slope', 'stress_zscore', 'check_count', 'computed_at']
+
+    def get_user_name(self, obj):
+        return obj.user.full_name
+
 class RecognitionBadgeSerializer(serializers.ModelSerializer):
     class Meta:
         model = RecognitionBadge
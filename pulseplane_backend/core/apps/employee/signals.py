@@ -0,0 +1,20 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import RecognitionAward
+from .recognition import adjust_stats, adjust_leaderboard
+
+
+@receiver(post_save, sender=RecognitionAward)
+def award_created(sender, instance, created, **kwargs):
+    if not created:
+        return
+    adjust_stats(instance.recipient_id, total_points=instance.badge.points, received_count=1)
+    adjust_stats(instance.giver_id, given_count=1)
+    adjust_leaderboard(instance)
+
+
+@receiver(post_delete, sender=RecognitionAward)
+def award_deleted(sender, instance, **kwargs):
+    adjust_stats(instance.recipient_id, seed=False, total_points=-instance.badge.points, received_count=-1)
+    adjust_stats(instance.giver_id, seed=False, given_count=-1)
+    adjust_leaderboard(instance, sign=-1)
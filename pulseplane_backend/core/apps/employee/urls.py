@@ -12,9 +12,11 @@ from .views import (
     WellnessCheckCreateView,
     WellnessCheckListView,
     TeamWellnessAnalyticsView,
+    BurnoutRiskListView,
     RecognitionBadgeViewSet,
     RecognitionAwardListCreateView,
-    UserRecognitionStatsView
+    UserRecognitionStatsView,
+    RecognitionLeaderboardView
 )
 
 router = DefaultRouter()
@@ -38,10 +40,12 @@ urlpatterns = [
     path('wellness/', WellnessCheckCreateView.as_view(), name='wellness-create'),
     path('wellness/history/', WellnessCheckListView.as_view(), name='wellness-history'),
     path('wellness/analytics/', TeamWellnessAnalyticsView.as_view(), name='wellness-analytics'),
+    path('wellness/burnout-risk/', BurnoutRiskListView.as_view(), name='wellness-burnout-risk'),
 
     # Recognition System URLs
     path('', include(router.urls)),
     path('recognition/awards/', RecognitionAwardListCreateView.as_view(), name='recognition-awards'),
     path('recognition/stats/', UserRecognitionStatsView.as_view(), name='recognition-stats'),
     path('recognition/stats/<int:user_id>/', UserRecognitionStatsView.as_view(), name='recognition-stats-user'),
+    path('recognition/leaderboard/', RecognitionLeaderboardView.as_view(), name='recognition-leaderboard'),
 ]
\ No newline at end of file
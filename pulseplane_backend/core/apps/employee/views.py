@@ -1,20 +1,28 @@
 from rest_framework import generics, status, views, permissions, viewsets
 from rest_framework.response import Response
-from .models import LeaveManagement, Feedback, WellnessCheck, RecognitionBadge, RecognitionAward
+from .models import LeaveManagement, Feedback, WellnessCheck, WellnessRollingSummary, RecognitionBadge, RecognitionAward, BurnoutRiskScore
+from .wellness import record_check, slide_rows
+from .recognition import get_stats, leaderboard, LEADERBOARD_PERIODS
 from .serializers import (
     LeaveManagementSerializer, LeaveManagementDetailSerializer, FeedbackSerializer, WellnessCheckSerializer,
-    RecognitionBadgeSerializer, RecognitionAwardSerializer
+    RecognitionBadgeSerializer, RecognitionAwardSerializer, BurnoutRiskScoreSerializer
 )
 from rest_framework import serializers
+from rest_framework.exceptions import PermissionDenied
 from django.conf import settings
-from core.utils import EmailThread
-from .email_template import leave_approve_template
+from core.outbox import enqueue_messages
+from core.digests import digests_enabled, record
+from core.models import NotificationEvent
+from core.cache import cached_response
+from .email_template import leave_approve_email
 import datetime
-from django.db.models import Avg
 from datetime import timedelta
 from django.utils import timezone
-from django.db import models
-from django.contrib.auth.models import User
+from django.db import models, transaction
+from django.contrib.auth import get_user_model
+from django.db.models import Count
+
+User = get_user_model()
 
 class LeaveManagementView(generics.ListCreateAPIView):
     queryset = LeaveManagement.objects.all()
@@ -40,10 +48,11 @@ class LeaveManagementDetailView(generics.RetrieveUpdateDestroyAPIView):
 class LeaveManagementsDetailedListView(generics.ListAPIView):
     queryset = LeaveManagement.objects.all()
     serializer_class = LeaveManagementDetailSerializer
+    keyset_ordering = ('-date', '-id')
 
     def get_queryset(self):
         company = self.request.user.company
-        return LeaveManagement.objects.filter(user__company=company)
+        return LeaveManagement.objects.filter(user__company=company).select_related('user')
 
 class LeaveManagementDetailView(generics.RetrieveUpdateDestroyAPIView):
     queryset = LeaveManagement.objects.all()
@@ -58,24 +67,25 @@ class LeaveManagementDetailView(generics.RetrieveUpdateDestroyAPIView):
             data = serializer.save(approved=True)
         else:
             data = serializer.save(approved=False)
-        user = data.user
-        date = data.date
-        self.send_email_to_user(user, date)
+        if digests_enabled():
+            kind = NotificationEvent.Kind.LEAVE_APPROVED if data.approved else NotificationEvent.Kind.LEAVE_DECLINED
+            record([NotificationEvent(user=data.user, kind=kind, key=f'leave:{data.pk}', summary=f'Leave on {data.date}')])
+        else:
+            self.send_email_to_user(data.user, data.date)
 
     def send_email_to_user(self, user, date):
-        subject = f'Leave Approved on {settings.SITE_NAME}'
-        message = leave_approve_template.format(
+        message = leave_approve_email.message(
+            user.email,
             full_name=user.full_name,
             site_name=settings.SITE_NAME,
             date=date
         )
-        recipient_list = [user.email]
-        email_thread = EmailThread(subject, message, recipient_list)
-        email_thread.start()
+        enqueue_messages([message])
 
 class FeedbackListCreateView(generics.ListCreateAPIView):
     queryset = Feedback.objects.all()
     serializer_class = FeedbackSerializer
+    keyset_ordering = ('-created_at', '-id')
 
 class FeedbackDetailView(generics.RetrieveUpdateDestroyAPIView):
     queryset = Feedback.objects.all()
@@ -99,11 +109,16 @@ class WellnessCheckCreateView(generics.CreateAPIView):
     permission_classes = [permissions.IsAuthenticated]
     
     def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
+        # One transaction, so the data version bump queued by the save runs
+        # after the summary is updated, and a check never lands without it.
+        with transaction.atomic():
+            check = serializer.save(user=self.request.user)
+            record_check(check)
 
 class WellnessCheckListView(generics.ListAPIView):
     serializer_class = WellnessCheckSerializer
     permission_classes = [permissions.IsAuthenticated]
+    keyset_ordering = ('-date', '-id')
     
     def get_queryset(self):
         user = self.request.user
@@ -123,12 +138,38 @@ class TeamWellnessAnalyticsView(views.APIView):
         if not company:
             return Response({"error": "No company associated with user."}, 
                             status=status.HTTP_400_BAD_REQUEST)
-            
-        team_members = company.customuser_set.all()
-        
-        # Calculate averages for last 30 days
-        thirty_days_ago = timezone.now().date() - timedelta(days=30)
-        
+
+        data = cached_response(
+            'wellness-analytics', company.id, {'date': timezone.localdate()},
+            lambda: self.get_team_wellness(company)
+        )
+        return Response(data)
+
+    def get_team_wellness(self, company):
+        # Reads one precomputed row per member instead of their raw checks for
+        # the last 30 days. Windows the nightly sweep has not moved yet are
+        # slid forward in memory; moving them in the table is left to the
+        # sweep so this read takes no locks and writes nothing.
+        summaries = slide_rows(list(WellnessRollingSummary.objects.filter(
+            user__company=company, check_count__gt=0
+        ).values(
+            'user', 'user__first_name', 'user__last_name', 'user__department', 'user__position',
+            'mood_sum', 'stress_level_sum', 'work_life_balance_sum', 'check_count', 'window_start'
+        ).order_by('user')))
+        rows = []
+        for summary in summaries:
+            count = summary['check_count']
+            if not count:
+                continue
+            rows.append({
+                **summary,
+                'avg_mood': summary['mood_sum'] / count,
+                'avg_stress': summary['stress_level_sum'] / count,
+                'avg_work_life_balance': summary['work_life_balance_sum'] / count,
+            })
+        return self.summarize(rows)
+
+    def summarize(self, rows):
         team_data = []
         company_avg = {
             'mood': 0,
@@ -136,47 +177,50 @@ class TeamWellnessAnalyticsView(views.APIView):
             'work_life_balance': 0,
             'total_users': 0
         }
-        
-        for member in team_members:
-            wellness_checks = WellnessCheck.objects.filter(
-                user=member,
-                date__gte=thirty_days_ago
-            )
-            
-            if wellness_checks.exists():
-                avg_mood = wellness_checks.aggregate(Avg('mood'))['mood__avg']
-                avg_stress = wellness_checks.aggregate(Avg('stress_level'))['stress_level__avg']
-                avg_wlb = wellness_checks.aggregate(Avg('work_life_balance'))['work_life_balance__avg']
-                
-                member_data = {
-                    'id': member.id,
-                    'name': member.full_name,
-                    'department': member.department,
-                    'position': member.position,
-                    'avg_mood': round(avg_mood, 2),
-                    'avg_stress': round(avg_stress, 2),
-                    'avg_work_life_balance': round(avg_wlb, 2),
-                    'check_count': wellness_checks.count()
-                }
-                
-                team_data.append(member_data)
-                
-                # Update company averages
-                company_avg['mood'] += avg_mood
-                company_avg['stress_level'] += avg_stress
-                company_avg['work_life_balance'] += avg_wlb
-                company_avg['total_users'] += 1
-        
+
+        for row in rows:
+            team_data.append({
+                'id': row['user'],
+                'name': f"{row['user__first_name']} {row['user__last_name']}",
+                'department': row['user__department'],
+                'position': row['user__position'],
+                'avg_mood': round(row['avg_mood'], 2),
+                'avg_stress': round(row['avg_stress'], 2),
+                'avg_work_life_balance': round(row['avg_work_life_balance'], 2),
+                'check_count': row['check_count']
+            })
+
+            # Update company averages
+            company_avg['mood'] += row['avg_mood']
+            company_avg['stress_level'] += row['avg_stress']
+            company_avg['work_life_balance'] += row['avg_work_life_balance']
+            company_avg['total_users'] += 1
+
         # Calculate company averages
         if company_avg['total_users'] > 0:
             company_avg['mood'] = round(company_avg['mood'] / company_avg['total_users'], 2)
             company_avg['stress_level'] = round(company_avg['stress_level'] / company_avg['total_users'], 2)
             company_avg['work_life_balance'] = round(company_avg['work_life_balance'] / company_avg['total_users'], 2)
-        
-        return Response({
+
+        return {
             'team_data': team_data,
             'company_averages': company_avg
-        })
+        }
+
+class BurnoutRiskListView(generics.ListAPIView):
+    serializer_class = BurnoutRiskScoreSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        # Scores are precomputed by the score_burnout_risk command.
+        user = self.request.user
+        if not user.is_manager and not user.is_staff:
+            raise PermissionDenied("Not authorized to view burnout risk.")
+        queryset = BurnoutRiskScore.objects.filter(user__company=user.company).select_related('user')
+        level = self.request.query_params.get('level')
+        if level:
+            queryset = queryset.filter(level=level)
+        return queryset
 
 class RecognitionBadgeViewSet(viewsets.ModelViewSet):
     queryset = RecognitionBadge.objects.all()
@@ -191,6 +235,7 @@ class RecognitionBadgeViewSet(viewsets.ModelViewSet):
 class RecognitionAwardListCreateView(generics.ListCreateAPIView):
     serializer_class = RecognitionAwardSerializer
     permission_classes = [permissions.IsAuthenticated]
+    keyset_ordering = ('-created_at', '-id')
     
     def get_queryset(self):
         # Show public awards and ones involving the current user
@@ -199,7 +244,7 @@ class RecognitionAwardListCreateView(generics.ListCreateAPIView):
             models.Q(public=True) | 
             models.Q(recipient=user) | 
             models.Q(giver=user)
-        )
+        ).select_related('recipient', 'giver', 'badge')
     
     def perform_create(self, serializer):
         serializer.save(giver=self.request.user)
@@ -216,28 +261,20 @@ class UserRecognitionStatsView(views.APIView):
             except User.DoesNotExist:
                 return Response({"error": "User not found"}, status=status.HTTP_404_NOT_FOUND)
         
-        # Get recognition stats
+        # Counters are denormalized on RecognitionStats; the badge histogram
+        # and recent awards are one query each, however many awards there are.
+        stats = get_stats(target_user.id)
         received_awards = RecognitionAward.objects.filter(recipient=target_user)
-        given_awards = RecognitionAward.objects.filter(giver=target_user)
-        
-        # Calculate points
-        total_points = sum(award.badge.points for award in received_awards)
-        
+
         # Get top badges received
-        badge_counts = {}
-        for award in received_awards:
-            badge_name = award.badge.name
-            if badge_name in badge_counts:
-                badge_counts[badge_name] += 1
-            else:
-                badge_counts[badge_name] = 1
-        
-        top_badges = [{"name": k, "count": v} for k, v in 
-                      sorted(badge_counts.items(), key=lambda x: x[1], reverse=True)][:5]
+        top_badges = [
+            {"name": row['badge__name'], "count": row['count']}
+            for row in received_awards.values('badge__name').annotate(count=Count('id')).order_by('-count')[:5]
+        ]
         
         # Get recent awards
         recent_awards = RecognitionAwardSerializer(
-            received_awards.order_by('-created_at')[:5], 
+            received_awards.select_related('recipient', 'giver', 'badge').order_by('-created_at')[:5], 
             many=True, 
             context={'request': request}
         ).data
@@ -245,9 +282,48 @@ class UserRecognitionStatsView(views.APIView):
         return Response({
             "user_id": target_user.id,
             "user_name": target_user.full_name,
-            "total_received": received_awards.count(),
-            "total_given": given_awards.count(),
-            "total_points": total_points,
+            "total_received": stats.received_count,
+            "total_given": stats.given_count,
+            "total_points": stats.total_points,
             "top_badges": top_badges,
             "recent_awards": recent_awards
-        })
\ No newline at end of file
+        })
+
+class RecognitionLeaderboardView(views.APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        # Served from RecognitionLeaderboardEntry, which is kept current on
+        # every award, so this is an indexed top-N read plus a rank count.
+        period = request.query_params.get('period', 'all')
+        if period not in LEADERBOARD_PERIODS:
+            return Response({"error": f"period must be one of {', '.join(LEADERBOARD_PERIODS)}"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = min(max(int(request.query_params.get('limit', 10)), 1), 100)
+        except ValueError:
+            return Response({"error": "limit must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+        if not request.user.company_id:
+            return Response({"error": "User is not part of a company"}, status=status.HTTP_400_BAD_REQUEST)
+
+        start, top, mine = leaderboard(request.user.company_id, period, user_id=request.user.id, limit=limit)
+        entries = []
+        rank = 0
+        previous = None
+        for position, entry in enumerate(top, start=1):
+            # Ties share a rank, matching how "my rank" is counted.
+            if entry.points != previous:
+                rank, previous = position, entry.points
+            entries.append({
+                "rank": rank,
+                "user_id": entry.user_id,
+                "user_name": entry.user.full_name,
+                "points": entry.points,
+                "award_count": entry.award_count,
+            })
+        return Response({
+            "period": period,
+            "period_start": start,
+            "entries": entries,
+            "my_rank": mine['rank'],
+            "my_points": mine['points'],
+        })
@@ -0,0 +1,133 @@
+from datetime import timedelta
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.utils import timezone
+from .models import WellnessCheck, WellnessRollingSummary
+
+# Matches the analytics window: checks dated on or after today - WINDOW_DAYS.
+WINDOW_DAYS = 30
+
+SUMMED_FIELDS = ('mood', 'stress_level', 'work_life_balance')
+
+
+def window_start(today=None):
+    return (today or timezone.localdate()) - timedelta(days=WINDOW_DAYS)
+
+
+def _sums():
+    return {f'{field}_sum': Sum(field) for field in SUMMED_FIELDS}
+
+
+def rebuild_summary(user_id, start=None):
+    """Recompute one user's summary from their raw checks."""
+    start = start or window_start()
+    totals = WellnessCheck.objects.filter(user_id=user_id, date__gte=start).aggregate(
+        check_count=Count('id'), **_sums()
+    )
+    values = {key: value or 0 for key, value in totals.items()}
+    summary, _ = WellnessRollingSummary.objects.update_or_create(
+        user_id=user_id, defaults={'window_start': start, **values}
+    )
+    return summary
+
+
+def rebuild_summaries(users):
+    """Recompute the summaries of a queryset of users from raw checks with one grouped query."""
+    start = window_start()
+    rows = WellnessCheck.objects.filter(user__in=users, date__gte=start).values('user').annotate(
+        check_count=Count('id'), **_sums()
+    ).order_by('user')
+    with transaction.atomic():
+        WellnessRollingSummary.objects.filter(user__in=users).delete()
+        WellnessRollingSummary.objects.bulk_create([
+            WellnessRollingSummary(window_start=start, user_id=row.pop('user'), **row)
+            for row in rows
+        ], batch_size=1000)
+
+
+def record_check(check):
+    """Add a newly submitted check to its user's running sums with a single UPDATE."""
+    updated = WellnessRollingSummary.objects.filter(user_id=check.user_id).update(
+        check_count=F('check_count') + 1,
+        mood_sum=F('mood_sum') + check.mood,
+        stress_level_sum=F('stress_level_sum') + check.stress_level,
+        work_life_balance_sum=F('work_life_balance_sum') + check.work_life_balance,
+        updated_at=timezone.now(),
+    )
+    if not updated:
+        # First check since the summaries were introduced: seed from the raw
+        # rows, which already include this check.
+        try:
+            with transaction.atomic():
+                rebuild_summary(check.user_id)
+        except IntegrityError:
+            record_check(check)
+
+
+def forget_check(check):
+    """Take a deleted check out of its user's running sums, if it is still inside their window."""
+    WellnessRollingSummary.objects.filter(user_id=check.user_id, window_start__lte=check.date).update(
+        check_count=F('check_count') - 1,
+        mood_sum=F('mood_sum') - check.mood,
+        stress_level_sum=F('stress_level_sum') - check.stress_level,
+        work_life_balance_sum=F('work_life_balance_sum') - check.work_life_balance,
+        updated_at=timezone.now(),
+    )
+
+
+def _expired(summaries, start):
+    """Per-user totals of the checks that fell out of the given summaries' windows before `start`."""
+    rows = WellnessCheck.objects.filter(
+        user__wellness_summary__in=summaries,
+        date__gte=F('user__wellness_summary__window_start'),
+        date__lt=start,
+    ).values('user').annotate(check_count=Count('id'), **_sums())
+    return {row['user']: row for row in rows}
+
+
+def slide_rows(rows, today=None):
+    """
+    Bring summary rows (dicts with user, window_start, check_count and the
+    sums) to today's window in memory, for readers that must not write.
+    Windows the sweep has not moved yet cost one grouped query for their
+    expired checks; none at all once it has run.
+    """
+    start = window_start(today)
+    stale = [row['user'] for row in rows if row['window_start'] < start]
+    if stale:
+        expired = _expired(WellnessRollingSummary.objects.filter(user__in=stale), start)
+        for row in rows:
+            for key, value in expired.get(row['user'], {}).items():
+                if key != 'user':
+                    row[key] -= value
+    return rows
+
+
+def expire_windows(summaries=None, today=None):
+    """
+    Slide stale windows forward to today's window start, subtracting the
+    checks that fell out of them. Cost is proportional to the number of
+    expired checks, not to the size of the window.
+    """
+    start = window_start(today)
+    summaries = summaries if summaries is not None else WellnessRollingSummary.objects.all()
+    with transaction.atomic():
+        # Lock first so checks recorded meanwhile wait instead of being lost by bulk_update.
+        stale = list(summaries.filter(window_start__lt=start).select_for_update(of=('self',)))
+        if not stale:
+            return 0
+        expired = _expired([summary.id for summary in stale], start)
+
+        for summary in stale:
+            row = expired.get(summary.user_id)
+            if row:
+                summary.check_count -= row['check_count']
+                for field in SUMMED_FIELDS:
+                    setattr(summary, f'{field}_sum', getattr(summary, f'{field}_sum') - row[f'{field}_sum'])
+            summary.window_start = start
+        WellnessRollingSummary.objects.bulk_update(
+            stale,
+            ['window_start', 'check_count'] + [f'{field}_sum' for field in SUMMED_FIELDS],
+            batch_size=1000,
+        )
+    return len(stale)
@@ -1,4 +1,7 @@
 from django.contrib import admin
-from .models import Scheduling
+from .models import Scheduling, RecurringShift, RecurringShiftException, CalendarFeedToken
 
-admin.site.register(Scheduling)
\ No newline at end of file
+admin.site.register(Scheduling)
+admin.site.register(RecurringShift)
+admin.site.register(RecurringShiftException)
+admin.site.register(CalendarFeedToken)
@@ -0,0 +1,65 @@
+"""
+Bulk shift creation. A whole roster is written with two INSERT batches (the
+shifts, then their Scheduling.user through rows) inside one transaction.
+bulk_create skips the post_save/m2m_changed hooks in core.signals, so the
+KPI rollups and cached dashboards are invalidated here explicitly, and the
+assignees are notified in the same transaction (see notifications.py).
+"""
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from rest_framework.exceptions import ValidationError
+from core.cache import bump_data_version
+from core.rollups import mark_dirty
+from .conflicts import find_conflicts, describe_conflicts
+from .models import Scheduling
+from .notifications import notify_scheduled
+
+User = get_user_model()
+
+# Largest roster accepted by a single bulk request.
+MAX_BULK_SHIFTS = 5000
+
+SHIFT_FIELDS = ('date', 'shift_type', 'priority', 'start_time', 'end_time')
+
+
+def assignment_rows(pairs):
+    """Through-table rows for (scheduling_id, user_id) pairs."""
+    through = Scheduling.user.through
+    shift_column = f'{Scheduling.user.field.m2m_field_name()}_id'
+    user_column = f'{Scheduling.user.field.m2m_reverse_field_name()}_id'
+    return [through(**{shift_column: shift_id, user_column: user_id}) for shift_id, user_id in pairs]
+
+
+def create_shifts(shifts, notify=True):
+    """
+    Create shifts from validated dicts of SHIFT_FIELDS plus `user` (a list of
+    user ids). Returns the created Scheduling rows. Raises ValidationError if
+    any assignee would be double-booked, checked with the assignees' rows
+    locked so concurrent rosters for the same people can't interleave.
+    """
+    with transaction.atomic():
+        user_ids = sorted({user_id for shift in shifts for user_id in shift['user']})
+        companies = dict(
+            User.objects.select_for_update().filter(id__in=user_ids).order_by('id').values_list('id', 'company_id')
+        )
+        conflicts = find_conflicts(shifts)
+        if conflicts:
+            raise ValidationError({'shifts': describe_conflicts(conflicts, shifts)})
+
+        created = Scheduling.objects.bulk_create(
+            [Scheduling(**{field: shift[field] for field in SHIFT_FIELDS if field in shift}) for shift in shifts],
+            batch_size=1000,
+        )
+        pairs = [(scheduling.pk, user_id) for scheduling, shift in zip(created, shifts) for user_id in set(shift['user'])]
+        Scheduling.user.through.objects.bulk_create(assignment_rows(pairs), batch_size=2000)
+
+        dirty = {(companies.get(user_id), scheduling.date) for scheduling, shift in zip(created, shifts) for user_id in shift['user']}
+        for company_id, day in dirty:
+            mark_dirty(company_id, day)
+        for company_id in {company_id for company_id, _ in dirty}:
+            bump_data_version(company_id)
+
+        if notify:
+            notify_scheduled([scheduling.pk for scheduling in created])
+    return created
+
@@ -0,0 +1,99 @@
+"""
+Server-maintained shift counters.
+
+CustomUser.current_shifts_count is the number of completed shifts a user is
+assigned to, and feeds the payroll figures. It is never taken from clients.
+Completing or reopening shifts, changing the assignees of a completed
+shift and deleting one adjust it in place with a single F() UPDATE per
+batch (see core.signals for the single-row hooks), and
+reconcile_shift_counts rebuilds it from the completed shifts.
+"""
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+from core.cache import bump_data_version
+from core.rollups import mark_dirty
+from .models import Scheduling
+
+User = get_user_model()
+
+
+def _counted(delta):
+    # NULL counters (never maintained) start from zero, and a counter that
+    # was wrong before it was maintained never goes negative.
+    return Greatest(Coalesce(F('current_shifts_count'), Value(0)) + delta, Value(0))
+
+
+def _counters_changed(users):
+    # A queryset update skips the post_save hook that refreshes the payroll KPIs.
+    for company_id in set(users.exclude(company__isnull=True).values_list('company_id', flat=True).distinct()):
+        mark_dirty(company_id)
+        bump_data_version(company_id)
+
+
+def adjust_users(user_ids, delta):
+    """Add delta to the counters of the given users."""
+    if not user_ids or not delta:
+        return
+    users = User.objects.filter(id__in=user_ids)
+    users.update(current_shifts_count=_counted(delta))
+    _counters_changed(users)
+
+
+def adjust_for_shifts(scheduling_ids, sign):
+    """
+    Add sign × (how many of the given shifts each assignee holds) to the
+    assignees' counters, in one UPDATE however many shifts and people there
+    are.
+    """
+    if not scheduling_ids:
+        return
+    assignments = Scheduling.user.through.objects.filter(scheduling_id__in=scheduling_ids)
+    held = assignments.filter(customuser=OuterRef('pk')).values('customuser').annotate(count=Count('id')).values('count')
+    users = User.objects.filter(id__in=assignments.values('customuser_id'))
+    users.update(current_shifts_count=_counted(sign * Subquery(held, output_field=IntegerField())))
+    _counters_changed(users)
+
+
+def set_completed(shifts, completed=True):
+    """
+    Mark the shifts of a queryset completed (or not) and adjust their
+    assignees' counters. Shifts already in that state are left alone, so
+    repeating a request never counts a shift twice. Returns the ids that
+    changed.
+    """
+    with transaction.atomic():
+        ids = list(shifts.exclude(is_completed=completed).select_for_update().values_list('id', flat=True))
+        if ids:
+            Scheduling.objects.filter(id__in=ids).update(is_completed=completed, updated_at=timezone.now())
+            adjust_for_shifts(ids, 1 if completed else -1)
+    return ids
+
+
+def completed_counts(users):
+    """Annotate users with `completed_shifts`, the counter value implied by their completed shifts."""
+    completed = Scheduling.user.through.objects.filter(
+        customuser=OuterRef('pk'), scheduling__is_completed=True,
+    ).values('customuser').annotate(count=Count('id')).values('count')
+    return users.annotate(completed_shifts=Coalesce(Subquery(completed, output_field=IntegerField()), Value(0)))
+
+
+def check_counts(users):
+    """Yield (user_id, stored, expected) for every user whose counter has drifted (NULL counts as 0)."""
+    rows = completed_counts(users).values_list('id', 'current_shifts_count', 'completed_shifts')
+    for user_id, stored, expected in rows.iterator():
+        if (stored or 0) != expected:
+            yield user_id, stored, expected
+
+
+def reconcile_counts(user_ids):
+    """Recompute the counters of the given users from their completed shifts in one UPDATE."""
+    users = User.objects.filter(id__in=user_ids)
+    with transaction.atomic():
+        count = users.update(current_shifts_count=Subquery(
+            completed_counts(User.objects.filter(pk=OuterRef('pk'))).values('completed_shifts')[:1]
+        ))
+        _counters_changed(users)
+    return count
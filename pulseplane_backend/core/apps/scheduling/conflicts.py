@@ -0,0 +1,155 @@
+"""
+Double-booking detection for shift assignments.
+
+A shift runs from start_time on its date to end_time, on the next day when
+end_time <= start_time (NIGHT shifts crossing midnight). Every shift is
+shorter than a day, so a shift on day D can only overlap shifts dated D-1,
+D or D+1. Candidates are therefore fetched with one indexed range query on
+(user, date window) for a whole batch, and overlaps are found per user with
+a sort-and-sweep over the intervals, in O(n log n) in the number of
+candidate shifts rather than in the user's whole history. Pending
+occurrences of recurring shifts count as bookings too.
+"""
+from collections import defaultdict
+from datetime import datetime, timedelta
+from django.db.models import Q
+from .models import Scheduling, RecurringShift
+from .recurrence import expand
+
+
+def shift_interval(date, start_time, end_time):
+    """(start, end) datetimes of a shift, or None for an undated shift."""
+    if date is None or start_time is None or end_time is None:
+        return None
+    start = datetime.combine(date, start_time)
+    end = datetime.combine(date, end_time)
+    if end <= start:
+        end += timedelta(days=1)
+    return start, end
+
+
+def find_conflicts(shifts, exclude_ids=(), exclude_templates=()):
+    """
+    Check proposed shifts against each other and against existing
+    assignments.
+
+    `shifts` is a list of dicts with date, start_time, end_time and user (a
+    list of user ids); exclude_ids are existing shifts being replaced (e.g.
+    the instance being updated) and exclude_templates recurring shifts
+    whose occurrences are being replaced. Returns a list of dicts with `user`,
+    `index` (position in `shifts`) and `conflicts_with` (an existing shift
+    id, a recurring occurrence key "r<template>:<date>", or the index of
+    another proposed shift as "new:<index>").
+    """
+    proposed = defaultdict(list)
+    days = set()
+    for index, shift in enumerate(shifts):
+        interval = shift_interval(shift.get('date'), shift.get('start_time'), shift.get('end_time'))
+        if interval is None:
+            continue
+        days.add(shift['date'])
+        for user_id in set(shift['user']):
+            proposed[user_id].append((interval, index))
+    if not proposed:
+        return []
+
+    # Only the days adjacent to a proposed shift can hold overlapping ones.
+    current = defaultdict(list)
+    for user_id, key, date, _, start_time, end_time in booked_shifts(list(proposed), days, exclude_ids, exclude_templates):
+        current[user_id].append((shift_interval(date, start_time, end_time), key))
+
+    conflicts = []
+    for user_id, new in proposed.items():
+        intervals = sorted(
+            [(interval, ('new', index)) for interval, index in new]
+            + [(interval, ('existing', key)) for interval, key in current.get(user_id, ())],
+            key=lambda item: item[0],
+        )
+        conflicts.extend(_sweep(user_id, intervals))
+    return conflicts
+
+
+def booked_shifts(user_ids, days, exclude_ids=(), exclude_templates=()):
+    """
+    Yield (user_id, key, date, shift_type, start_time, end_time) for every
+    shift of the users dated on or next to one of `days`: Scheduling rows
+    (key = id) and pending recurring occurrences (key = "r<template>:<date>").
+    """
+    if not user_ids or not days:
+        return
+    # OR-ing one range per contiguous run keeps the query a few index scans.
+    window = Q()
+    for first, last in _runs(days):
+        window |= Q(date__range=(first - timedelta(days=1), last + timedelta(days=1)))
+    user_column = f'{Scheduling.user.field.m2m_reverse_field_name()}_id'
+    yield from Scheduling.user.through.objects.filter(
+        **{f'{user_column}__in': user_ids},
+        scheduling__in=Scheduling.objects.filter(window).exclude(id__in=exclude_ids),
+    ).values_list(
+        user_column, 'scheduling_id', 'scheduling__date', 'scheduling__shift_type',
+        'scheduling__start_time', 'scheduling__end_time',
+    )
+
+    wanted = set(user_ids)
+    templates = RecurringShift.objects.filter(user__in=user_ids).exclude(id__in=exclude_templates).distinct()
+    near = {day + timedelta(days=offset) for day in days for offset in (-1, 0, 1)}
+    for occurrence in expand(templates, min(near), max(near)):
+        if occurrence.date not in near:
+            continue
+        template = occurrence.template
+        for user_id in wanted.intersection(occurrence.user_ids()):
+            yield user_id, occurrence.key, occurrence.date, template.shift_type, template.start_time, template.end_time
+
+
+def _runs(days):
+    """Collapse a set of dates into (first, last) runs of consecutive days."""
+    runs = []
+    for day in sorted(days):
+        if runs and day - runs[-1][1] <= timedelta(days=1):
+            runs[-1][1] = day
+        else:
+            runs.append([day, day])
+    return runs
+
+
+def _sweep(user_id, intervals):
+    """Report each proposed shift that overlaps an earlier-starting interval still running."""
+    conflicts = []
+    active = []  # (end, key) of intervals that may still overlap the next start
+    for (start, end), key in intervals:
+        active = [(active_end, active_key) for active_end, active_key in active if active_end > start]
+        for _, other in active:
+            if key[0] == 'existing' and other[0] == 'existing':
+                continue
+            new, clash = (key, other) if key[0] == 'new' else (other, key)
+            conflicts.append({
+                'user': user_id,
+                'index': new[1],
+                'conflicts_with': clash[1] if clash[0] == 'existing' else f'new:{clash[1]}',
+            })
+        active.append((end, key))
+    return conflicts
+
+
+def describe_conflicts(conflicts, shifts=None, limit=50, label=None):
+    """
+    Human-readable messages for (at most `limit` of) find_conflicts()
+    results. `label` maps a proposed shift's index to the prefix naming it.
+    """
+    messages = []
+    for conflict in conflicts[:limit]:
+        if label is not None:
+            where = f'{label(conflict["index"])}: '
+        else:
+            where = f'shift {conflict["index"]}: ' if shifts is not None and len(shifts) > 1 else ''
+        other = conflict['conflicts_with']
+        if isinstance(other, int):
+            other = f'existing shift {other}'
+        elif other.startswith('new:'):
+            other = f'shift {other[4:]} in this request'
+        else:
+            other = f'recurring shift occurrence {other}'
+        messages.append(f'{where}user {conflict["user"]} is already scheduled for {other} at an overlapping time.')
+    if len(conflicts) > limit:
+        messages.append(f'... and {len(conflicts) - limit} more conflicts.')
+    return messages
@@ -0,0 +1,78 @@
+"""
+Shift coverage: for each day and shift type of a window, how many people
+are assigned and how many of those are on approved leave that day, plus
+how many of the team are on leave per day.
+
+Counts are computed by grouped aggregates over the Scheduling.user through
+table and LeaveManagement, so the cost depends on the number of
+(day, shift type) cells, not on the number of shifts or assignees. Pending
+recurring occurrences are counted too; they are expanded in Python, which
+is cheap because only templates are stored. The result is columnar: one
+list per series, indexed like `dates`.
+"""
+from collections import defaultdict
+from datetime import timedelta
+from django.contrib.auth import get_user_model
+from django.db.models import Count, Exists, OuterRef, Prefetch, Q
+from core.apps.employee.models import LeaveManagement
+from .models import Scheduling, RecurringShift, SHIFT_TYPES
+from .recurrence import expand
+
+User = get_user_model()
+
+
+def coverage_matrix(company, start_date, end_date, department=None):
+    team = User.objects.filter(company=company, is_manager=False, is_active=True)
+    if department:
+        team = team.filter(department=department)
+    dates = [start_date + timedelta(days=offset) for offset in range((end_date - start_date).days + 1)]
+    index = {day: position for position, day in enumerate(dates)}
+    shift_types = list(SHIFT_TYPES.values)
+    assigned = {shift_type: [0] * len(dates) for shift_type in shift_types}
+    assigned_on_leave = {shift_type: [0] * len(dates) for shift_type in shift_types}
+    on_leave = [0] * len(dates)
+
+    approved_leave = LeaveManagement.objects.filter(approved=True)
+    cells = Scheduling.user.through.objects.filter(
+        customuser__in=team, scheduling__date__range=(start_date, end_date),
+    ).values('scheduling__date', 'scheduling__shift_type').annotate(
+        people=Count('customuser', distinct=True),
+        people_on_leave=Count('customuser', distinct=True, filter=Q(Exists(
+            approved_leave.filter(user=OuterRef('customuser'), date=OuterRef('scheduling__date'))
+        ))),
+    ).order_by()
+    for cell in cells:
+        position = index[cell['scheduling__date']]
+        assigned[cell['scheduling__shift_type']][position] += cell['people']
+        assigned_on_leave[cell['scheduling__shift_type']][position] += cell['people_on_leave']
+
+    leaves = approved_leave.filter(user__in=team, date__range=(start_date, end_date))
+    for row in leaves.values('date').annotate(people=Count('user', distinct=True)).order_by():
+        on_leave[index[row['date']]] = row['people']
+
+    # Occurrences add people the grouped query above can't see. Conflict
+    # checks keep anyone from holding a stored shift and an occurrence at the
+    # same time, so nobody is counted twice in a cell.
+    templates = RecurringShift.objects.filter(company=company)
+    occurrences = expand(templates, start_date, end_date, users=Prefetch('user', queryset=team.only('id')))
+    if occurrences:
+        leave_days = set(leaves.values_list('user_id', 'date'))
+        people = defaultdict(set)
+        for occurrence in occurrences:
+            people[occurrence.date, occurrence.template.shift_type].update(occurrence.user_ids())
+        for (day, shift_type), user_ids in people.items():
+            position = index[day]
+            assigned[shift_type][position] += len(user_ids)
+            assigned_on_leave[shift_type][position] += sum((user_id, day) in leave_days for user_id in user_ids)
+
+    return {
+        'start_date': start_date,
+        'end_date': end_date,
+        'department': department,
+        'headcount': team.count(),
+        'dates': dates,
+        'shift_types': shift_types,
+        'assigned': assigned,
+        'assigned_on_leave': assigned_on_leave,
+        'on_leave': on_leave,
+    }
@@ -1,3 +1,5 @@
+from core.email_registry import register
+
 scheduling_template = """
 Hello {full_name},
 
@@ -21,4 +23,9 @@ End Time: {end_time}
 
 Regards,
 {site_name}
-"""
\ No newline at end of file
+"""
+
+scheduling_email = register('scheduling', 'Scheduled Shift: {shift_type} on {date}', scheduling_template)
+delete_scheduling_email = register(
+    'delete_scheduling', 'Scheduling Update: Removed from Shift on {date}', delete_scheduling_template
+)
@@ -0,0 +1,137 @@
+"""
+Per-user iCalendar (RFC 5545) feeds.
+
+Calendar apps poll feeds every few minutes, so a poll is answered from two
+small aggregate queries whose result is the feed's ETag; an unchanged
+feed costs a 304 with no body. There is no Last-Modified: removing a user
+from a shift or deleting it doesn't move any timestamp the feed could
+report, so an If-Modified-Since check would keep the removed events.
+
+A changed feed is streamed event by event from a server-side iterator, so
+memory stays flat however many shifts the user has.
+"""
+import hashlib
+import secrets
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.conf import settings
+from django.db.models import Count, Max, Sum
+from django.utils import timezone
+from .models import Scheduling, RecurringShift, CalendarFeedToken
+from .recurrence import expand
+
+# Shifts older than this are dropped from the feed; future ones are all included,
+# recurring shifts up to FUTURE_DAYS ahead.
+PAST_DAYS = 90
+FUTURE_DAYS = 365
+EVENT_FIELDS = ('id', 'date', 'shift_type', 'priority', 'start_time', 'end_time', 'is_completed', 'updated_at')
+
+
+def issue_token(user):
+    """Create or rotate the user's feed token; the previous URL stops working."""
+    feed, _ = CalendarFeedToken.objects.update_or_create(user=user, defaults={'token': secrets.token_urlsafe(32)})
+    return feed
+
+
+def feed_window(today=None):
+    today = today or timezone.localdate()
+    return today - timedelta(days=PAST_DAYS), today + timedelta(days=FUTURE_DAYS)
+
+
+def feed_shifts(user, start):
+    return Scheduling.objects.filter(user=user, date__gte=start)
+
+
+def feed_templates(user):
+    return RecurringShift.objects.filter(user=user)
+
+
+def feed_etag(user):
+    """
+    The ETag of a user's feed from one aggregate query over their shifts
+    and one over their recurring shifts. Counts and id sums
+    catch removals and reassignments that don't touch updated_at, and the
+    window start catches events rolling out of the feed.
+    """
+    start, end = feed_window()
+    shifts = feed_shifts(user, start)
+    templates = feed_templates(user).filter(start_date__lte=end)
+    state = shifts.aggregate(modified=Max('updated_at'), count=Count('id'), ids=Sum('id'))
+    template_state = templates.aggregate(
+        modified=Max('updated_at'), count=Count('id', distinct=True), ids=Sum('id', distinct=True),
+        exceptions=Count('exceptions', distinct=True),
+    )
+    return hashlib.md5(repr((start, sorted(state.items()), sorted(template_state.items()))).encode()).hexdigest()
+
+
+def _escape(text):
+    return str(text).replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,').replace('\n', '\\n')
+
+
+def _fold(line):
+    """Fold a content line at 75 octets as RFC 5545 requires."""
+    encoded = line.encode()
+    if len(encoded) <= 75:
+        return line + '\r\n'
+    parts = []
+    while len(encoded) > 75:
+        cut = 75 if not parts else 74
+        # Don't split a multi-byte character.
+        while cut and (encoded[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(encoded[:cut].decode())
+        encoded = encoded[cut:]
+    parts.append(encoded.decode())
+    return '\r\n '.join(parts) + '\r\n'
+
+
+def _utc(moment):
+    return moment.astimezone(dt_timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def _event(uid, date, start_time, end_time, shift_type, priority, stamp, completed=False):
+    start = timezone.make_aware(datetime.combine(date, start_time))
+    end = timezone.make_aware(datetime.combine(date, end_time))
+    if end <= start:
+        end += timedelta(days=1)
+    lines = [
+        'BEGIN:VEVENT',
+        f'UID:{uid}',
+        f'DTSTAMP:{_utc(stamp)}',
+        f'DTSTART:{_utc(start)}',
+        f'DTEND:{_utc(end)}',
+        f'SUMMARY:{_escape(f"{shift_type.title()} shift")}',
+        f'DESCRIPTION:{_escape(f"Priority: {priority.title()}")}',
+        'STATUS:CONFIRMED',
+    ]
+    if completed:
+        lines.append('X-PULSEPLANE-COMPLETED:TRUE')
+    lines.append('END:VEVENT')
+    return ''.join(_fold(line) for line in lines)
+
+
+def stream_feed(user):
+    """Yield the user's calendar as iCalendar text, one event at a time."""
+    start, end = feed_window()
+    yield ''.join(_fold(line) for line in (
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        f'PRODID:-//{settings.SITE_NAME}//Shifts//EN',
+        'CALSCALE:GREGORIAN',
+        'METHOD:PUBLISH',
+        f'X-WR-CALNAME:{_escape(f"{settings.SITE_NAME} shifts")}',
+    ))
+    rows = feed_shifts(user, start).exclude(date__isnull=True).order_by('date', 'start_time', 'id')
+    for row in rows.values(*EVENT_FIELDS).iterator(chunk_size=500):
+        yield _event(
+            f'scheduling-{row["id"]}@{settings.SITE_NAME.lower()}',
+            row['date'], row['start_time'], row['end_time'], row['shift_type'], row['priority'],
+            row['updated_at'], row['is_completed'],
+        )
+    for occurrence in expand(feed_templates(user), start, end):
+        template = occurrence.template
+        yield _event(
+            f'recurring-{template.pk}-{occurrence.date:%Y%m%d}@{settings.SITE_NAME.lower()}',
+            occurrence.date, template.start_time, template.end_time, template.shift_type, template.priority,
+            template.updated_at,
+        )
+    yield _fold('END:VCALENDAR')
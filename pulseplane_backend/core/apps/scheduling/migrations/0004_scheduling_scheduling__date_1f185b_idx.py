@@ -0,0 +1,17 @@
+# Generated by Django 4.2.16 on 2026-10-18 11:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scheduling', '0003_alter_scheduling_unique_together_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='scheduling',
+            index=models.Index(fields=['date', 'start_time', 'id'], name='scheduling__date_1f185b_idx'),
+        ),
+    ]
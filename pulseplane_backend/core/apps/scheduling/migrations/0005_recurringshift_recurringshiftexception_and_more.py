@@ -0,0 +1,76 @@
+# Generated by Django 4.2.16 on 2026-10-18 12:05
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0006_customuser_current_shifts_count'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('scheduling', '0004_scheduling_scheduling__date_1f185b_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecurringShift',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('shift_type', models.CharField(choices=[('MORNING', 'Morning'), ('AFTERNOON', 'Afternoon'), ('NIGHT', 'Night')], default='MORNING', max_length=10)),
+                ('priority', models.CharField(choices=[('HIGH', 'High'), ('MEDIUM', 'Medium'), ('LOW', 'Low')], default='MEDIUM', max_length=10)),
+                ('start_time', models.TimeField()),
+                ('end_time', models.TimeField()),
+                ('weekdays', models.PositiveSmallIntegerField()),
+                ('interval_weeks', models.PositiveSmallIntegerField(default=1)),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['start_date', 'start_time'],
+            },
+        ),
+        migrations.CreateModel(
+            name='RecurringShiftException',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='recurringshiftexception',
+            name='template',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='exceptions', to='scheduling.recurringshift'),
+        ),
+        migrations.AddField(
+            model_name='recurringshift',
+            name='company',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recurring_shifts', to='accounts.company'),
+        ),
+        migrations.AddField(
+            model_name='recurringshift',
+            name='user',
+            field=models.ManyToManyField(related_name='recurring_shifts', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='scheduling',
+            name='template',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='occurrences', to='scheduling.recurringshift'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='recurringshiftexception',
+            unique_together={('template', 'date')},
+        ),
+        migrations.AddIndex(
+            model_name='recurringshift',
+            index=models.Index(fields=['company', 'start_date', 'end_date'], name='scheduling__company_bc3b27_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='scheduling',
+            constraint=models.UniqueConstraint(condition=models.Q(('template__isnull', False)), fields=('template', 'date'), name='unique_recurring_occurrence'),
+        ),
+    ]
@@ -13,8 +13,51 @@ class PRIORITY_CHOICES(models.TextChoices):
     MEDIUM = 'MEDIUM', 'Medium'
     LOW = 'LOW', 'Low'
 
+class RecurringShift(models.Model):
+    """
+    A shift that repeats on the given weekdays every `interval_weeks` weeks
+    from start_date. Occurrences are expanded on read (see recurrence.py);
+    one only becomes a Scheduling row once it is edited or completed.
+    """
+    company = models.ForeignKey('accounts.Company', on_delete=models.CASCADE, related_name='recurring_shifts')
+    user = models.ManyToManyField(User, related_name='recurring_shifts')
+    shift_type = models.CharField(max_length=10, choices=SHIFT_TYPES.choices, default=SHIFT_TYPES.MORNING)
+    priority = models.CharField(max_length=10, choices=PRIORITY_CHOICES.choices, default=PRIORITY_CHOICES.MEDIUM)
+    start_time = models.TimeField()
+    end_time = models.TimeField()
+    # Bit n set = repeats on weekday n (0 = Monday).
+    weekdays = models.PositiveSmallIntegerField()
+    interval_weeks = models.PositiveSmallIntegerField(default=1)
+    start_date = models.DateField()
+    end_date = models.DateField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['start_date', 'start_time']
+        indexes = [
+            models.Index(fields=['company', 'start_date', 'end_date']),
+        ]
+
+    def __str__(self):
+        return f'{self.shift_type} every {self.interval_weeks} week(s) from {self.start_date}'
+
+class RecurringShiftException(models.Model):
+    """An occurrence of a recurring shift that was cancelled."""
+    template = models.ForeignKey(RecurringShift, on_delete=models.CASCADE, related_name='exceptions')
+    date = models.DateField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ['template', 'date']
+
+    def __str__(self):
+        return f'{self.template_id} skipped on {self.date}'
+
 class Scheduling(models.Model):
     user = models.ManyToManyField(User)
+    # Set on rows materialized from a recurring shift occurrence.
+    template = models.ForeignKey(RecurringShift, on_delete=models.SET_NULL, null=True, blank=True, related_name='occurrences')
     date = models.DateField(null=True, blank=True)
     shift_type = models.CharField(max_length=10, choices=SHIFT_TYPES.choices, default=SHIFT_TYPES.MORNING)
     priority = models.CharField(max_length=10, choices=PRIORITY_CHOICES.choices, default=PRIORITY_CHOICES.MEDIUM)
@@ -26,6 +69,24 @@ class Scheduling(models.Model):
 
     class Meta:
         ordering = ['date', 'start_time']
+        indexes = [
+            models.Index(fields=['date', 'start_time', 'id']),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['template', 'date'],
+                condition=models.Q(template__isnull=False),
+                name='unique_recurring_occurrence',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.date} - {self.shift_type}'
+class CalendarFeedToken(models.Model):
+    """Secret in a user's .ics feed URL; rotating or deleting it revokes the old URL."""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='calendar_feed')
+    token = models.CharField(max_length=64, unique=True)
+    created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
-        return f'{self.date} - {self.shift_type}'
\ No newline at end of file
+        return f'Calendar feed of {self.user.email}'
@@ -0,0 +1,79 @@
+"""
+Emails to assignees when their shifts are added or cancelled. Messages are
+queued in the outbox in the caller's transaction, or buffered as digest
+events when NOTIFICATION_DIGEST_WINDOW is set (see core.digests).
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models import Prefetch
+from core.digests import digests_enabled, record
+from core.models import NotificationEvent
+from core.outbox import enqueue_messages
+from .email_templates import scheduling_email, delete_scheduling_email
+from .models import Scheduling
+
+User = get_user_model()
+
+# Columns the templates read from each assignee.
+RECIPIENT_FIELDS = ('id', 'first_name', 'last_name', 'email')
+
+
+def shift_summary(scheduling):
+    """One line describing a shift, for digests."""
+    return (
+        f'{scheduling.get_shift_type_display()} shift on {scheduling.date}, '
+        f'{scheduling.start_time:%H:%M}-{scheduling.end_time:%H:%M} ({scheduling.get_priority_display()} priority)'
+    )
+
+
+def shift_event(user, scheduling, kind):
+    return NotificationEvent(user=user, kind=kind, key=f'scheduling:{scheduling.pk}', summary=shift_summary(scheduling))
+
+
+def shift_context(scheduling):
+    """The template fields every assignee of a shift shares."""
+    return {
+        'shift_type': scheduling.shift_type,
+        'date': scheduling.date,
+        'start_time': scheduling.start_time,
+        'end_time': scheduling.end_time,
+        'priority': scheduling.priority,
+        'site_name': settings.SITE_NAME,
+    }
+
+
+def scheduled_messages(scheduling, users):
+    """One message per assignee; the shift's part of the template is filled in once."""
+    template = scheduling_email.bind(**shift_context(scheduling))
+    return [template.message(user.email, full_name=user.full_name) for user in users]
+
+
+def removed_message(user, scheduling):
+    return delete_scheduling_email.message(user.email, full_name=user.full_name, **shift_context(scheduling))
+
+
+def notify_scheduled(shift_ids):
+    """
+    Notify every assignee of the given shifts: the shifts and their
+    assignees are loaded with one prefetched query and the messages (or
+    digest events) written with one INSERT, whether it is one shift or a
+    whole roster.
+    """
+    shifts = Scheduling.objects.filter(id__in=shift_ids).prefetch_related(
+        Prefetch('user', queryset=User.objects.only(*RECIPIENT_FIELDS))
+    )
+    if digests_enabled():
+        record([
+            shift_event(user, scheduling, NotificationEvent.Kind.SHIFT_ADDED)
+            for scheduling in shifts for user in scheduling.user.all()
+        ])
+    else:
+        enqueue_messages([message for scheduling in shifts for message in scheduled_messages(scheduling, scheduling.user.all())])
+
+
+def notify_removed(user, scheduling):
+    """Tell a user they were taken off a shift."""
+    if digests_enabled():
+        record([shift_event(user, scheduling, NotificationEvent.Kind.SHIFT_REMOVED)])
+    else:
+        enqueue_messages([removed_message(user, scheduling)])
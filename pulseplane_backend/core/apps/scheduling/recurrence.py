@@ -0,0 +1,132 @@
+"""
+Lazy expansion of recurring shifts.
+
+Only the RecurringShift rule is stored. Its occurrences in a date window
+are computed on read, minus cancelled dates (RecurringShiftException) and
+dates that were materialized into a Scheduling row because they were edited
+or completed. Storage stays O(templates) while a window costs three queries
+however many occurrences it contains.
+"""
+from dataclasses import dataclass
+from datetime import date as Date, time as Time, timedelta
+from django.db import transaction
+from django.db.models import Q
+from .models import Scheduling, RecurringShift, RecurringShiftException
+
+# Longest window a single expansion may cover.
+MAX_EXPANSION_DAYS = 366
+
+
+@dataclass
+class Occurrence:
+    """A not-yet-materialized occurrence of a recurring shift."""
+    template: RecurringShift
+    date: Date
+
+    @property
+    def key(self):
+        return f'r{self.template.pk}:{self.date.isoformat()}'
+
+    @property
+    def start_time(self) -> Time:
+        return self.template.start_time
+
+    @property
+    def end_time(self) -> Time:
+        return self.template.end_time
+
+    def user_ids(self):
+        return [user.pk for user in self.template.user.all()]
+
+
+def weekdays_mask(weekdays):
+    mask = 0
+    for weekday in weekdays:
+        mask |= 1 << weekday
+    return mask
+
+
+def mask_weekdays(mask):
+    return [weekday for weekday in range(7) if mask & (1 << weekday)]
+
+
+def rule_dates(template, start, end):
+    """Dates in [start, end] matched by a template's rule, ignoring exceptions."""
+    first = max(start, template.start_date)
+    last = min(end, template.end_date) if template.end_date else end
+    anchor = template.start_date - timedelta(days=template.start_date.weekday())
+    day = first
+    while day <= last:
+        weeks = (day - anchor).days // 7
+        if template.weekdays & (1 << day.weekday()) and weeks % template.interval_weeks == 0:
+            yield day
+        day += timedelta(days=1)
+
+
+def expand(templates, start, end, users='user'):
+    """
+    Virtual occurrences of `templates` (a RecurringShift queryset) between
+    start and end inclusive, sorted by date and start time. Assignees are
+    prefetched with `users` (a lookup or Prefetch), so reading them doesn't
+    query per occurrence.
+    """
+    templates = list(
+        templates.filter(Q(end_date__isnull=True) | Q(end_date__gte=start), start_date__lte=end).prefetch_related(users)
+    )
+    if not templates:
+        return []
+    ids = [template.pk for template in templates]
+    taken = set(RecurringShiftException.objects.filter(template_id__in=ids, date__range=(start, end)).values_list('template_id', 'date'))
+    taken.update(Scheduling.objects.filter(template_id__in=ids, date__range=(start, end)).values_list('template_id', 'date'))
+    occurrences = [
+        Occurrence(template, day)
+        for template in templates
+        for day in rule_dates(template, start, end)
+        if (template.pk, day) not in taken
+    ]
+    occurrences.sort(key=lambda occurrence: (occurrence.date, occurrence.start_time, occurrence.template.pk))
+    return occurrences
+
+
+def is_occurrence(template, day):
+    """Whether `day` is a pending (not cancelled or materialized) occurrence of the template."""
+    if not any(rule_dates(template, day, day)):
+        return False
+    if RecurringShiftException.objects.filter(template=template, date=day).exists():
+        return False
+    return not Scheduling.objects.filter(template=template, date=day).exists()
+
+
+def materialize(template, day):
+    """Turn an occurrence into a Scheduling row (idempotent); returns the row."""
+    with transaction.atomic():
+        scheduling, created = Scheduling.objects.get_or_create(
+            template=template,
+            date=day,
+            defaults={
+                'shift_type': template.shift_type,
+                'priority': template.priority,
+                'start_time': template.start_time,
+                'end_time': template.end_time,
+            },
+        )
+        if created:
+            scheduling.user.set(template.user.all())
+    return scheduling
+
+
+def occurrence_data(occurrence):
+    """Serialize a virtual occurrence in the same shape as SchedulingSerializer."""
+    template = occurrence.template
+    return {
+        'id': None,
+        'occurrence': occurrence.key,
+        'template': template.pk,
+        'date': occurrence.date,
+        'shift_type': template.shift_type,
+        'priority': template.priority,
+        'start_time': template.start_time,
+        'end_time': template.end_time,
+        'is_completed': False,
+        'user': occurrence.user_ids(),
+    }
@@ -0,0 +1,184 @@
+"""
+Automatic roster generation.
+
+A greedy heuristic with incremental scoring: slots (one per day, shift type
+and priority) are filled in priority order, and each slot takes the
+`required` best-scoring available employees. An employee is available when
+they are not on approved leave that day, have no overlapping shift
+(existing, recurring or already placed) and are below their no_of_shifts target,
+prorated to the length of the range. Each score is the employee's fill ratio
+against their target followed by tie-breakers that spread shift types and
+avoid a quick return after a night shift. Scores are kept as running
+counters and updated as each assignment is placed, so the whole roster costs
+O(slots × employees) and 500 employees over 30 days solve in well under a
+second. The result is written through the bulk path in bulk.create_shifts.
+"""
+import heapq
+from collections import defaultdict
+from datetime import time, timedelta
+from django.contrib.auth import get_user_model
+from core.apps.employee.models import LeaveManagement
+from .bulk import create_shifts
+from .conflicts import shift_interval, booked_shifts
+from .models import SHIFT_TYPES, PRIORITY_CHOICES
+
+User = get_user_model()
+
+DEFAULT_SHIFT_HOURS = {
+    SHIFT_TYPES.MORNING: (time(6), time(14)),
+    SHIFT_TYPES.AFTERNOON: (time(14), time(22)),
+    SHIFT_TYPES.NIGHT: (time(22), time(6)),
+}
+PRIORITY_ORDER = [PRIORITY_CHOICES.HIGH, PRIORITY_CHOICES.MEDIUM, PRIORITY_CHOICES.LOW]
+# no_of_shifts is a monthly target.
+TARGET_PERIOD_DAYS = 30
+MAX_ROSTER_DAYS = 62
+
+
+class Employee:
+    __slots__ = ('id', 'target', 'assigned', 'by_type', 'intervals', 'leave_days', 'night_days')
+
+    def __init__(self, user_id, target):
+        self.id = user_id
+        self.target = target
+        self.assigned = 0
+        self.by_type = defaultdict(int)
+        self.intervals = defaultdict(list)  # day -> [(start, end)]
+        self.leave_days = set()
+        self.night_days = set()
+
+    def available(self, day, interval):
+        if day in self.leave_days:
+            return False
+        if self.target is not None and self.assigned >= self.target:
+            return False
+        start, end = interval
+        return not any(
+            other_start < end and start < other_end
+            for offset in (-1, 0, 1)
+            for other_start, other_end in self.intervals.get(day + timedelta(days=offset), ())
+        )
+
+    def score(self, day, shift_type):
+        # Employees without a target are only used once everyone with one is full.
+        load = self.assigned / self.target if self.target else 1 + self.assigned
+        quick_return = shift_type != SHIFT_TYPES.NIGHT and day - timedelta(days=1) in self.night_days
+        return (round(load, 6), quick_return, self.by_type[shift_type], self.assigned, self.id)
+
+    def place(self, day, shift_type, interval):
+        self.assigned += 1
+        self.by_type[shift_type] += 1
+        self.intervals[day].append(interval)
+        if shift_type == SHIFT_TYPES.NIGHT:
+            self.night_days.add(day)
+
+
+def _load_employees(company, start_date, end_date, department=None, position=None):
+    users = User.objects.filter(company=company, is_manager=False, is_active=True)
+    if department:
+        users = users.filter(department=department)
+    if position:
+        users = users.filter(position=position)
+    days = (end_date - start_date).days + 1
+    employees = {
+        user_id: Employee(user_id, None if target is None else round(target * days / TARGET_PERIOD_DAYS))
+        for user_id, target in users.values_list('id', 'no_of_shifts')
+    }
+
+    leaves = LeaveManagement.objects.filter(
+        user_id__in=list(employees), date__range=(start_date, end_date), approved=True
+    ).values_list('user_id', 'date')
+    for user_id, day in leaves:
+        employees[user_id].leave_days.add(day)
+
+    # Existing shifts and pending recurring occurrences count against the
+    # target and block overlapping slots, including night shifts running
+    # into the range from the day before.
+    all_days = {start_date + timedelta(days=offset) for offset in range(days)}
+    for user_id, _, day, shift_type, start_time, end_time in booked_shifts(list(employees), all_days):
+        employee = employees[user_id]
+        employee.intervals[day].append(shift_interval(day, start_time, end_time))
+        if start_date <= day <= end_date:
+            employee.assigned += 1
+            employee.by_type[shift_type] += 1
+        if shift_type == SHIFT_TYPES.NIGHT:
+            employee.night_days.add(day)
+    return employees
+
+
+def build_roster(company, start_date, end_date, demand, department=None, position=None):
+    """
+    Plan a roster without writing it. `demand` is a list of dicts with
+    shift_type, required, and optionally priority, start_time and end_time
+    (defaulting to DEFAULT_SHIFT_HOURS), applied to every day of the range.
+    Returns (shifts, unfilled, employees): shift dicts ready for
+    create_shifts, the slots that could not be fully staffed, and the
+    per-employee state by user id.
+    """
+    employees = _load_employees(company, start_date, end_date, department, position)
+    days = [start_date + timedelta(days=offset) for offset in range((end_date - start_date).days + 1)]
+    slots = []
+    for day in days:
+        for item in demand:
+            default_start, default_end = DEFAULT_SHIFT_HOURS[item['shift_type']]
+            slots.append({
+                'date': day,
+                'shift_type': item['shift_type'],
+                'priority': item.get('priority') or PRIORITY_CHOICES.MEDIUM,
+                'start_time': item.get('start_time') or default_start,
+                'end_time': item.get('end_time') or default_end,
+                'required': item['required'],
+            })
+    # High-priority slots get first pick of the staff.
+    slots.sort(key=lambda slot: (PRIORITY_ORDER.index(slot['priority']), slot['date'], slot['start_time']))
+
+    shifts, unfilled = [], []
+    for slot in slots:
+        day = slot['date']
+        interval = shift_interval(day, slot['start_time'], slot['end_time'])
+        candidates = (employee for employee in employees.values() if employee.available(day, interval))
+        chosen = heapq.nsmallest(slot['required'], candidates, key=lambda employee: employee.score(day, slot['shift_type']))
+        for employee in chosen:
+            employee.place(day, slot['shift_type'], interval)
+        if chosen:
+            shifts.append({
+                'date': day,
+                'shift_type': slot['shift_type'],
+                'priority': slot['priority'],
+                'start_time': slot['start_time'],
+                'end_time': slot['end_time'],
+                'user': [employee.id for employee in chosen],
+            })
+        if len(chosen) < slot['required']:
+            unfilled.append({
+                'date': day,
+                'shift_type': slot['shift_type'],
+                'priority': slot['priority'],
+                'missing': slot['required'] - len(chosen),
+            })
+    shifts.sort(key=lambda shift: (shift['date'], shift['start_time']))
+    return shifts, unfilled, employees
+
+
+def load_summary(employees):
+    assigned = [employee.assigned for employee in employees.values()]
+    if not assigned:
+        return {'employees': 0, 'min': 0, 'max': 0, 'mean': 0}
+    return {
+        'employees': len(assigned),
+        'min': min(assigned),
+        'max': max(assigned),
+        'mean': round(sum(assigned) / len(assigned), 2),
+    }
+
+
+def generate_roster(company, start_date, end_date, demand, department=None, position=None, dry_run=False):
+    """Plan a roster and, unless dry_run, create it in one bulk transaction."""
+    shifts, unfilled, employees = build_roster(company, start_date, end_date, demand, department, position)
+    created = [] if dry_run else create_shifts(shifts)
+    return {
+        'shifts': shifts,
+        'created': [scheduling.pk for scheduling in created],
+        'unfilled': unfilled,
+        'load': load_summary(employees),
+    }
@@ -1,13 +1,232 @@
 from rest_framework import serializers
-from .models import Scheduling
+from rest_framework.relations import MANY_RELATION_KWARGS
+from .models import Scheduling, RecurringShift, RecurringShiftException, SHIFT_TYPES, PRIORITY_CHOICES
 from core.serializers import EmployeeSerializer
-class SchedulingSerializer(serializers.ModelSerializer):
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from .bulk import MAX_BULK_SHIFTS
+from .conflicts import find_conflicts, describe_conflicts
+from .roster import MAX_ROSTER_DAYS
+from .recurrence import MAX_EXPANSION_DAYS, weekdays_mask, mask_weekdays, rule_dates
+from datetime import timedelta
+from django.utils import timezone
+
+User = get_user_model()
+
+class BulkManyRelatedField(serializers.ManyRelatedField):
+    """Resolves a list of primary keys with one query instead of one per key."""
+
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, '__iter__'):
+            self.fail('not_a_list', input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail('empty')
+        child = self.child_relation
+        pks = []
+        for pk in data:
+            if isinstance(pk, bool):
+                child.fail('incorrect_type', data_type=type(pk).__name__)
+            try:
+                pks.append(int(pk))
+            except (TypeError, ValueError):
+                child.fail('incorrect_type', data_type=type(pk).__name__)
+        found = child.get_queryset().in_bulk(pks)
+        for pk in pks:
+            if pk not in found:
+                child.fail('does_not_exist', pk_value=pk)
+        return [found[pk] for pk in dict.fromkeys(pks)]
+
+class BulkPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_kwargs = {'child_relation': cls(*args, **kwargs)}
+        for key in kwargs:
+            if key in MANY_RELATION_KWARGS:
+                list_kwargs[key] = kwargs[key]
+        return BulkManyRelatedField(**list_kwargs)
+
+def lock_assignees(user_ids):
+    """Lock the assignees' rows, in id order as bulk.create_shifts does, until the transaction ends."""
+    list(User.objects.select_for_update().filter(id__in=user_ids).order_by('id').values_list('id', flat=True))
+
+class ShiftConflictMixin:
+    """
+    Reject a create/update that would double-book one of the shift's
+    assignees. The check runs in save(), inside the write's transaction and
+    with the assignees' rows locked as bulk.create_shifts does, so
+    concurrent requests for the same people can't both pass it.
+    """
+
+    def save(self, **kwargs):
+        with transaction.atomic():
+            self.check_conflicts(self.validated_data)
+            return super().save(**kwargs)
+
+    def check_conflicts(self, attrs):
+        users = attrs.get('user')
+        if users is not None and all(isinstance(user, User) for user in users):
+            user_ids = [user.pk for user in users]
+        elif self.instance is not None:
+            # Nested (detailed) payloads can't change assignees, so check the current ones.
+            user_ids = list(self.instance.user.values_list('id', flat=True))
+        else:
+            user_ids = []
+        lock_assignees(user_ids)
+        shift = {
+            field: attrs.get(field, getattr(self.instance, field, None))
+            for field in ('date', 'start_time', 'end_time')
+        }
+        conflicts = find_conflicts(
+            [dict(shift, user=user_ids)],
+            exclude_ids=[self.instance.pk] if self.instance is not None else (),
+        )
+        if conflicts:
+            raise serializers.ValidationError({'user': describe_conflicts(conflicts)})
+
+class SchedulingSerializer(ShiftConflictMixin, serializers.ModelSerializer):
+    serializer_related_field = BulkPrimaryKeyRelatedField
+
     class Meta:
         model = Scheduling
         fields = '__all__'
+        read_only_fields = ['template']
 
-class SchedulingDetailedSerializer(serializers.ModelSerializer):
+class SchedulingDetailedSerializer(ShiftConflictMixin, serializers.ModelSerializer):
     user = EmployeeSerializer(many=True)
     class Meta:
         model = Scheduling
         fields = '__all__'
+        read_only_fields = ['template']
+
+class SchedulingBulkItemSerializer(serializers.ModelSerializer):
+    # Plain ids: assignees are checked for the whole batch in one query by
+    # SchedulingBulkCreateSerializer rather than one lookup per shift.
+    user = serializers.ListField(child=serializers.IntegerField(), allow_empty=False)
+
+    class Meta:
+        model = Scheduling
+        fields = ['date', 'shift_type', 'priority', 'start_time', 'end_time', 'user']
+
+class SchedulingBulkCreateSerializer(serializers.Serializer):
+    shifts = SchedulingBulkItemSerializer(many=True, allow_empty=False)
+
+    def validate_shifts(self, shifts):
+        if len(shifts) > MAX_BULK_SHIFTS:
+            raise serializers.ValidationError(f'At most {MAX_BULK_SHIFTS} shifts can be created per request.')
+        user_ids = {user_id for shift in shifts for user_id in shift['user']}
+        company = self.context['request'].user.company
+        found = set(User.objects.filter(id__in=user_ids, company=company).values_list('id', flat=True))
+        missing = sorted(user_ids - found)
+        if missing:
+            raise serializers.ValidationError(f'Unknown users: {", ".join(map(str, missing))}')
+        return shifts
+
+class SchedulingCompleteSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.IntegerField(), required=False, allow_empty=False, max_length=MAX_BULK_SHIFTS)
+    date = serializers.DateField(required=False)
+    completed = serializers.BooleanField(default=True)
+
+    def validate(self, attrs):
+        if 'ids' not in attrs and 'date' not in attrs:
+            raise serializers.ValidationError('Pass the shift ids, a date, or both.')
+        return attrs
+
+class RosterDemandSerializer(serializers.Serializer):
+    shift_type = serializers.ChoiceField(choices=SHIFT_TYPES.choices)
+    required = serializers.IntegerField(min_value=1)
+    priority = serializers.ChoiceField(choices=PRIORITY_CHOICES.choices, required=False)
+    start_time = serializers.TimeField(required=False)
+    end_time = serializers.TimeField(required=False)
+
+class AutoRosterSerializer(serializers.Serializer):
+    start_date = serializers.DateField()
+    end_date = serializers.DateField()
+    demand = RosterDemandSerializer(many=True, allow_empty=False)
+    department = serializers.CharField(required=False)
+    position = serializers.CharField(required=False)
+    dry_run = serializers.BooleanField(default=False)
+
+    def validate(self, attrs):
+        days = (attrs['end_date'] - attrs['start_date']).days + 1
+        if days < 1:
+            raise serializers.ValidationError({'end_date': 'end_date must not be before start_date.'})
+        if days > MAX_ROSTER_DAYS:
+            raise serializers.ValidationError({'end_date': f'A roster can span at most {MAX_ROSTER_DAYS} days.'})
+        return attrs
+
+class WeekdaysField(serializers.Field):
+    """Weekday numbers (0 = Monday) in the API, a bitmask in the database."""
+
+    def to_representation(self, value):
+        return mask_weekdays(value)
+
+    def to_internal_value(self, data):
+        if not isinstance(data, list) or not data:
+            raise serializers.ValidationError('Expected a non-empty list of weekdays (0 = Monday).')
+        if not all(isinstance(day, int) and 0 <= day <= 6 for day in data):
+            raise serializers.ValidationError('Weekdays must be integers from 0 (Monday) to 6 (Sunday).')
+        return weekdays_mask(data)
+
+class RecurringShiftSerializer(serializers.ModelSerializer):
+    serializer_related_field = BulkPrimaryKeyRelatedField
+    weekdays = WeekdaysField()
+    interval_weeks = serializers.IntegerField(min_value=1, max_value=52, default=1)
+
+    # Changing any of these can move the template's occurrences onto other bookings.
+    RULE_FIELDS = {'user', 'start_time', 'end_time', 'weekdays', 'interval_weeks', 'start_date', 'end_date'}
+
+    class Meta:
+        model = RecurringShift
+        fields = '__all__'
+        read_only_fields = ['company']
+
+    def validate_user(self, users):
+        company_id = self.context['request'].user.company_id
+        if not company_id or any(user.company_id != company_id for user in users):
+            raise serializers.ValidationError('All assignees must belong to your company.')
+        return users
+
+    def validate(self, attrs):
+        start_date = attrs.get('start_date', getattr(self.instance, 'start_date', None))
+        end_date = attrs.get('end_date', getattr(self.instance, 'end_date', None))
+        if end_date and start_date and end_date < start_date:
+            raise serializers.ValidationError({'end_date': 'end_date must not be before start_date.'})
+        return attrs
+
+    def save(self, **kwargs):
+        # Checked inside the write's transaction with the assignees locked,
+        # like ShiftConflictMixin, so a concurrent shift or template for the
+        # same people can't slip in between the check and the save.
+        with transaction.atomic():
+            if self.instance is None or self.RULE_FIELDS.intersection(self.validated_data):
+                self.check_conflicts(self.validated_data)
+            return super().save(**kwargs)
+
+    def check_conflicts(self, attrs):
+        """
+        Reject a template whose upcoming occurrences (up to the expansion
+        horizon) would double-book an assignee, as the shift endpoints do.
+        """
+        rule = RecurringShift(**{
+            field: attrs.get(field, getattr(self.instance, field, None))
+            for field in ('start_time', 'end_time', 'weekdays', 'interval_weeks', 'start_date', 'end_date')
+        })
+        users = attrs['user'] if 'user' in attrs else (self.instance.user.all() if self.instance is not None else [])
+        user_ids = [user.pk for user in users]
+        if not user_ids or None in (rule.start_date, rule.start_time, rule.end_time, rule.weekdays):
+            return
+        lock_assignees(user_ids)
+        start = max(rule.start_date, timezone.localdate())
+        end = start + timedelta(days=MAX_EXPANSION_DAYS - 1)
+        days = set(rule_dates(rule, start, end))
+        if self.instance is not None:
+            # Cancelled and materialized dates are no longer occurrences of this template.
+            days -= set(RecurringShiftException.objects.filter(template=self.instance, date__range=(start, end)).values_list('date', flat=True))
+            days -= set(Scheduling.objects.filter(template=self.instance, date__range=(start, end)).values_list('date', flat=True))
+        shifts = [
+            {'date': day, 'start_time': rule.start_time, 'end_time': rule.end_time, 'user': user_ids}
+            for day in sorted(days)
+        ]
+        conflicts = find_conflicts(shifts, exclude_templates=[self.instance.pk] if self.instance is not None else ())
+        if conflicts:
+            raise serializers.ValidationError({'user': describe_conflicts(conflicts, label=lambda index: shifts[index]['date'])})
@@ -5,10 +5,29 @@ from .views import (
     SchedulingDetailedListCreateView, 
     SchedulingDetailedRetrieveUpdateDestroyView,
     SchedulingUserDeleteView,
-    SchedulingDetailedListCreateView2
+    SchedulingDetailedListCreateView2,
+    SchedulingBulkCreateView,
+    SchedulingCompleteView,
+    AutoRosterView,
+    RecurringShiftListCreateView,
+    RecurringShiftRetrieveUpdateDestroyView,
+    RecurringOccurrenceView,
+    SchedulingOccurrencesView,
+    SchedulingCalendarView,
+    SchedulingCoverageView,
+    CalendarFeedTokenView,
+    CalendarFeedView
 )
 urlpatterns = [
     path('schedules/', SchedulingListCreateView.as_view(), name='schedule-list-create'),
+    path('schedules/bulk/', SchedulingBulkCreateView.as_view(), name='schedule-bulk-create'),
+    path('schedules/complete/', SchedulingCompleteView.as_view(), name='schedule-complete'),
+    path('schedules/auto-roster/', AutoRosterView.as_view(), name='schedule-auto-roster'),
+    path('schedules/occurrences/', SchedulingOccurrencesView.as_view(), name='schedule-occurrences'),
+    path('schedules/calendar/', SchedulingCalendarView.as_view(), name='schedule-calendar'),
+    path('schedules/coverage/', SchedulingCoverageView.as_view(), name='schedule-coverage'),
+    path('schedules/calendar/feed/', CalendarFeedTokenView.as_view(), name='schedule-calendar-feed-token'),
+    path('schedules/calendar/feed/<str:token>.ics', CalendarFeedView.as_view(), name='schedule-calendar-feed'),
     path('schedules/<int:pk>/', SchedulingRetrieveUpdateDestroyView.as_view(), name='schedule-detail'),
 
     path('detailed-schedules/', SchedulingDetailedListCreateView.as_view(), name='detailed-schedule-list-create'),
@@ -17,4 +36,8 @@ urlpatterns = [
     path('detailed-schedules2/', SchedulingDetailedListCreateView2.as_view(), name='detailed-schedule-list-create2'),
 
     path('schedules/<int:pk>/delete-user/', SchedulingUserDeleteView.as_view(), name='schedule-user-delete'),
+
+    path('recurring-shifts/', RecurringShiftListCreateView.as_view(), name='recurring-shift-list-create'),
+    path('recurring-shifts/<int:pk>/', RecurringShiftRetrieveUpdateDestroyView.as_view(), name='recurring-shift-detail'),
+    path('recurring-shifts/<int:pk>/occurrences/<str:date>/', RecurringOccurrenceView.as_view(), name='recurring-shift-occurrence'),
 ]
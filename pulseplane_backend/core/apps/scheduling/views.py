@@ -1,46 +1,77 @@
-from rest_framework import generics, status
-from .models import Scheduling
-from .serializers import SchedulingSerializer, SchedulingDetailedSerializer
-from .email_templates import scheduling_template, delete_scheduling_template
-from django.conf import settings
-from core.utils import EmailThread
+from rest_framework import generics, status, permissions, views
+from drf_yasg.utils import swagger_auto_schema
+from drf_yasg import openapi
+from .models import Scheduling, RecurringShift, RecurringShiftException, CalendarFeedToken
+from .serializers import (
+    SchedulingSerializer, SchedulingDetailedSerializer, SchedulingBulkCreateSerializer, SchedulingCompleteSerializer,
+    AutoRosterSerializer, RecurringShiftSerializer,
+)
+from .bulk import create_shifts
+from .notifications import notify_scheduled, notify_removed
+from .completion import set_completed
+from .roster import generate_roster
+from .recurrence import expand, is_occurrence, materialize, occurrence_data, MAX_EXPANSION_DAYS
+from .ics import issue_token, feed_etag, stream_feed
+from .coverage import coverage_matrix
 from rest_framework.response import Response
+from collections import defaultdict
+from datetime import datetime, timedelta
+from django.db import transaction
+from django.shortcuts import get_object_or_404
+from django.http import StreamingHttpResponse, Http404
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+from django.db.models import Exists, OuterRef, Prefetch
+from rest_framework.exceptions import ValidationError
+from core.serializers import EmployeeSerializer
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
 
+# Unique sort key for keyset pagination, backed by the (date, start_time, id) index.
+SCHEDULING_ORDERING = ('date', 'start_time', 'id')
+
+# Columns EmployeeSerializer reads; assignee prefetches load only these.
+ASSIGNEE_FIELDS = (
+    'id', 'first_name', 'last_name', 'email', 'phone_number', 'department', 'position',
+    'gender', 'salary', 'no_of_shifts', 'current_shifts_count',
+)
+
+CALENDAR_FIELDS = ('id', 'date', 'shift_type', 'priority', 'start_time', 'end_time', 'is_completed', 'template')
+
+def assignees_prefetch(lookup='user'):
+    return Prefetch(lookup, queryset=User.objects.only(*ASSIGNEE_FIELDS))
+
 class SchedulingListCreateView(generics.ListCreateAPIView):
-    queryset = Scheduling.objects.all()
+    queryset = Scheduling.objects.prefetch_related('user')
     serializer_class = SchedulingSerializer
+    keyset_ordering = SCHEDULING_ORDERING
 
     def perform_create(self, serializer):
-        scheduling = serializer.save()
-        users = scheduling.user.all()
-        for user in users:
-            self.send_email_to_user(user, scheduling)
-
-    def send_email_to_user(self, user, scheduling):
-        subject = f'Scheduled Shift: {scheduling.shift_type} on {scheduling.date}'
-        message = scheduling_template.format(
-            full_name=user.full_name,
-            shift_type=scheduling.shift_type,
-            date=scheduling.date,
-            start_time=scheduling.start_time,
-            end_time=scheduling.end_time,
-            priority=scheduling.priority,
-            site_name=settings.SITE_NAME
-        )
-        recipient_list = [user.email]
-        email_thread = EmailThread(subject, message, recipient_list)
-        email_thread.start()
+        with transaction.atomic():
+            scheduling = serializer.save()
+            notify_scheduled([scheduling.pk])
 
 class SchedulingRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
     queryset = Scheduling.objects.all()
     serializer_class = SchedulingSerializer
 
 class SchedulingDetailedListCreateView(generics.ListCreateAPIView):
-    queryset = Scheduling.objects.all()
     serializer_class = SchedulingDetailedSerializer
+    keyset_ordering = SCHEDULING_ORDERING
+
+    def get_queryset(self):
+        queryset = Scheduling.objects.prefetch_related(assignees_prefetch())
+        params = self.request.query_params
+        try:
+            if 'start_date' in params:
+                queryset = queryset.filter(date__gte=datetime.strptime(params['start_date'], '%Y-%m-%d').date())
+            if 'end_date' in params:
+                queryset = queryset.filter(date__lte=datetime.strptime(params['end_date'], '%Y-%m-%d').date())
+        except ValueError:
+            raise ValidationError({'error': 'Invalid date format'})
+        return queryset
 
 class SchedulingDetailedRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
     queryset = Scheduling.objects.all()
@@ -58,7 +89,7 @@ class SchedulingUserDeleteView(generics.DestroyAPIView):
             scheduling = Scheduling.objects.get(id=scheduling_id)
             user = User.objects.get(id=user_id)
             scheduling.user.remove(user)
-            self.send_delete_email(user, scheduling)
+            notify_removed(user, scheduling)
             if scheduling.user.count() == 0:
                 scheduling.delete()
                 return Response(
@@ -71,26 +102,335 @@ class SchedulingUserDeleteView(generics.DestroyAPIView):
         except User.DoesNotExist:
             return Response({"error": "User not found."}, status=status.HTTP_404_NOT_FOUND)
 
-    def send_delete_email(self, user, scheduling):
-        subject = f'Scheduling Update: Removed from Shift on {scheduling.date}'
-        message = delete_scheduling_template.format(
-            full_name=user.full_name,
-            shift_type=scheduling.shift_type,
-            date=scheduling.date,
-            start_time=scheduling.start_time,
-            end_time=scheduling.end_time,
-            site_name=settings.SITE_NAME
-        )
-        recipient_list = [user.email]
-        email_thread = EmailThread(subject, message, recipient_list)
-        email_thread.start()
-
 class SchedulingDetailedListCreateView2(generics.ListCreateAPIView):
     serializer_class = SchedulingDetailedSerializer
+    keyset_ordering = SCHEDULING_ORDERING
 
     def get_queryset(self):
         user = self.request.user
-        return Scheduling.objects.filter(user=user)
+        return Scheduling.objects.filter(user=user).prefetch_related('user')
 
     def perform_create(self, serializer):
         serializer.save(user=[self.request.user])
+
+
+class SchedulingBulkCreateView(generics.GenericAPIView):
+    serializer_class = SchedulingBulkCreateSerializer
+
+    def post(self, request):
+        if not request.user.is_manager and not request.user.is_staff:
+            return Response({"error": "Not authorized to create schedules."}, status=status.HTTP_403_FORBIDDEN)
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        shifts = serializer.validated_data['shifts']
+        created = create_shifts(shifts)
+        return Response({
+            "created": len(created),
+            "assignments": sum(len(set(shift['user'])) for shift in shifts),
+            "ids": [scheduling.pk for scheduling in created],
+        }, status=status.HTTP_201_CREATED)
+
+class SchedulingCompleteView(generics.GenericAPIView):
+    """
+    Mark shifts completed (or, with completed=false, reopen them) by id
+    and/or for a whole day, updating the assignees' shift counters in one
+    statement for the batch.
+    """
+    serializer_class = SchedulingCompleteSerializer
+
+    def post(self, request):
+        if not request.user.is_manager and not request.user.is_staff:
+            return Response({"error": "Not authorized to complete schedules."}, status=status.HTTP_403_FORBIDDEN)
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        # Shifts have no company column; they belong to the company of their assignees.
+        shifts = Scheduling.objects.filter(id__in=Scheduling.user.through.objects.filter(
+            customuser__company=request.user.company,
+        ).values('scheduling_id'))
+        if 'ids' in data:
+            shifts = shifts.filter(id__in=data['ids'])
+        if 'date' in data:
+            shifts = shifts.filter(date=data['date'])
+        changed = set_completed(shifts, data['completed'])
+        return Response({"completed": data['completed'], "updated": len(changed), "ids": changed})
+
+
+class AutoRosterView(generics.GenericAPIView):
+    serializer_class = AutoRosterSerializer
+
+    def post(self, request):
+        if not request.user.is_manager and not request.user.is_staff:
+            return Response({"error": "Not authorized to create schedules."}, status=status.HTTP_403_FORBIDDEN)
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        result = generate_roster(
+            request.user.company,
+            data['start_date'],
+            data['end_date'],
+            data['demand'],
+            department=data.get('department'),
+            position=data.get('position'),
+            dry_run=data['dry_run'],
+        )
+        return Response({
+            "dry_run": data['dry_run'],
+            "shifts": result['shifts'] if data['dry_run'] else len(result['shifts']),
+            "created": result['created'],
+            "assignments": sum(len(shift['user']) for shift in result['shifts']),
+            "unfilled": result['unfilled'],
+            "load": result['load'],
+        }, status=status.HTTP_200_OK if data['dry_run'] else status.HTTP_201_CREATED)
+
+
+def parse_window(params, default_days=30):
+    """(start, end) dates from ?start_date=&end_date=, or raise ValueError with a message."""
+    try:
+        start_date = datetime.strptime(params['start_date'], '%Y-%m-%d').date() if 'start_date' in params else datetime.now().date()
+        end_date = datetime.strptime(params['end_date'], '%Y-%m-%d').date() if 'end_date' in params else start_date + timedelta(days=default_days)
+    except ValueError:
+        raise ValueError('Invalid date format')
+    if start_date > end_date:
+        raise ValueError('start_date must be before end_date')
+    if (end_date - start_date).days >= MAX_EXPANSION_DAYS:
+        raise ValueError(f'The window can span at most {MAX_EXPANSION_DAYS} days')
+    return start_date, end_date
+
+class RecurringShiftListCreateView(generics.ListCreateAPIView):
+    serializer_class = RecurringShiftSerializer
+
+    def get_queryset(self):
+        return RecurringShift.objects.filter(company=self.request.user.company).prefetch_related('user')
+
+    def perform_create(self, serializer):
+        serializer.save(company=self.request.user.company)
+
+class RecurringShiftRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
+    serializer_class = RecurringShiftSerializer
+
+    def get_queryset(self):
+        return RecurringShift.objects.filter(company=self.request.user.company).prefetch_related('user')
+
+class RecurringOccurrenceView(generics.GenericAPIView):
+    """
+    Edit (PATCH) or cancel (DELETE) one occurrence of a recurring shift. An
+    edit, including marking it completed, materializes the occurrence into
+    a Scheduling row first; later edits go to that row.
+    """
+    serializer_class = SchedulingSerializer
+
+    def get_template(self):
+        return get_object_or_404(RecurringShift, pk=self.kwargs['pk'], company=self.request.user.company)
+
+    def get_date(self):
+        try:
+            return datetime.strptime(self.kwargs['date'], '%Y-%m-%d').date()
+        except ValueError:
+            return None
+
+    def patch(self, request, pk, date):
+        template, day = self.get_template(), self.get_date()
+        scheduling = Scheduling.objects.filter(template=template, date=day).first() if day else None
+        if scheduling is None and not (day and is_occurrence(template, day)):
+            return Response({"error": "No such occurrence."}, status=status.HTTP_404_NOT_FOUND)
+        with transaction.atomic():
+            scheduling = scheduling or materialize(template, day)
+            serializer = self.get_serializer(scheduling, data=request.data, partial=True)
+            serializer.is_valid(raise_exception=True)
+            serializer.save()
+        return Response(serializer.data)
+
+    def delete(self, request, pk, date):
+        template, day = self.get_template(), self.get_date()
+        scheduling = Scheduling.objects.filter(template=template, date=day).first() if day else None
+        if scheduling is None and not (day and is_occurrence(template, day)):
+            return Response({"error": "No such occurrence."}, status=status.HTTP_404_NOT_FOUND)
+        with transaction.atomic():
+            if scheduling is not None:
+                scheduling.delete()
+            RecurringShiftException.objects.get_or_create(template=template, date=day)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+class SchedulingOccurrencesView(generics.GenericAPIView):
+    """
+    Shifts in a date window: stored Scheduling rows plus the pending
+    occurrences of the company's recurring shifts, expanded on the fly.
+    """
+    serializer_class = SchedulingSerializer
+
+    def get(self, request):
+        try:
+            start_date, end_date = parse_window(request.query_params)
+        except ValueError as error:
+            return Response({"error": str(error)}, status=status.HTTP_400_BAD_REQUEST)
+        company = request.user.company
+        stored = Scheduling.objects.filter(
+            id__in=Scheduling.objects.filter(date__range=(start_date, end_date), user__company=company).values('id')
+        ).prefetch_related('user')
+        shifts = list(self.get_serializer(stored, many=True).data)
+        templates = RecurringShift.objects.filter(company=company)
+        shifts.extend(occurrence_data(occurrence) for occurrence in expand(templates, start_date, end_date))
+        shifts.sort(key=lambda shift: (str(shift['date']), str(shift['start_time'])))
+        return Response({"start_date": start_date, "end_date": end_date, "shifts": shifts})
+
+
+class SchedulingCalendarView(generics.GenericAPIView):
+    """
+    Shifts with their assignees for a date window, optionally narrowed to
+    shifts with an assignee in a department/position or a given user.
+    Stored shifts and pending recurring occurrences are both included, in a
+    fixed number of queries however many shifts or assignees there are.
+    """
+    serializer_class = SchedulingDetailedSerializer
+
+    @swagger_auto_schema(
+        manual_parameters=[
+            openapi.Parameter('start_date', openapi.IN_QUERY, description="First day (YYYY-MM-DD), defaults to today", type=openapi.TYPE_STRING, format='date'),
+            openapi.Parameter('end_date', openapi.IN_QUERY, description="Last day (YYYY-MM-DD), defaults to 30 days later", type=openapi.TYPE_STRING, format='date'),
+            openapi.Parameter('department', openapi.IN_QUERY, description="Only shifts with an assignee in this department", type=openapi.TYPE_STRING),
+            openapi.Parameter('position', openapi.IN_QUERY, description="Only shifts with an assignee in this position", type=openapi.TYPE_STRING),
+            openapi.Parameter('user', openapi.IN_QUERY, description="Only shifts assigned to this user id", type=openapi.TYPE_INTEGER),
+        ]
+    )
+    def get(self, request):
+        try:
+            start_date, end_date = parse_window(request.query_params)
+        except ValueError as error:
+            return Response({"error": str(error)}, status=status.HTTP_400_BAD_REQUEST)
+        params = request.query_params
+        assignees = {'company': request.user.company}
+        if params.get('department'):
+            assignees['department'] = params['department']
+        if params.get('position'):
+            assignees['position'] = params['position']
+        if params.get('user'):
+            if not params['user'].isdigit():
+                return Response({"error": "user must be an id"}, status=status.HTTP_400_BAD_REQUEST)
+            assignees['id'] = int(params['user'])
+        matching = User.objects.filter(**assignees)
+
+        # An uncorrelated IN (rather than a join) so a shift with several
+        # matching assignees is returned once, bounded to the window so it
+        # never walks the assignees' whole history.
+        stored = Scheduling.objects.filter(
+            id__in=Scheduling.user.through.objects.filter(
+                customuser__in=matching, scheduling__date__range=(start_date, end_date),
+            ).values('scheduling_id'),
+            date__range=(start_date, end_date),
+        )
+        templates = RecurringShift.objects.filter(
+            Exists(RecurringShift.user.through.objects.filter(recurringshift=OuterRef('pk'), customuser__in=matching)),
+            company=request.user.company,
+        )
+        # Plain rows instead of model instances: a month of shifts for a
+        # large team is tens of thousands of rows.
+        rows = list(stored.values(*CALENDAR_FIELDS))
+        assigned = defaultdict(list)
+        for scheduling_id, user_id in Scheduling.user.through.objects.filter(
+            scheduling_id__in=[row['id'] for row in rows]
+        ).order_by('id').values_list('scheduling_id', 'customuser_id'):
+            assigned[scheduling_id].append(user_id)
+        occurrences = expand(templates, start_date, end_date, users=Prefetch('user', queryset=User.objects.only('id')))
+
+        # The same people work many shifts in a window, so each assignee is
+        # serialized once and shared between the shifts they appear on.
+        user_ids = {user_id for ids in assigned.values() for user_id in ids}
+        user_ids.update(user_id for occurrence in occurrences for user_id in occurrence.user_ids())
+        people = {
+            person['id']: person
+            for person in EmployeeSerializer(User.objects.filter(id__in=user_ids).only(*ASSIGNEE_FIELDS), many=True).data
+        }
+
+        shifts = [
+            dict(
+                row,
+                date=row['date'].isoformat() if row['date'] else None,
+                start_time=row['start_time'].isoformat(),
+                end_time=row['end_time'].isoformat(),
+                occurrence=None,
+                user=[people[user_id] for user_id in assigned[row['id']]],
+            )
+            for row in rows
+        ]
+        for occurrence in occurrences:
+            shift = occurrence_data(occurrence)
+            shift.update(
+                date=occurrence.date.isoformat(),
+                start_time=occurrence.start_time.isoformat(),
+                end_time=occurrence.end_time.isoformat(),
+                user=[people[user_id] for user_id in shift['user']],
+            )
+            shifts.append(shift)
+        shifts.sort(key=lambda shift: (shift['date'] or '', shift['start_time']))
+        return Response({"start_date": start_date, "end_date": end_date, "shifts": shifts})
+
+
+class SchedulingCoverageView(views.APIView):
+    """
+    Date × shift type coverage for a window: people assigned, how many of
+    them are on approved leave, and how many of the team are on leave each
+    day, as parallel lists indexed like `dates`.
+    """
+
+    @swagger_auto_schema(
+        manual_parameters=[
+            openapi.Parameter('start_date', openapi.IN_QUERY, description="First day (YYYY-MM-DD), defaults to today", type=openapi.TYPE_STRING, format='date'),
+            openapi.Parameter('end_date', openapi.IN_QUERY, description="Last day (YYYY-MM-DD), defaults to 30 days later", type=openapi.TYPE_STRING, format='date'),
+            openapi.Parameter('department', openapi.IN_QUERY, description="Only count employees in this department", type=openapi.TYPE_STRING),
+        ]
+    )
+    def get(self, request):
+        if not request.user.is_manager and not request.user.is_staff:
+            return Response({"error": "Not authorized to view coverage."}, status=status.HTTP_403_FORBIDDEN)
+        try:
+            start_date, end_date = parse_window(request.query_params)
+        except ValueError as error:
+            return Response({"error": str(error)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(coverage_matrix(
+            request.user.company, start_date, end_date, department=request.query_params.get('department') or None,
+        ))
+
+class CalendarFeedTokenView(views.APIView):
+    """The current user's .ics feed URL: GET shows it, POST creates or rotates it, DELETE revokes it."""
+
+    def feed_response(self, request, feed):
+        url = request.build_absolute_uri(reverse('schedule-calendar-feed', kwargs={'token': feed.token}))
+        return {"url": url, "created_at": feed.created_at}
+
+    def get(self, request):
+        feed = CalendarFeedToken.objects.filter(user=request.user).first()
+        if feed is None:
+            return Response({"error": "No calendar feed. POST to create one."}, status=status.HTTP_404_NOT_FOUND)
+        return Response(self.feed_response(request, feed))
+
+    def post(self, request):
+        return Response(self.feed_response(request, issue_token(request.user)), status=status.HTTP_201_CREATED)
+
+    def delete(self, request):
+        CalendarFeedToken.objects.filter(user=request.user).delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+class CalendarFeedView(views.APIView):
+    """
+    A user's shifts as an iCalendar feed, authenticated by the secret token
+    in the URL so calendar apps can subscribe to it. Polls of an unchanged
+    feed get a 304 from the ETag alone; otherwise the feed is
+    streamed.
+    """
+    authentication_classes = []
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request, token):
+        feed = CalendarFeedToken.objects.select_related('user').filter(token=token).first()
+        if feed is None or not feed.user.is_active:
+            raise Http404
+        etag = quote_etag(feed_etag(feed.user))
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = StreamingHttpResponse(stream_feed(feed.user), content_type='text/calendar; charset=utf-8')
+            response['Content-Disposition'] = 'inline; filename="shifts.ics"'
+        response['ETag'] = etag
+        # Revalidate on every poll, never serve a stale copy from a shared cache.
+        response['Cache-Control'] = 'private, no-cache'
+        return response
@@ -0,0 +1,157 @@
+"""
+Helpers for the benchmark_* management commands. Benchmarks seed synthetic
+data inside a transaction that is always rolled back, so they are safe to run
+against any database, including a staging copy of production.
+"""
+import socketserver
+import threading
+import time
+from contextlib import contextmanager
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory, force_authenticate
+from accounts.models import Company, GenderChoices, UserRoles
+
+User = get_user_model()
+
+POSITIONS = ['Nurse', 'Doctor', 'Technician', 'Receptionist', 'Pharmacist']
+DEPARTMENTS = ['Emergency', 'Surgery', 'Pediatrics', 'Radiology']
+GENDERS = [choice for choice, _ in GenderChoices.choices]
+
+
+class Rollback(Exception):
+    pass
+
+
+@contextmanager
+def rolled_back():
+    """Run the block in a transaction that is discarded afterwards."""
+    try:
+        with transaction.atomic():
+            yield
+            raise Rollback
+    except Rollback:
+        pass
+
+
+def seed_company(employees, name='Benchmark Co'):
+    """Create a company with one manager and `employees` staff users. Returns (company, manager, staff ids)."""
+    company = Company.objects.create(name=name)
+    password = make_password(None)
+    manager = User.objects.create(
+        email=f'manager@{company.pk}.bench', password=password, company=company,
+        is_manager=True, role=UserRoles.ADMIN, is_otp_verified=True,
+    )
+    User.objects.bulk_create([
+        User(
+            email=f'employee{i}@{company.pk}.bench',
+            password=password,
+            first_name='Employee',
+            last_name=str(i),
+            company=company,
+            role=UserRoles.STAFF,
+            is_otp_verified=True,
+            position=POSITIONS[i % len(POSITIONS)],
+            department=DEPARTMENTS[i % len(DEPARTMENTS)],
+            gender=GENDERS[i % len(GENDERS)],
+            salary=30000 + (i % 10) * 1000,
+            no_of_shifts=24,
+            current_shifts_count=i % 30,
+        )
+        for i in range(employees)
+    ], batch_size=1000)
+    staff_ids = list(User.objects.filter(company=company, is_manager=False).values_list('id', flat=True))
+    return company, manager, staff_ids
+
+
+def run_view(view, user, params=None, method='get', data=None, **kwargs):
+    """Call a DRF view as `user`. Returns (response, query count, elapsed seconds)."""
+    factory = APIRequestFactory()
+    if method == 'get':
+        request = factory.get('/', params or {})
+    else:
+        request = getattr(factory, method)('/', data or {}, format='json')
+    force_authenticate(request, user=user)
+    with CaptureQueriesContext(connection) as queries:
+        started = time.perf_counter()
+        response = view(request, **kwargs)
+        if hasattr(response, 'render'):
+            response.render()
+        elapsed = time.perf_counter() - started
+    return response, len(queries), elapsed
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(line.encode() + b'\r\n')
+
+    def handle(self):
+        self.reply('220 sink ready')
+        for line in self.rfile:
+            command = line[:4].upper()
+            if command == b'EHLO':
+                self.reply('250-sink')
+                self.reply('250 8BITMIME')
+            elif command == b'DATA':
+                self.reply('354 end with .')
+                for data in self.rfile:
+                    if data in (b'.\r\n', b'.\n'):
+                        break
+                if self.server.delay:
+                    time.sleep(self.server.delay)
+                self.server.delivered()
+                self.reply('250 queued')
+            elif command == b'QUIT':
+                self.reply('221 bye')
+                return
+            elif command in (b'HELO', b'MAIL', b'RCPT', b'RSET', b'NOOP'):
+                self.reply('250 OK')
+            else:
+                self.reply('502 not implemented')
+
+
+class SMTPSink(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    """
+    A minimal SMTP server on localhost that accepts and discards everything,
+    counting messages and connections. `delay` (seconds) is added to every
+    message to stand in for a real relay. Its threads are all named
+    'smtp-sink' so thread counts can leave them out.
+    """
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, delay=0):
+        super().__init__(('127.0.0.1', 0), _SMTPHandler)
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.messages = self.connections = 0
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def delivered(self):
+        with self.lock:
+            self.messages += 1
+
+    def process_request(self, request, client_address):
+        with self.lock:
+            self.connections += 1
+        threading.Thread(
+            target=self.process_request_thread, args=(request, client_address), name='smtp-sink', daemon=True,
+        ).start()
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, kwargs={'poll_interval': 0.05}, name='smtp-sink', daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+        self.server_close()
+
+
+def app_threads():
+    """Live threads other than the SMTP sink's."""
+    return sum(1 for thread in threading.enumerate() if thread.name != 'smtp-sink')
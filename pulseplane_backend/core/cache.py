@@ -0,0 +1,94 @@
+"""
+Versioned response cache for the dashboard and analytics endpoints.
+
+Data versions and hit/miss counters are counters in the shared cache. Only
+Redis increments them atomically; on the file based fallback incr() is a
+get and a set, so concurrent increments can be lost. A lost version bump is
+still a bump, and the stats are approximate there: exact counters need
+Redis, as they do for accounts.otp.
+"""
+import hashlib
+import json
+import time
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+CACHED_ENDPOINTS = ('dashboard', 'dashboard-graph', 'dashboard-time-series', 'wellness-analytics')
+
+
+def _version_key(company_id):
+    return f'company:{company_id}:data-version'
+
+
+def _stats_key(endpoint, outcome):
+    return f'cache-stats:{endpoint}:{outcome}'
+
+
+def _incr(key):
+    try:
+        value = cache.incr(key)
+    except ValueError:
+        # Missing key; add() loses the race gracefully if another worker created it first.
+        if cache.add(key, 1, timeout=None):
+            return 1
+        value = cache.incr(key)
+    # Backends without a native incr write the key back with the default
+    # timeout, which would expire the counter (and, for a data version,
+    # every entry stored under it) a few minutes after the first increment.
+    cache.touch(key, None)
+    return value
+
+
+def data_version(company_id):
+    """
+    Current data version of a company. A missing counter (first use or
+    eviction) is seeded from the clock so it can never collide with a version
+    that older cache entries were stored under.
+    """
+    key = _version_key(company_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, int(time.time() * 1000), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_data_version(company_id):
+    """Invalidate every cached response of a company once the current transaction commits."""
+    if not company_id:
+        return
+    transaction.on_commit(lambda: _incr(_version_key(company_id)))
+
+
+def cached_response(endpoint, company_id, params, compute, timeout=None):
+    """
+    Return compute() through the shared cache. Entries are keyed by endpoint,
+    company, data version and request params, so a version bump makes every
+    previous entry unreachable and no explicit deletes are needed.
+    """
+    digest = hashlib.md5(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()
+    key = f'{endpoint}:{company_id}:v{data_version(company_id)}:{digest}'
+    value = cache.get(key)
+    if value is not None:
+        _incr(_stats_key(endpoint, 'hits'))
+        return value
+    _incr(_stats_key(endpoint, 'misses'))
+    value = compute()
+    if timeout is None:
+        timeout = settings.DASHBOARD_CACHE_TIMEOUT
+    cache.set(key, value, timeout)
+    return value
+
+
+def cache_stats():
+    stats = {}
+    for endpoint in CACHED_ENDPOINTS:
+        hits = cache.get(_stats_key(endpoint, 'hits')) or 0
+        misses = cache.get(_stats_key(endpoint, 'misses')) or 0
+        stats[endpoint] = {'hits': hits, 'misses': misses}
+    return stats
+
+
+def reset_cache_stats():
+    cache.delete_many([_stats_key(endpoint, outcome) for endpoint in CACHED_ENDPOINTS for outcome in ('hits', 'misses')])
@@ -0,0 +1,102 @@
+"""
+Notification digests.
+
+With NOTIFICATION_DIGEST_WINDOW set (in seconds), schedule and leave
+changes are not mailed one by one. Each change is stored as a
+NotificationEvent. Once a user's oldest pending event is a window old,
+everything pending for them is merged into one email. A shift added and
+cancelled again within the window cancels out, and for anything else only
+the latest change to an item is reported. The send_outbox worker calls
+flush_digests() as it polls, so re-planning a week for 200 people sends
+200 emails rather than one per edited shift and person.
+"""
+from collections import defaultdict
+from datetime import timedelta
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Min
+from django.utils import timezone
+from .email_templates import digest_email
+from .models import NotificationEvent
+from .outbox import enqueue_messages
+
+User = get_user_model()
+
+# Pairs of kinds that undo each other when they are the first and last change to an item.
+INVERSE_KINDS = {
+    NotificationEvent.Kind.SHIFT_ADDED: NotificationEvent.Kind.SHIFT_REMOVED,
+    NotificationEvent.Kind.SHIFT_REMOVED: NotificationEvent.Kind.SHIFT_ADDED,
+}
+
+
+def digests_enabled():
+    return settings.NOTIFICATION_DIGEST_WINDOW > 0
+
+
+def record(events):
+    """Buffer NotificationEvents (unsaved instances) with one INSERT."""
+    NotificationEvent.objects.bulk_create(events, batch_size=1000)
+
+
+def coalesce(events):
+    """The events worth reporting from one user's events, given oldest first."""
+    by_key = defaultdict(list)
+    for event in events:
+        by_key[event.key].append(event)
+    kept = []
+    for changes in by_key.values():
+        first, last = changes[0], changes[-1]
+        if INVERSE_KINDS.get(first.kind) == last.kind:
+            continue
+        kept.append(last)
+    kept.sort(key=lambda event: (event.created_at, event.pk))
+    return kept
+
+
+def digest_message(user, events):
+    sections = []
+    for kind, label in NotificationEvent.Kind.choices:
+        lines = [f'- {event.summary}' for event in events if event.kind == kind]
+        if lines:
+            sections.append(f'{label}:\n' + '\n'.join(lines) + '\n')
+    count = len(events)
+    return digest_email.message(
+        user.email,
+        full_name=user.full_name,
+        updates=f'{count} schedule update{"s" if count != 1 else ""}',
+        sections='\n'.join(sections),
+        site_name=settings.SITE_NAME,
+    )
+
+
+def flush_digests(now=None):
+    """
+    Queue one digest per user whose oldest pending event is at least a
+    window old, and drop the events it covers. Returns the number of
+    digests queued.
+    """
+    now = now or timezone.now()
+    cutoff = now - timedelta(seconds=settings.NOTIFICATION_DIGEST_WINDOW)
+    due = NotificationEvent.objects.values('user').annotate(first=Min('created_at')).filter(first__lte=cutoff)
+    with transaction.atomic():
+        # Rows locked by a concurrent flush are left to it.
+        events = list(
+            NotificationEvent.objects.select_for_update(skip_locked=True)
+            .filter(user__in=due.values('user'), created_at__lte=now)
+            .order_by('user_id', 'created_at', 'id')
+        )
+        if not events:
+            return 0
+        pending = defaultdict(list)
+        for event in events:
+            pending[event.user_id].append(event)
+        users = User.objects.only('id', 'first_name', 'last_name', 'email').in_bulk(list(pending))
+        messages = []
+        for user_id, user_events in pending.items():
+            kept = coalesce(user_events)
+            if kept and user_id in users:
+                messages.append(digest_message(users[user_id], kept))
+        enqueue_messages(messages)
+        NotificationEvent.objects.filter(id__in=[event.pk for event in events]).delete()
+    return len(messages)
@@ -0,0 +1,213 @@
+"""
+A bounded pool of SMTP sender threads.
+
+One EmailExecutor per process (see get_executor()) owns every outgoing SMTP
+connection. Each sender thread keeps its own connection open while there
+is work and closes it after idle_seconds without any. Messages wait in a
+queue of at most queue_size entries. When the queue is full, submit()
+applies the overflow policy:
+- 'block' waits for room, which slows the caller down to the send rate.
+- 'reject' returns False at once so the caller can put the item back.
+Results are handed back through finished(), so the caller does its own
+bookkeeping (database writes stay on the caller's thread). stats() reports
+queued, in-flight, sent, failed and rejected counts and the mean latency
+from submit to sent.
+"""
+import queue
+import threading
+import time
+from smtplib import SMTPException, SMTPServerDisconnected
+from django.conf import settings
+from django.core.mail import get_connection
+
+OVERFLOW_POLICIES = ('block', 'reject')
+
+
+class SMTPUnavailable(Exception):
+    """The SMTP server could not be reached; the message itself was never tried."""
+
+
+class _Connection:
+    def __init__(self):
+        self.connection = None
+
+    def open(self):
+        if self.connection is None:
+            try:
+                connection = get_connection(fail_silently=False)
+                connection.open()
+            except (OSError, SMTPException) as error:
+                raise SMTPUnavailable(error) from error
+            self.connection = connection
+
+    def close(self):
+        if self.connection is not None:
+            try:
+                self.connection.close()
+            except (OSError, SMTPException):
+                pass
+            self.connection = None
+
+    def send(self, message):
+        self.open()
+        try:
+            self.connection.send_messages([message])
+        except SMTPServerDisconnected:
+            # The server dropped the idle connection; reconnect once.
+            self.close()
+            self.open()
+            self.connection.send_messages([message])
+
+
+class EmailExecutor:
+    def __init__(self, workers=1, queue_size=200, overflow='block', idle_seconds=30):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f'overflow must be one of {", ".join(OVERFLOW_POLICIES)}')
+        self.overflow = overflow
+        self.idle_seconds = idle_seconds
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.results = queue.Queue()
+        self.lock = threading.Lock()
+        self.in_flight = self.sent = self.failed = self.rejected = 0
+        self.latency = 0.0
+        self.threads = [
+            threading.Thread(target=self._run, name=f'email-sender-{index}', daemon=True) for index in range(workers)
+        ]
+        for thread in self.threads:
+            thread.start()
+
+    def submit(self, item, message):
+        """
+        Queue an EmailMessage. `item` is handed back with the result, e.g.
+        the outbox row it came from. Returns False if the queue is full and
+        the overflow policy is 'reject'.
+        """
+        entry = (item, message, time.monotonic())
+        if self.overflow == 'block':
+            self.queue.put(entry)
+            return True
+        try:
+            self.queue.put_nowait(entry)
+        except queue.Full:
+            with self.lock:
+                self.rejected += 1
+            return False
+        return True
+
+    def room(self):
+        """How many more messages fit in the queue right now."""
+        return max(self.queue.maxsize - self.queue.qsize(), 0)
+
+    def finished(self):
+        """(item, error) for every message completed since the last call; error is None when it was sent."""
+        done = []
+        while True:
+            try:
+                done.append(self.results.get_nowait())
+            except queue.Empty:
+                return done
+
+    def idle(self):
+        return self.queue.unfinished_tasks == 0
+
+    def wait(self, timeout=None):
+        """Wait until every queued message has been tried; returns False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self.idle():
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def shutdown(self, timeout=None):
+        """
+        Drain the queue for up to `timeout` seconds and stop the senders.
+        Returns the items that were still waiting and never tried.
+        """
+        self.wait(timeout)
+        unsent = []
+        while True:
+            try:
+                item, _, _ = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            unsent.append(item)
+            self.queue.task_done()
+        for _ in self.threads:
+            self.queue.put((None, None, None))
+        for thread in self.threads:
+            thread.join(timeout=5)
+        return unsent
+
+    def stats(self):
+        with self.lock:
+            return {
+                'queued': self.queue.qsize(),
+                'in_flight': self.in_flight,
+                'sent': self.sent,
+                'failed': self.failed,
+                'rejected': self.rejected,
+                'mean_latency_ms': round(self.latency / self.sent * 1000, 1) if self.sent else 0,
+            }
+
+    def _run(self):
+        connection = _Connection()
+        while True:
+            try:
+                item, message, queued_at = self.queue.get(timeout=self.idle_seconds)
+            except queue.Empty:
+                connection.close()
+                continue
+            if message is None:
+                connection.close()
+                self.queue.task_done()
+                return
+            with self.lock:
+                self.in_flight += 1
+            error = None
+            try:
+                try:
+                    connection.send(message)
+                except Exception as exc:
+                    # Anything, including a message that cannot be built (bad
+                    # headers, encoding), is reported as a failed send so the
+                    # caller retries or gives up on it; the thread carries on.
+                    error = exc
+                    if isinstance(exc, (OSError, SMTPUnavailable)):
+                        # The connection may be half-broken; start the next message on a fresh one.
+                        connection.close()
+                with self.lock:
+                    self.in_flight -= 1
+                    if error is None:
+                        self.sent += 1
+                        self.latency += time.monotonic() - queued_at
+                    else:
+                        self.failed += 1
+                self.results.put((item, error))
+            finally:
+                self.queue.task_done()
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """The process-wide executor, started on first use from the OUTBOX_SENDER_THREADS and OUTBOX_QUEUE_* settings."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = EmailExecutor(
+                workers=settings.OUTBOX_SENDER_THREADS,
+                queue_size=settings.OUTBOX_QUEUE_SIZE,
+                overflow=settings.OUTBOX_QUEUE_OVERFLOW,
+            )
+        return _executor
+
+
+def shutdown_executor(timeout=None):
+    """Drain and stop the process-wide executor; returns the items it never tried."""
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    return executor.shutdown(timeout) if executor is not None else []
@@ -0,0 +1,125 @@
+"""
+Compiled email templates.
+
+Each template is a subject and a plain body written for str.format. The
+body's HTML part is derived from it unless one is given. register() parses
+them once, at import, into literal text and fields, so rendering is a
+join rather than a parse. bind() fills in the fields shared by a batch
+(the shift, the site name) once and returns a template that only has the
+per-recipient fields left:
+
+    shift = scheduling_email.bind(date=..., shift_type=..., site_name=...)
+    messages = [shift.message(user.email, full_name=user.full_name) for user in users]
+
+Values are escaped and their line breaks kept in the HTML part.
+"""
+from string import Formatter
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives
+from django.utils.html import escape
+
+_formatter = Formatter()
+
+# name -> EmailTemplate, filled in by the email_templates modules as they are imported.
+registry = {}
+
+
+def _plain(value):
+    return value
+
+
+def _html(value):
+    return escape(value).replace('\n', '<br>\n')
+
+
+def _compile(source, escape_literal=_plain):
+    """Split a str.format template into (literal, field, format_spec, conversion) parts."""
+    parts = []
+    for literal, field, spec, conversion in _formatter.parse(source):
+        if field is not None and (not field.isidentifier() or '{' in spec):
+            raise ValueError(f'Unsupported field {{{field}}} in email template')
+        parts.append((escape_literal(literal), field, spec, conversion))
+    return tuple(parts)
+
+
+def _format(value, spec, conversion):
+    return _formatter.format_field(_formatter.convert_field(value, conversion), spec or '')
+
+
+def _bind(parts, context, escape_value):
+    """Fold the fields given in `context` into the literal text around them."""
+    bound, text = [], ''
+    for literal, field, spec, conversion in parts:
+        text += literal
+        if field is None:
+            continue
+        if field in context:
+            text += escape_value(_format(context[field], spec, conversion))
+        else:
+            bound.append((text, field, spec, conversion))
+            text = ''
+    bound.append((text, None, None, None))
+    return tuple(bound)
+
+
+def _render(parts, context, escape_value):
+    chunks = []
+    for literal, field, spec, conversion in parts:
+        chunks.append(literal)
+        if field is not None:
+            chunks.append(escape_value(_format(context[field], spec, conversion)))
+    return ''.join(chunks)
+
+
+class EmailTemplate:
+    def __init__(self, subject, text, html=None, _parts=None):
+        if _parts is not None:
+            self.subject, self.text, self.html = _parts
+        else:
+            self.subject = _compile(subject)
+            self.text = _compile(text)
+            if html is not None:
+                self.html = _compile(html)
+            else:
+                self.html = ((('<html><body>\n', None, None, None),) + _compile(text.strip('\n'), _html)
+                             + (('\n</body></html>\n', None, None, None),))
+        # Names still to be filled in.
+        self.fields = frozenset(
+            field for parts in (self.subject, self.text, self.html) for _, field, _, _ in parts if field is not None
+        )
+
+    def bind(self, **context):
+        """A copy with the given fields filled in, to render many recipients that share them."""
+        return EmailTemplate(None, None, _parts=(
+            _bind(self.subject, context, _plain), _bind(self.text, context, _plain), _bind(self.html, context, _html),
+        ))
+
+    def render(self, **context):
+        """(subject, text, html) with every remaining field filled in from `context`."""
+        missing = self.fields - context.keys()
+        if missing:
+            raise KeyError(f'Missing email template fields: {", ".join(sorted(missing))}')
+        return (
+            _render(self.subject, context, _plain), _render(self.text, context, _plain), _render(self.html, context, _html),
+        )
+
+    def message(self, to, from_email=None, **context):
+        """An EmailMultiAlternatives to `to` (an address or a list of them) with plain and HTML parts."""
+        subject, text, html = self.render(**context)
+        message = EmailMultiAlternatives(
+            subject, text, from_email or settings.DEFAULT_FROM_EMAIL, [to] if isinstance(to, str) else list(to),
+        )
+        message.attach_alternative(html, 'text/html')
+        return message
+
+
+def register(name, subject, text, html=None):
+    """Compile a template and add it to the registry under `name`."""
+    if name in registry:
+        raise ValueError(f'Email template {name!r} is already registered')
+    registry[name] = template = EmailTemplate(subject, text, html)
+    return template
+
+
+def get_template(name):
+    return registry[name]
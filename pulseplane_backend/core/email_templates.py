@@ -1,13 +1,29 @@
+from .email_registry import register
+
 employee_add_template = """
 Hello {full_name},
 
 You have been added to the {site_name} team for the company {company_name}.
-Your login credentials are as follows:
-Email: {email}
-Password: {password}
+Your login email is: {email}
+To choose your password, click the link below:
+{set_password_url}
+
+This link will expire in {link_valid_hours} hours. After that, use "Forgot password" on the login page to get a new one.
 
 Your Salary: {salary}
 
 Regards,
 {site_name}
-"""
\ No newline at end of file
+"""
+
+digest_template = """
+Hello {full_name},
+
+Here is a summary of the recent changes to your schedule:
+{sections}
+Regards,
+{site_name}
+"""
+
+employee_add_email = register('employee_add', 'Welcome to {site_name}', employee_add_template)
+digest_email = register('digest', '{site_name}: {updates}', digest_template)
@@ -0,0 +1,57 @@
+from datetime import time as clock, timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from core.apps.scheduling.models import SHIFT_TYPES
+from core.apps.scheduling.views import SchedulingBulkCreateView
+from core.benchmarks import rolled_back, seed_company, run_view
+
+SHIFT_HOURS = {
+    SHIFT_TYPES.MORNING: (clock(6), clock(14)),
+    SHIFT_TYPES.AFTERNOON: (clock(14), clock(22)),
+    SHIFT_TYPES.NIGHT: (clock(22), clock(6)),
+}
+
+
+class Command(BaseCommand):
+    help = 'Time the bulk shift endpoint creating a month-long roster (rolled back afterwards).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--employees', type=int, default=500)
+        parser.add_argument('--assignments', type=int, default=10000, help='Total shift assignments to create')
+        parser.add_argument('--per-shift', type=int, default=5, help='Assignees per shift')
+        parser.add_argument('--max-seconds', type=float, default=5.0)
+
+    def handle(self, *args, **options):
+        per_shift = options['per_shift']
+        shift_count = options['assignments'] // per_shift
+        start = timezone.localdate() + timedelta(days=1)
+        with rolled_back():
+            _, manager, staff_ids = seed_company(options['employees'], name='Bulk Scheduling Benchmark')
+            # One shift per employee per day, so the roster has no double bookings.
+            per_day = -(-shift_count // 30)
+            if per_day * per_shift > len(staff_ids):
+                raise CommandError('Not enough employees for a conflict-free roster; raise --employees.')
+            shifts = []
+            for i in range(shift_count):
+                day, slot = divmod(i, per_day)
+                shift_type = list(SHIFT_HOURS)[slot % len(SHIFT_HOURS)]
+                start_time, end_time = SHIFT_HOURS[shift_type]
+                shifts.append({
+                    'date': str(start + timedelta(days=day)),
+                    'shift_type': shift_type,
+                    'start_time': str(start_time),
+                    'end_time': str(end_time),
+                    'user': staff_ids[slot * per_shift:(slot + 1) * per_shift],
+                })
+            response, queries, elapsed = run_view(
+                SchedulingBulkCreateView.as_view(), manager, method='post', data={'shifts': shifts}
+            )
+        if response.status_code != 201:
+            raise CommandError(f'Bulk create failed: {response.status_code} {response.data}')
+        self.stdout.write(
+            f"shifts={response.data['created']} assignments={response.data['assignments']} "
+            f"queries={queries} {elapsed:.2f}s"
+        )
+        if elapsed > options['max_seconds']:
+            raise CommandError(f"Took {elapsed:.2f}s, over the {options['max_seconds']}s budget")
+        self.stdout.write(self.style.SUCCESS('Within budget.'))
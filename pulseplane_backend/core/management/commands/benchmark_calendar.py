@@ -0,0 +1,51 @@
+from datetime import time as clock, timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from core.apps.scheduling.bulk import assignment_rows
+from core.apps.scheduling.models import Scheduling, RecurringShift, SHIFT_TYPES
+from core.apps.scheduling.views import SchedulingCalendarView
+from core.benchmarks import rolled_back, seed_company, run_view
+
+
+class Command(BaseCommand):
+    help = 'Show that the shift calendar runs in a constant number of queries as the roster grows (rolled back afterwards).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000], help='Shifts per day to measure')
+        parser.add_argument('--days', type=int, default=30)
+        parser.add_argument('--per-shift', type=int, default=3)
+
+    def handle(self, *args, **options):
+        days, per_shift = options['days'], options['per_shift']
+        start = timezone.localdate()
+        query_counts = set()
+        for size in options['sizes']:
+            with rolled_back():
+                company, manager, staff_ids = seed_company(size * per_shift, name=f'Calendar Benchmark {size}')
+                shifts = Scheduling.objects.bulk_create([
+                    Scheduling(date=start + timedelta(days=day), shift_type=SHIFT_TYPES.MORNING, start_time=clock(6), end_time=clock(14))
+                    for day in range(days) for _ in range(size)
+                ], batch_size=5000)
+                Scheduling.user.through.objects.bulk_create(assignment_rows(
+                    (shift.pk, staff_ids[(i % size) * per_shift + j]) for i, shift in enumerate(shifts) for j in range(per_shift)
+                ), batch_size=5000)
+                for i in range(min(size, 20)):
+                    template = RecurringShift.objects.create(
+                        company=company, shift_type=SHIFT_TYPES.NIGHT, start_time=clock(22), end_time=clock(6),
+                        weekdays=0b0010101, start_date=start,
+                    )
+                    template.user.set(staff_ids[i * per_shift:(i + 1) * per_shift])
+
+                response, queries, elapsed = run_view(SchedulingCalendarView.as_view(), manager, {
+                    'start_date': str(start), 'end_date': str(start + timedelta(days=days - 1)),
+                })
+                if response.status_code != 200:
+                    raise CommandError(f'Calendar failed: {response.status_code} {response.data}')
+                query_counts.add(queries)
+                self.stdout.write(
+                    f"shifts/day={size:<5} returned={len(response.data['shifts']):<6} "
+                    f"queries={queries} {elapsed * 1000:.1f} ms"
+                )
+        if len(query_counts) != 1:
+            raise CommandError(f'Query count varies with roster size: {sorted(query_counts)}')
+        self.stdout.write(self.style.SUCCESS(f'Constant query count: {query_counts.pop()}'))
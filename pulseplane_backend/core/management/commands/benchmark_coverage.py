@@ -0,0 +1,88 @@
+from collections import defaultdict
+from datetime import time as clock, timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from core.apps.employee.models import LeaveManagement
+from core.apps.scheduling.bulk import assignment_rows
+from core.apps.scheduling.models import Scheduling, RecurringShift, SHIFT_TYPES
+from core.apps.scheduling.views import SchedulingCoverageView
+from core.benchmarks import rolled_back, seed_company, run_view
+
+
+class Command(BaseCommand):
+    help = 'Time the coverage matrix over a window and check it against counts taken row by row (rolled back afterwards).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--employees', type=int, default=500)
+        parser.add_argument('--days', type=int, default=90)
+        parser.add_argument('--budget-ms', type=float, default=100, help='Fail if the endpoint is slower than this')
+
+    def handle(self, *args, **options):
+        employees, days = options['employees'], options['days']
+        start = timezone.localdate()
+        end = start + timedelta(days=days - 1)
+        hours = {SHIFT_TYPES.MORNING: (clock(6), clock(14)), SHIFT_TYPES.AFTERNOON: (clock(14), clock(22))}
+        with rolled_back():
+            company, manager, staff_ids = seed_company(employees, name='Coverage Benchmark')
+            # Each employee works one shift a day, alternating morning and
+            # afternoon, and every tenth employee is on leave once a week.
+            shifts = {}
+            for day in range(days):
+                for shift_type, (start_time, end_time) in hours.items():
+                    shifts[day, shift_type] = Scheduling(
+                        date=start + timedelta(days=day), shift_type=shift_type, start_time=start_time, end_time=end_time,
+                    )
+            Scheduling.objects.bulk_create(shifts.values(), batch_size=5000)
+            Scheduling.user.through.objects.bulk_create(assignment_rows(
+                (shifts[day, list(hours)[(i + day) % 2]].pk, user_id)
+                for day in range(days) for i, user_id in enumerate(staff_ids)
+            ), batch_size=5000)
+            LeaveManagement.objects.bulk_create([
+                LeaveManagement(user_id=user_id, date=start + timedelta(days=day), approved=True)
+                for i, user_id in enumerate(staff_ids[::10]) for day in range(i % 7, days, 7)
+            ], batch_size=5000)
+            template = RecurringShift.objects.create(
+                company=company, shift_type=SHIFT_TYPES.NIGHT, start_time=clock(22), end_time=clock(6),
+                weekdays=0b1111111, start_date=start,
+            )
+            template.user.set(staff_ids[:20])
+
+            response, queries, elapsed = run_view(SchedulingCoverageView.as_view(), manager, {
+                'start_date': str(start), 'end_date': str(end),
+            })
+            if response.status_code != 200:
+                raise CommandError(f'Coverage failed: {response.status_code} {response.data}')
+            self.check_matrix(response.data, company, staff_ids[:20])
+            self.stdout.write(
+                f'employees={employees} days={days} assignments={Scheduling.user.through.objects.count()} '
+                f'queries={queries} {elapsed * 1000:.1f} ms'
+            )
+        if elapsed * 1000 > options['budget_ms']:
+            raise CommandError(f'Coverage took {elapsed * 1000:.1f} ms, over the {options["budget_ms"]:.0f} ms budget')
+        self.stdout.write(self.style.SUCCESS('Coverage matrix matches row-by-row counts'))
+
+    def check_matrix(self, data, company, night_staff):
+        leave = set(LeaveManagement.objects.filter(user__company=company, approved=True).values_list('user_id', 'date'))
+        expected = defaultdict(set)
+        for scheduling_id, user_id in Scheduling.user.through.objects.filter(
+            customuser__company=company
+        ).values_list('scheduling_id', 'customuser_id'):
+            expected[scheduling_id].add(user_id)
+        rows = {
+            pk: (day, shift_type)
+            for pk, day, shift_type in Scheduling.objects.filter(id__in=list(expected)).values_list('id', 'date', 'shift_type')
+        }
+        cells = defaultdict(set)
+        for scheduling_id, user_ids in expected.items():
+            cells[rows[scheduling_id]].update(user_ids)
+        for position, day in enumerate(data['dates']):
+            cells[day, SHIFT_TYPES.NIGHT].update(night_staff)
+            for shift_type in data['shift_types']:
+                people = cells.get((day, shift_type), set())
+                got = data['assigned'][shift_type][position], data['assigned_on_leave'][shift_type][position]
+                want = len(people), sum((user_id, day) in leave for user_id in people)
+                if got != want:
+                    raise CommandError(f'{day} {shift_type}: got {got}, expected {want}')
+            on_leave = sum(1 for _, leave_day in leave if leave_day == day)
+            if data['on_leave'][position] != on_leave:
+                raise CommandError(f'{day}: {data["on_leave"][position]} on leave, expected {on_leave}')
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+from core.benchmarks import rolled_back, seed_company, run_view
+from core.views import DashboardView, DashboardView2, DashboardGraphData
+
+# Maximum queries per warm dashboard response.
+QUERY_CAPS = [
+    ('data-count', DashboardView, 'manager', 1),
+    ('data-count2', DashboardView2, 'employee', 1),
+    ('graph-data', DashboardGraphData, 'manager', 1),
+]
+NO_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+
+
+class Command(BaseCommand):
+    help = 'Measure dashboard latency and assert the per-response query caps on synthetic data (rolled back afterwards).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--employees', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        failures = []
+        # Measure the queries themselves rather than cache hits, and leave no
+        # entries behind for company ids that are rolled back and reused.
+        with override_settings(CACHES=NO_CACHE), rolled_back():
+            company, manager, staff_ids = seed_company(options['employees'])
+            employee = company.customuser_set.get(id=staff_ids[0])
+            users = {'manager': manager, 'employee': employee}
+            for name, view, who, cap in QUERY_CAPS:
+                handler = view.as_view()
+                run_view(handler, users[who])  # warm up, e.g. builds today's rollup row
+                response, queries, elapsed = run_view(handler, users[who])
+                line = f'{name:<12} status={response.status_code} queries={queries} (cap {cap}) {elapsed * 1000:.1f} ms'
+                if response.status_code != 200 or queries > cap:
+                    failures.append(line)
+                    self.stdout.write(self.style.ERROR(line))
+                else:
+                    self.stdout.write(line)
+        if failures:
+            raise CommandError(f'{len(failures)} dashboard endpoints exceeded their query cap.')
+        self.stdout.write(self.style.SUCCESS('All dashboard endpoints are within their query caps.'))
@@ -0,0 +1,160 @@
+import statistics
+import threading
+import time
+from datetime import time as clock, timedelta
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+from django.utils import timezone
+from accounts.views import SendOTPView
+from core.apps.employee.models import LeaveManagement
+from core.apps.employee.views import LeaveManagementDetailView
+from core.apps.scheduling.models import SHIFT_TYPES
+from core.apps.scheduling.views import SchedulingListCreateView
+from core.benchmarks import GENDERS, SMTPSink, app_threads, rolled_back, seed_company, run_view
+from core.email_executor import EmailExecutor
+from core.models import OutboxEmail
+from core.outbox import OutboxWorker
+from core.views import EmployeeListCreateView
+
+User = get_user_model()
+
+
+class PeakThreads:
+    """Samples the application's thread count in the background and keeps the highest value seen."""
+
+    def __init__(self):
+        self.peak = 0
+        self.running = False
+
+    def __enter__(self):
+        self.running = True
+        self.thread = threading.Thread(target=self.sample, name='thread-sampler', daemon=True)
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.running = False
+        self.thread.join()
+
+    def sample(self):
+        while self.running:
+            self.peak = max(self.peak, app_threads())
+            time.sleep(0.001)
+
+
+class Command(BaseCommand):
+    help = (
+        'Drive the scheduling, leave approval, onboarding and OTP email paths at increasing fan-out against a '
+        'local SMTP sink, then drain the outbox through the sender pool (rolled back afterwards).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fanout', default='1,10,100,500', help='Comma-separated recipient counts per run')
+        parser.add_argument('--threads', type=int, default=4, help='Sender threads used to drain the outbox')
+        parser.add_argument('--smtp-latency-ms', type=float, default=0, help='Delay the sink adds to every message')
+        parser.add_argument('--budget-ms', type=float, default=500, help='Fail if any single request is slower than this')
+
+    def handle(self, *args, **options):
+        try:
+            fanouts = [int(value) for value in options['fanout'].split(',')]
+        except ValueError:
+            raise CommandError('--fanout must be a comma-separated list of integers.')
+        with SMTPSink(delay=options['smtp_latency_ms'] / 1000) as sink, override_settings(
+            EMAIL_BACKEND='django.core.mail.backends.smtp.EmailBackend',
+            EMAIL_HOST='127.0.0.1', EMAIL_PORT=sink.port, EMAIL_HOST_USER='', EMAIL_HOST_PASSWORD='',
+            EMAIL_USE_TLS=False, EMAIL_USE_SSL=False, NOTIFICATION_DIGEST_WINDOW=0,
+            # Onboarding and OTPs hash a secret per request; a fast hasher
+            # keeps the timings about the email path.
+            PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+        ):
+            baseline = app_threads()
+            slowest = 0
+            for fanout in fanouts:
+                with rolled_back():
+                    slowest = max(slowest, self.run(fanout, sink, baseline, options['threads']))
+        if slowest * 1000 > options['budget_ms']:
+            raise CommandError(f'Slowest request took {slowest * 1000:.1f} ms, over the {options["budget_ms"]:.0f} ms budget')
+        self.stdout.write(self.style.SUCCESS('Email paths within budget; requests started no threads.'))
+
+    def run(self, fanout, sink, baseline, threads):
+        # Mail already waiting in the outbox would be drained with ours;
+        # like the rest of the run, this is rolled back.
+        OutboxEmail.objects.all().delete()
+        company, manager, staff_ids = seed_company(fanout, name='Email Benchmark')
+        start = timezone.localdate() + timedelta(days=1)
+        LeaveManagement.objects.bulk_create([
+            LeaveManagement(user_id=user_id, date=start, approved=False) for user_id in staff_ids
+        ])
+        leave_ids = list(LeaveManagement.objects.filter(user__company=company).values_list('id', flat=True))
+        User.objects.filter(id__in=staff_ids).update(is_otp_verified=False)
+        emails = list(User.objects.filter(id__in=staff_ids).values_list('email', flat=True))
+
+        with PeakThreads() as requests:
+            timings = {
+                # One shift assigned to everyone: a single request fanning out.
+                'scheduling': [self.request(SchedulingListCreateView.as_view(), manager, 201, {
+                    'date': str(start), 'shift_type': SHIFT_TYPES.MORNING,
+                    'start_time': str(clock(6)), 'end_time': str(clock(14)), 'user': staff_ids,
+                })],
+                # The other paths send one email per request, so they are
+                # driven once per recipient.
+                'leave': [
+                    self.request(LeaveManagementDetailView.as_view(), manager, 200, {'approved': True}, method='patch', pk=pk)
+                    for pk in leave_ids
+                ],
+                'onboarding': [
+                    self.request(EmployeeListCreateView.as_view(), manager, 201, {
+                        'full_name': f'New Hire {i}', 'email': f'hire{i}@{company.pk}.bench', 'password': 'Onboard@Bench42',
+                        'phone_number': f'{company.pk:04d}{i:06d}', 'department': 'Emergency', 'position': 'Nurse',
+                        'gender': GENDERS[0], 'salary': 30000, 'no_of_shifts': 24,
+                    })
+                    for i in range(fanout)
+                ],
+                'otp': [self.request(SendOTPView.as_view(), None, 200, {'email': email}) for email in emails],
+            }
+        # The sampler itself is one of the threads it counted.
+        request_threads = requests.peak - 1
+        queued = OutboxEmail.objects.filter(status=OutboxEmail.Status.PENDING).count()
+
+        before = sink.messages
+        executor = EmailExecutor(workers=threads, queue_size=200)
+        worker = OutboxWorker(executor=executor)
+        with PeakThreads() as draining:
+            started = time.perf_counter()
+            # The same loop as send_outbox: claim while there is room, and
+            # stop once nothing was claimed and nothing is left in flight.
+            while True:
+                if worker.run_batch():
+                    continue
+                if executor.idle():
+                    break
+                worker.wait(1)
+            elapsed = time.perf_counter() - started
+        executor.shutdown()
+        delivered = sink.messages - before
+
+        for path, latencies in timings.items():
+            latencies = [latency * 1000 for latency in latencies]
+            self.stdout.write(
+                f'fanout={fanout} {path}: requests={len(latencies)} mean={statistics.mean(latencies):.1f} ms '
+                f'max={max(latencies):.1f} ms'
+            )
+        self.stdout.write(
+            f'fanout={fanout} drain: messages={delivered} {delivered / elapsed:.0f} msg/s '
+            f'mean_latency={executor.stats()["mean_latency_ms"]} ms peak_threads={draining.peak - 1} '
+            f'(requests: {request_threads}, baseline: {baseline})'
+        )
+        if request_threads > baseline:
+            raise CommandError(f'Requests started threads: {request_threads} live, {baseline} before.')
+        if delivered != queued or worker.failed or worker.retried:
+            raise CommandError(
+                f'Queued {queued} emails but the sink got {delivered} ({worker.retried} retrying, {worker.failed} failed).'
+            )
+        return max(max(latencies) for latencies in timings.values())
+
+    def request(self, view, user, expected, data, method='post', **kwargs):
+        response, _, elapsed = run_view(view, user, method=method, data=data, **kwargs)
+        if response.status_code != expected:
+            raise CommandError(f'{view.cls.__name__} returned {response.status_code}: {response.data}')
+        return elapsed
@@ -0,0 +1,57 @@
+import random
+from datetime import timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+from core.apps.employee.models import LeaveManagement
+from core.apps.scheduling.models import Scheduling, SHIFT_TYPES, PRIORITY_CHOICES
+from core.apps.scheduling.views import AutoRosterView
+from core.benchmarks import rolled_back, seed_company, run_view
+
+
+class Command(BaseCommand):
+    help = 'Time the auto-roster endpoint generating and writing a month for a large team (rolled back afterwards).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--employees', type=int, default=500)
+        parser.add_argument('--days', type=int, default=30)
+        parser.add_argument('--leave-rate', type=float, default=0.05, help='Share of employee-days on approved leave')
+        parser.add_argument('--max-seconds', type=float, default=5.0)
+
+    def handle(self, *args, **options):
+        employees, days = options['employees'], options['days']
+        start = timezone.localdate() + timedelta(days=1)
+        end = start + timedelta(days=days - 1)
+        # Roughly 80% of the team's prorated shift capacity.
+        per_day = int(employees * 24 / 30 * 0.8)
+        demand = [
+            {'shift_type': SHIFT_TYPES.MORNING, 'required': per_day * 4 // 10, 'priority': PRIORITY_CHOICES.HIGH},
+            {'shift_type': SHIFT_TYPES.AFTERNOON, 'required': per_day * 35 // 100},
+            {'shift_type': SHIFT_TYPES.NIGHT, 'required': per_day // 4, 'priority': PRIORITY_CHOICES.LOW},
+        ]
+        rng = random.Random(0)
+        with rolled_back():
+            _, manager, staff_ids = seed_company(employees, name='Roster Benchmark')
+            LeaveManagement.objects.bulk_create([
+                LeaveManagement(user_id=user_id, date=start + timedelta(days=offset), approved=True)
+                for user_id in staff_ids for offset in range(days) if rng.random() < options['leave_rate']
+            ], batch_size=5000)
+            response, queries, elapsed = run_view(AutoRosterView.as_view(), manager, method='post', data={
+                'start_date': str(start), 'end_date': str(end), 'demand': demand,
+            })
+            if response.status_code != 201:
+                raise CommandError(f'Roster failed: {response.status_code} {response.data}')
+            user_column = f'{Scheduling.user.field.m2m_reverse_field_name()}_id'
+            on_leave = Scheduling.user.through.objects.filter(Exists(LeaveManagement.objects.filter(
+                user_id=OuterRef(user_column), date=OuterRef('scheduling__date'), approved=True,
+            ))).count()
+        if on_leave:
+            raise CommandError(f'{on_leave} assignments fall on approved leave days')
+        data = response.data
+        self.stdout.write(
+            f"employees={employees} days={days} shifts={data['shifts']} assignments={data['assignments']} "
+            f"unfilled_slots={len(data['unfilled'])} load={data['load']} queries={queries} {elapsed:.2f}s"
+        )
+        if elapsed > options['max_seconds']:
+            raise CommandError(f"Took {elapsed:.2f}s, over the {options['max_seconds']}s budget")
+        self.stdout.write(self.style.SUCCESS('Within budget.'))
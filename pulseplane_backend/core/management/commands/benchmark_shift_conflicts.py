@@ -0,0 +1,71 @@
+import time
+from datetime import time as clock, timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from core.apps.scheduling.bulk import assignment_rows
+from core.apps.scheduling.conflicts import find_conflicts
+from core.apps.scheduling.models import Scheduling, SHIFT_TYPES
+from core.benchmarks import rolled_back, seed_company
+
+SHIFT_HOURS = [
+    (SHIFT_TYPES.MORNING, clock(6), clock(14)),
+    (SHIFT_TYPES.AFTERNOON, clock(14), clock(22)),
+    (SHIFT_TYPES.NIGHT, clock(22), clock(6)),
+]
+
+
+class Command(BaseCommand):
+    help = 'Time a double-booking check against a large table of existing assignments (rolled back afterwards).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--assignments', type=int, default=1000000)
+        parser.add_argument('--employees', type=int, default=2000)
+        parser.add_argument('--per-shift', type=int, default=5)
+        parser.add_argument('--max-ms', type=float, default=50.0)
+
+    def handle(self, *args, **options):
+        per_shift, employees = options['per_shift'], options['employees']
+        per_day = employees // per_shift
+        shift_count = options['assignments'] // per_shift
+        start = timezone.localdate()
+        with rolled_back():
+            _, _, staff_ids = seed_company(employees, name='Conflict Benchmark')
+            seeded = time.perf_counter()
+            for first in range(0, shift_count, 20000):
+                batch = [
+                    Scheduling(
+                        date=start + timedelta(days=i // per_day),
+                        shift_type=SHIFT_HOURS[i % per_day % 3][0],
+                        start_time=SHIFT_HOURS[i % per_day % 3][1],
+                        end_time=SHIFT_HOURS[i % per_day % 3][2],
+                    )
+                    for i in range(first, min(first + 20000, shift_count))
+                ]
+                created = Scheduling.objects.bulk_create(batch, batch_size=5000)
+                Scheduling.user.through.objects.bulk_create(assignment_rows(
+                    (scheduling.pk, staff_ids[((first + k) % per_day) * per_shift + j])
+                    for k, scheduling in enumerate(created) for j in range(per_shift)
+                ), batch_size=5000)
+            self.stdout.write(f'Seeded {shift_count * per_shift} assignments in {time.perf_counter() - seeded:.1f}s')
+
+            # Slot 2 is a NIGHT shift (22:00-06:00) held by these employees
+            # every day: a 05:00 start the next morning collides with it.
+            user_id = staff_ids[2 * per_shift]
+            day = start + timedelta(days=shift_count // per_day // 2)
+            cases = [
+                ('overlaps night shift', {'date': day, 'start_time': clock(5), 'end_time': clock(9), 'user': [user_id]}, True),
+                ('free slot', {'date': day, 'start_time': clock(6), 'end_time': clock(14), 'user': [user_id]}, False),
+            ]
+            for label, shift, expected in cases:
+                with CaptureQueriesContext(connection) as queries:
+                    started = time.perf_counter()
+                    conflicts = find_conflicts([shift])
+                    elapsed = (time.perf_counter() - started) * 1000
+                self.stdout.write(f'{label:<22} conflicts={len(conflicts)} queries={len(queries)} {elapsed:.2f} ms')
+                if bool(conflicts) != expected:
+                    raise CommandError(f'{label}: expected conflict={expected}, got {conflicts}')
+                if elapsed > options['max_ms']:
+                    raise CommandError(f"{label}: took {elapsed:.2f} ms, over the {options['max_ms']} ms budget")
+        self.stdout.write(self.style.SUCCESS('Conflict checks correct and within budget.'))
@@ -0,0 +1,58 @@
+import random
+import time
+from datetime import timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from core.apps.employee.models import WellnessCheck
+from core.apps.employee.views import TeamWellnessAnalyticsView
+from core.apps.employee.wellness import rebuild_summaries
+from core.benchmarks import rolled_back, seed_company
+
+
+class Command(BaseCommand):
+    help = 'Show that team wellness analytics runs in a constant number of queries as the team grows (rolled back afterwards).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[10, 200, 2000], help='Team sizes to measure')
+        parser.add_argument('--days', type=int, default=30, help='Wellness checks per employee')
+
+    def handle(self, *args, **options):
+        today = timezone.localdate()
+        view = TeamWellnessAnalyticsView()
+        query_counts = set()
+        for size in options['sizes']:
+            with rolled_back():
+                company, _, staff_ids = seed_company(size, name=f'Wellness Benchmark {size}')
+                # `date` is auto_now_add and unique per user, so insert one day
+                # at a time and move it back before inserting the next.
+                for offset in reversed(range(options['days'])):
+                    WellnessCheck.objects.bulk_create([
+                        WellnessCheck(
+                            user_id=user_id,
+                            mood=random.randint(1, 5),
+                            stress_level=random.randint(1, 5),
+                            work_life_balance=random.randint(1, 5),
+                        )
+                        for user_id in staff_ids
+                    ], batch_size=5000)
+                    if offset:
+                        WellnessCheck.objects.filter(user__company=company, date=today).update(
+                            date=today - timedelta(days=offset)
+                        )
+
+                rebuild_summaries(company.customuser_set.all())
+
+                with CaptureQueriesContext(connection) as queries:
+                    started = time.perf_counter()
+                    data = view.get_team_wellness(company)
+                    elapsed = time.perf_counter() - started
+                query_counts.add(len(queries))
+                self.stdout.write(
+                    f"team={size:<6} members_reported={len(data['team_data']):<6} "
+                    f"queries={len(queries)} {elapsed * 1000:.1f} ms"
+                )
+        if len(query_counts) != 1:
+            raise CommandError(f'Query count varies with team size: {sorted(query_counts)}')
+        self.stdout.write(self.style.SUCCESS(f'Constant query count: {query_counts.pop()}'))
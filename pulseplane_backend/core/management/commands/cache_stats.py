@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from core.cache import cache_stats, reset_cache_stats
+
+
+class Command(BaseCommand):
+    help = 'Show hit/miss counters of the shared dashboard and analytics cache.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help='Reset the counters after printing them')
+
+    def handle(self, *args, **options):
+        for endpoint, stats in cache_stats().items():
+            total = stats['hits'] + stats['misses']
+            ratio = stats['hits'] / total * 100 if total else 0
+            self.stdout.write(f"{endpoint:<24} hits={stats['hits']} misses={stats['misses']} hit_ratio={ratio:.1f}%")
+        if options['reset']:
+            reset_cache_stats()
+            self.stdout.write(self.style.SUCCESS('Counters reset.'))
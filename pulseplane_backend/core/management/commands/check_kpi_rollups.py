@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+from core.models import DailyKPIRollup
+from core.rollups import check_rollups, refresh_rollup
+
+
+class Command(BaseCommand):
+    help = 'Compare the stored daily KPI rollups against the source tables.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--company', type=int, help='Only check this company id')
+        parser.add_argument('--fix', action='store_true', help='Recompute rows that have drifted')
+
+    def handle(self, *args, **options):
+        rollups = DailyKPIRollup.objects.all()
+        if options['company']:
+            rollups = rollups.filter(company_id=options['company'])
+
+        drifted = set()
+        for rollup, field, stored, expected in check_rollups(rollups.iterator()):
+            drifted.add((rollup.company_id, rollup.date))
+            self.stdout.write(f'{rollup}: {field} is {stored}, expected {expected}')
+
+        if not drifted:
+            self.stdout.write(self.style.SUCCESS('All rollups are consistent.'))
+            return
+        if options['fix']:
+            for company_id, day in drifted:
+                refresh_rollup(company_id, day)
+            self.stdout.write(self.style.SUCCESS(f'Recomputed {len(drifted)} rollup rows.'))
+            return
+        raise CommandError(f'{len(drifted)} rollup rows are inconsistent. Re-run with --fix to repair them.')
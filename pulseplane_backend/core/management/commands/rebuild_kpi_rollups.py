@@ -0,0 +1,31 @@
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from accounts.models import Company
+from core.models import DailyKPIRollup
+from core.rollups import refresh_rollup
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the daily KPI rollups from the source tables.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--company', type=int, help='Only rebuild this company id')
+        parser.add_argument('--days', type=int, default=30, help='Number of days back from today to rebuild (default: 30)')
+
+    def handle(self, *args, **options):
+        today = timezone.localdate()
+        days = [today - timedelta(days=offset) for offset in range(options['days'])]
+        companies = Company.objects.all()
+        if options['company']:
+            companies = companies.filter(id=options['company'])
+
+        rebuilt = 0
+        for company in companies:
+            with transaction.atomic():
+                DailyKPIRollup.objects.filter(company=company).delete()
+                for day in days:
+                    refresh_rollup(company.id, day)
+                    rebuilt += 1
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {rebuilt} rollup rows for {companies.count()} companies.'))
@@ -0,0 +1,35 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from core.apps.scheduling.completion import check_counts, reconcile_counts
+
+User = get_user_model()
+
+BATCH_SIZE = 500
+
+
+class Command(BaseCommand):
+    help = "Compare each user's current_shifts_count against their completed shifts."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--company', type=int, help='Only check users of this company id')
+        parser.add_argument('--fix', action='store_true', help='Recompute counters that have drifted')
+
+    def handle(self, *args, **options):
+        users = User.objects.all()
+        if options['company']:
+            users = users.filter(company_id=options['company'])
+
+        drifted = []
+        for user_id, stored, expected in check_counts(users):
+            drifted.append(user_id)
+            self.stdout.write(f'user {user_id}: current_shifts_count is {stored}, expected {expected}')
+
+        if not drifted:
+            self.stdout.write(self.style.SUCCESS('All shift counters are consistent.'))
+            return
+        if options['fix']:
+            for offset in range(0, len(drifted), BATCH_SIZE):
+                reconcile_counts(drifted[offset:offset + BATCH_SIZE])
+            self.stdout.write(self.style.SUCCESS(f'Recomputed {len(drifted)} shift counters.'))
+            return
+        raise CommandError(f'{len(drifted)} shift counters are inconsistent. Re-run with --fix to repair them.')
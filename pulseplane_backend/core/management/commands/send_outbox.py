@@ -0,0 +1,95 @@
+import signal
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from core.digests import flush_digests
+from core.email_executor import SMTPUnavailable, get_executor, shutdown_executor
+from core.outbox import OutboxWorker, purge_sent, release, retry_delay
+
+# Sent rows are purged at most this often while the worker is idle.
+PURGE_INTERVAL = 3600
+
+
+class Command(BaseCommand):
+    help = 'Deliver queued outbox email through a bounded pool of SMTP senders, retrying failures with backoff, and queue due notification digests.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Exit once nothing is due instead of polling')
+        parser.add_argument('--batch-size', type=int, default=None, help='Rows claimed per batch (default: OUTBOX_BATCH_SIZE)')
+        parser.add_argument('--poll-interval', type=float, default=None, help='Seconds between polls when idle (default: OUTBOX_POLL_INTERVAL)')
+        parser.add_argument('--keep-days', type=int, default=7, help='Delete sent rows older than this many days (0 keeps them)')
+        parser.add_argument('--drain-timeout', type=float, default=30, help='Seconds to finish queued sends on shutdown')
+        parser.add_argument('--stats-interval', type=float, default=60, help='Seconds between sender stats lines (0 disables them)')
+
+    def handle(self, *args, **options):
+        worker = OutboxWorker(batch_size=options['batch_size'], executor=get_executor())
+        poll_interval = options['poll_interval'] if options['poll_interval'] is not None else settings.OUTBOX_POLL_INTERVAL
+        self.stopping = False
+        # Stop claiming on SIGTERM/SIGINT and drain what is already queued.
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, self.stop)
+
+        last_purge = last_flush = None
+        last_stats = time.monotonic()
+        try:
+            while not self.stopping:
+                if last_flush is None or time.monotonic() - last_flush >= poll_interval:
+                    flush_digests()
+                    last_flush = time.monotonic()
+                if options['stats_interval'] and time.monotonic() - last_stats >= options['stats_interval']:
+                    self.write_stats(worker)
+                    last_stats = time.monotonic()
+                try:
+                    # Keep claiming while there is work and room; a batch is
+                    # submitted while the previous one is still sending.
+                    if worker.run_batch():
+                        continue
+                    if not worker.executor.idle():
+                        # The queue is full or the last sends are still going.
+                        worker.wait(poll_interval)
+                        continue
+                except SMTPUnavailable as error:
+                    if options['once']:
+                        raise CommandError(f'SMTP server unavailable: {error!r}')
+                    self.stderr.write(f'SMTP server unavailable, retrying: {error!r}')
+                    self.sleep(retry_delay(1))
+                    continue
+                if options['keep_days'] and (last_purge is None or time.monotonic() - last_purge > PURGE_INTERVAL):
+                    purge_sent(options['keep_days'])
+                    last_purge = time.monotonic()
+                if options['once']:
+                    break
+                self.sleep(poll_interval)
+        finally:
+            self.drain(worker, options['drain_timeout'])
+        self.write_stats(worker)
+        self.stdout.write(self.style.SUCCESS(
+            f'Sent {worker.sent}, retrying {worker.retried}, failed {worker.failed}.'
+        ))
+
+    def drain(self, worker, timeout):
+        try:
+            worker.wait(timeout)
+        except SMTPUnavailable:
+            pass
+        # Whatever was never tried goes back to the outbox for the next worker.
+        unsent = shutdown_executor(timeout=0)
+        if unsent:
+            release(unsent)
+        try:
+            worker.record()
+        except SMTPUnavailable:
+            pass
+
+    def write_stats(self, worker):
+        stats = worker.executor.stats()
+        self.stdout.write(' '.join(f'{name}={value}' for name, value in stats.items()))
+
+    def stop(self, signum, frame):
+        self.stopping = True
+
+    def sleep(self, seconds):
+        # In short steps so a stop request doesn't wait out a long backoff.
+        deadline = time.monotonic() + seconds
+        while not self.stopping and time.monotonic() < deadline:
+            time.sleep(min(0.5, deadline - time.monotonic()))
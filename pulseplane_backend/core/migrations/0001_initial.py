@@ -0,0 +1,35 @@
+# Generated by Django 4.2.16 on 2026-10-18 11:48
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('accounts', '0006_customuser_current_shifts_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyKPIRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('headcount', models.IntegerField(default=0)),
+                ('present', models.IntegerField(default=0)),
+                ('absent', models.IntegerField(default=0)),
+                ('total_salary', models.BigIntegerField(default=0)),
+                ('total_payroll', models.FloatField(default=0)),
+                ('shift_assignments', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='kpi_rollups', to='accounts.company')),
+            ],
+            options={
+                'ordering': ['-date'],
+                'unique_together': {('company', 'date')},
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.16 on 2026-10-18 12:21
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('core', '0002_outboxemail'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('SHIFT_ADDED', 'Shifts added'), ('SHIFT_REMOVED', 'Shifts cancelled'), ('LEAVE_APPROVED', 'Leave approved'), ('LEAVE_DECLINED', 'Leave not approved')], max_length=20)),
+                ('key', models.CharField(max_length=64)),
+                ('summary', models.CharField(max_length=255)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notification_events', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'created_at'], name='core_notifi_user_id_09b68f_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.16 on 2026-10-18 12:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_notificationevent'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='outboxemail',
+            name='html_body',
+            field=models.TextField(blank=True, default=''),
+        ),
+    ]
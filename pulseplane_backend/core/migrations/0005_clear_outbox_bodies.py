@@ -0,0 +1,19 @@
+from django.db import migrations
+
+
+def clear_bodies(apps, schema_editor):
+    # Rows delivered or given up on before bodies were blanked may still
+    # hold onboarding passwords, OTPs and reset links.
+    OutboxEmail = apps.get_model('core', 'OutboxEmail')
+    OutboxEmail.objects.filter(status__in=['SENT', 'FAILED']).update(body='', html_body='')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_outboxemail_html_body'),
+    ]
+
+    operations = [
+        migrations.RunPython(clear_bodies, migrations.RunPython.noop),
+    ]
@@ -1,3 +1,80 @@
+from django.conf import settings
 from django.db import models
+from django.utils import timezone
 
-# Create your models here.
+
+class DailyKPIRollup(models.Model):
+    company = models.ForeignKey('accounts.Company', on_delete=models.CASCADE, related_name='kpi_rollups')
+    date = models.DateField()
+    headcount = models.IntegerField(default=0)
+    present = models.IntegerField(default=0)
+    absent = models.IntegerField(default=0)
+    total_salary = models.BigIntegerField(default=0)
+    total_payroll = models.FloatField(default=0)
+    shift_assignments = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ['company', 'date']
+        ordering = ['-date']
+
+    def __str__(self):
+        return f"KPI Rollup: {self.company} on {self.date}"
+
+
+class OutboxEmail(models.Model):
+    """An outgoing email, written in the transaction that caused it and delivered by the send_outbox worker."""
+
+    class Status(models.TextChoices):
+        PENDING = 'PENDING', 'Pending'
+        SENT = 'SENT', 'Sent'
+        FAILED = 'FAILED', 'Failed'
+
+    subject = models.CharField(max_length=255)
+    # Blanked once the row is SENT or FAILED.
+    body = models.TextField()
+    content_subtype = models.CharField(max_length=10, default='plain')
+    # Sent as a text/html alternative to body when set.
+    html_body = models.TextField(blank=True, default='')
+    from_email = models.CharField(max_length=254)
+    to = models.JSONField()
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    # When the row is next due; also pushed forward while a worker holds it.
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} to {', '.join(self.to)} ({self.status})"
+
+
+class NotificationEvent(models.Model):
+    """A change waiting to be mailed to its user in their next digest (see core.digests)."""
+
+    class Kind(models.TextChoices):
+        SHIFT_ADDED = 'SHIFT_ADDED', 'Shifts added'
+        SHIFT_REMOVED = 'SHIFT_REMOVED', 'Shifts cancelled'
+        LEAVE_APPROVED = 'LEAVE_APPROVED', 'Leave approved'
+        LEAVE_DECLINED = 'LEAVE_DECLINED', 'Leave not approved'
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='notification_events')
+    kind = models.CharField(max_length=20, choices=Kind.choices)
+    # What the event is about, e.g. "scheduling:12"; later events about the same item supersede earlier ones.
+    key = models.CharField(max_length=64)
+    summary = models.CharField(max_length=255)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} for {self.user_id}: {self.summary}"
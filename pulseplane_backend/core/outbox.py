@@ -0,0 +1,180 @@
+"""
+Durable outgoing email.
+
+Requests never talk to SMTP. enqueue() and enqueue_messages() insert
+OutboxEmail rows in the caller's transaction, so a request that rolls back
+sends nothing and a process restart loses nothing. The send_outbox worker
+claims due rows in batches, delivers them through the bounded sender pool
+in core.email_executor, which keeps its SMTP connections open, and retries
+failures with exponential backoff until OUTBOX_MAX_ATTEMPTS. Delivery is at
+least once: a worker that dies after sending but before recording it sends
+those rows again.
+"""
+import random
+from datetime import timedelta
+from django.conf import settings
+from django.core.mail import EmailMessage, EmailMultiAlternatives
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from .email_executor import SMTPUnavailable, get_executor
+from .models import OutboxEmail
+
+# How long a claimed batch is reserved for its worker. Rows claimed by a
+# worker that died become due again after this.
+CLAIM_SECONDS = 300
+
+
+def _row(subject, body, recipients, from_email=None, content_subtype='plain', html_body=''):
+    return OutboxEmail(
+        subject=subject[:255],
+        body=body,
+        html_body=html_body,
+        to=list(recipients),
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        content_subtype=content_subtype,
+    )
+
+
+def _html_part(message):
+    return next((content for content, mimetype in getattr(message, 'alternatives', ()) if mimetype == 'text/html'), '')
+
+
+def enqueue(subject, body, recipients, from_email=None, content_subtype='plain'):
+    """Queue one email; it is sent once the current transaction commits and a worker picks it up."""
+    email = _row(subject, body, recipients, from_email, content_subtype)
+    email.save()
+    return email
+
+
+def enqueue_messages(messages):
+    """Queue a list of EmailMessages with one INSERT, keeping the HTML alternative of an EmailMultiAlternatives."""
+    return OutboxEmail.objects.bulk_create([
+        _row(message.subject, message.body, message.to, message.from_email, message.content_subtype, _html_part(message))
+        for message in messages
+    ], batch_size=500)
+
+
+def retry_delay(attempts):
+    """Seconds to wait before the next attempt, doubling per attempt with some jitter so failures spread out."""
+    delay = min(settings.OUTBOX_RETRY_DELAY * 2 ** max(attempts - 1, 0), settings.OUTBOX_MAX_RETRY_DELAY)
+    return delay * random.uniform(0.75, 1.0)
+
+
+def claim(batch_size):
+    """
+    Reserve up to batch_size due rows for this worker. Rows locked by
+    another worker are skipped, so several workers can drain the outbox
+    together.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        rows = list(
+            OutboxEmail.objects.select_for_update(skip_locked=True)
+            .filter(status=OutboxEmail.Status.PENDING, next_attempt_at__lte=now)
+            .order_by('next_attempt_at', 'id')[:batch_size]
+        )
+        if rows:
+            OutboxEmail.objects.filter(id__in=[row.pk for row in rows]).update(
+                next_attempt_at=now + timedelta(seconds=CLAIM_SECONDS)
+            )
+    return rows
+
+
+def purge_sent(days):
+    """Delete rows sent more than `days` days ago."""
+    deleted, _ = OutboxEmail.objects.filter(
+        status=OutboxEmail.Status.SENT, sent_at__lt=timezone.now() - timedelta(days=days)
+    ).delete()
+    return deleted
+
+
+def release(rows, delay=0, error=None):
+    """Hand claimed rows back to the outbox, due again after `delay` seconds, without counting an attempt."""
+    changes = {'next_attempt_at': timezone.now() + timedelta(seconds=delay)}
+    if error is not None:
+        changes['last_error'] = repr(error)
+    OutboxEmail.objects.filter(id__in=[row.pk for row in rows]).update(**changes)
+
+
+def as_message(row):
+    if row.html_body:
+        message = EmailMultiAlternatives(row.subject, row.body, row.from_email, row.to)
+        message.attach_alternative(row.html_body, 'text/html')
+    else:
+        message = EmailMessage(row.subject, row.body, row.from_email, row.to)
+    message.content_subtype = row.content_subtype
+    return message
+
+
+class OutboxWorker:
+    """
+    Feeds claimed rows to the process-wide EmailExecutor and records the
+    results. Claiming the next batch overlaps with sending the previous
+    one, up to the executor's queue limit. Counters of what was sent,
+    retried and given up on are kept for the caller to report.
+    """
+
+    def __init__(self, batch_size=None, max_attempts=None, executor=None):
+        self.batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+        self.max_attempts = max_attempts or settings.OUTBOX_MAX_ATTEMPTS
+        self.executor = executor or get_executor()
+        self.sent = self.retried = self.failed = 0
+
+    def run_batch(self):
+        """
+        Record finished sends, then claim and submit a batch of at most as
+        many rows as the executor's queue has room for; returns how many
+        rows were submitted. Rows the executor rejects anyway go straight
+        back to the outbox. Raises SMTPUnavailable if the server could not
+        be reached, after releasing the affected rows without using up their
+        attempts.
+        """
+        self.record()
+        room = min(self.batch_size, self.executor.room())
+        if not room:
+            return 0
+        rows = claim(room)
+        rejected = [row for row in rows if not self.executor.submit(row, as_message(row))]
+        if rejected:
+            release(rejected)
+        self.record()
+        return len(rows) - len(rejected)
+
+    def wait(self, timeout=None):
+        """Wait up to `timeout` seconds for submitted rows to finish and record them; True if none are left."""
+        idle = self.executor.wait(timeout)
+        self.record()
+        return idle
+
+    def record(self):
+        sent, unavailable = [], []
+        for row, error in self.executor.finished():
+            if error is None:
+                sent.append(row.pk)
+            elif isinstance(error, SMTPUnavailable):
+                unavailable.append((row, error))
+            else:
+                self.fail(row, error)
+        if sent:
+            # Bodies are dropped once delivered; they can hold one-time links and codes.
+            OutboxEmail.objects.filter(id__in=sent).update(
+                status=OutboxEmail.Status.SENT, sent_at=timezone.now(), attempts=F('attempts') + 1, last_error='',
+                body='', html_body='',
+            )
+            self.sent += len(sent)
+        if unavailable:
+            release([row for row, _ in unavailable], delay=retry_delay(1), error=unavailable[-1][1])
+            raise unavailable[-1][1]
+
+    def fail(self, row, error):
+        row.attempts += 1
+        row.last_error = repr(error)
+        if row.attempts >= self.max_attempts:
+            row.status = OutboxEmail.Status.FAILED
+            row.body = row.html_body = ''
+            self.failed += 1
+        else:
+            row.next_attempt_at = timezone.now() + timedelta(seconds=retry_delay(row.attempts))
+            self.retried += 1
+        row.save(update_fields=['attempts', 'last_error', 'status', 'next_attempt_at', 'body', 'html_body'])
@@ -0,0 +1,195 @@
+"""
+Keyset (cursor) pagination. Each page is fetched with a WHERE on the sort key
+of the last row of the previous page instead of an OFFSET, so every page is
+an index range scan starting at the cursor and costs the same on page 1 and
+page 10,000.
+
+Views declare a unique ordering with `keyset_ordering`, e.g.
+('date', 'start_time', 'id'). Without one the model's Meta ordering is used
+with the primary key appended as a tie-breaker.
+
+Pagination is opt-in per request: a plain GET keeps returning the full list
+the existing clients expect, while `?page_size=` or `?cursor=` switches to a
+`{"next": ..., "results": [...]}` page.
+"""
+import base64
+import binascii
+import datetime
+import decimal
+import json
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def _encode_value(value):
+    # Full isoformat, not DjangoJSONEncoder: it truncates microseconds and the
+    # cursor must match the stored value exactly.
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, decimal.Decimal):
+        return str(value)
+    return value
+
+
+def default_ordering(model):
+    ordering = [field for field in model._meta.ordering if isinstance(field, str)]
+    names = {field.lstrip('-') for field in ordering}
+    if len(ordering) != len(model._meta.ordering) or not all('__' not in name and name != '?' for name in names):
+        return ('pk',)
+    if 'pk' in names or model._meta.pk.name in names:
+        return tuple(ordering)
+    descending = bool(ordering) and ordering[-1].startswith('-')
+    return tuple(ordering) + ('-pk' if descending else 'pk',)
+
+
+class KeysetPagination(BasePagination):
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def get_ordering(self, view, queryset):
+        ordering = getattr(view, 'keyset_ordering', None)
+        return tuple(ordering) if ordering else default_ordering(queryset.model)
+
+    def get_page_size(self, request):
+        page_size = settings.REST_FRAMEWORK.get('PAGE_SIZE') or 50
+        try:
+            page_size = int(request.query_params.get(self.page_size_query_param, page_size))
+        except ValueError:
+            pass
+        return max(1, min(page_size, settings.MAX_PAGE_SIZE))
+
+    def decode_cursor(self, request, ordering):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            values = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+        except (TypeError, ValueError, binascii.Error, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return values
+
+    def encode_cursor(self, values):
+        return base64.urlsafe_b64encode(json.dumps(values).encode()).decode('ascii')
+
+    def _fields(self, queryset, ordering):
+        fields = []
+        for term in ordering:
+            name = term.lstrip('-')
+            field = queryset.model._meta.pk if name == 'pk' else queryset.model._meta.get_field(name)
+            fields.append((name, field.attname, term.startswith('-'), field.null))
+        return fields
+
+    def _order_by(self, fields):
+        # Nullable keys sort NULLs last in both directions on every backend,
+        # which is what the WHERE built by _after assumes.
+        return [
+            (F(name).desc(nulls_last=True) if descending else F(name).asc(nulls_last=True))
+            if null else ('-' if descending else '') + name
+            for name, _, descending, null in fields
+        ]
+
+    def _after(self, fields, values):
+        """
+        WHERE clause for rows sorting strictly after `values`: the
+        lexicographic (a, b, c) > (x, y, z) spelled out per column, since
+        directions and NULLs differ between columns. The OR of its branches
+        gives the planner no range on the index, so the leading column's
+        bound (a >= x, a <= x when descending) is ANDed in as well and the
+        scan starts at the cursor rather than the start of the index.
+        """
+        condition = Q(pk__in=[])
+        equal = Q()
+        for (name, _, descending, null), value in zip(fields, values):
+            if value is not None:
+                beyond = Q(**{f'{name}__lt' if descending else f'{name}__gt': value})
+                if null:
+                    beyond |= Q(**{f'{name}__isnull': True})
+                condition |= equal & beyond
+                equal &= Q(**{name: value})
+            else:
+                # NULLs sort last, so nothing is beyond a NULL in this column.
+                equal &= Q(**{f'{name}__isnull': True})
+        name, _, descending, null = fields[0]
+        if values[0] is not None:
+            bound = Q(**{f'{name}__lte' if descending else f'{name}__gte': values[0]})
+            if null:
+                bound |= Q(**{f'{name}__isnull': True})
+            condition &= bound
+        return condition
+
+    def paginate_queryset(self, queryset, request, view=None):
+        params = request.query_params
+        if self.cursor_query_param not in params and self.page_size_query_param not in params:
+            return None
+        self.request = request
+        ordering = self.get_ordering(view, queryset)
+        fields = self._fields(queryset, ordering)
+        values = self.decode_cursor(request, ordering)
+        queryset = queryset.order_by(*self._order_by(fields))
+        if values is not None:
+            # The cursor decoded, but its values still have to fit the columns.
+            try:
+                queryset = queryset.filter(self._after(fields, values))
+            except (ValidationError, ValueError, TypeError):
+                raise NotFound(self.invalid_cursor_message)
+
+        page_size = self.get_page_size(request)
+        rows = list(queryset[:page_size + 1])
+        self.has_next = len(rows) > page_size
+        rows = rows[:page_size]
+        self.next_cursor = None
+        if self.has_next:
+            last = rows[-1]
+            self.next_cursor = self.encode_cursor([_encode_value(getattr(last, attname)) for _, attname, _, _ in fields])
+        return rows
+
+    def get_next_link(self):
+        if not self.next_cursor:
+            return None
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, self.next_cursor)
+
+    def get_first_link(self):
+        return remove_query_param(self.request.build_absolute_uri(), self.cursor_query_param)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'first': self.get_first_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'first': {'type': 'string', 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Opaque cursor from the `next` link of the previous page.',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.page_size_query_param,
+                'required': False,
+                'in': 'query',
+                'description': f'Number of results per page, at most {settings.MAX_PAGE_SIZE}.',
+                'schema': {'type': 'integer'},
+            },
+        ]
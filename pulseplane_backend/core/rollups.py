@@ -0,0 +1,96 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count, F, Q, Exists, OuterRef, Subquery, FloatField, IntegerField, ExpressionWrapper
+from django.utils import timezone
+from core.models import DailyKPIRollup
+from core.aggregation import aggregate_metrics, CountMetric, SumMetric
+from core.apps.employee.models import LeaveManagement
+from core.apps.scheduling.models import Scheduling
+
+User = get_user_model()
+
+
+def kpi_metrics(day):
+    approved_leave = LeaveManagement.objects.filter(user=OuterRef('pk'), date=day, approved=True)
+    assignments = Scheduling.user.through.objects.filter(
+        customuser=OuterRef('pk'),
+        scheduling__date=day,
+    ).values('customuser').annotate(count=Count('id')).values('count')
+    return [
+        CountMetric('headcount'),
+        CountMetric('absent', filter=Q(Exists(approved_leave))),
+        SumMetric('total_salary', 'salary'),
+        SumMetric(
+            'total_payroll',
+            ExpressionWrapper(
+                (F('salary') / F('no_of_shifts')) * F('current_shifts_count'),
+                output_field=FloatField()
+            ),
+            filter=Q(no_of_shifts__gt=0),
+        ),
+        SumMetric('shift_assignments', Subquery(assignments, output_field=IntegerField())),
+    ]
+
+
+def compute_kpis(company_id, day):
+    """Compute the KPI row for one company and day from the source tables in a single query."""
+    employees = User.objects.filter(
+        company_id=company_id,
+        is_manager=False,
+        date_joined__date__lte=day,
+    )
+    totals = aggregate_metrics(employees, kpi_metrics(day))
+    return {
+        'headcount': totals['headcount'],
+        'present': max(totals['headcount'] - totals['absent'], 0),
+        'absent': totals['absent'],
+        'total_salary': totals['total_salary'],
+        'total_payroll': totals['total_payroll'],
+        'shift_assignments': totals['shift_assignments'],
+    }
+
+
+def refresh_rollup(company_id, day, create=True):
+    """Recompute a single rollup row. Returns the row, or None if it does not exist and create is False."""
+    values = compute_kpis(company_id, day)
+    if create:
+        rollup, _ = DailyKPIRollup.objects.update_or_create(company_id=company_id, date=day, defaults=values)
+        return rollup
+    if DailyKPIRollup.objects.filter(company_id=company_id, date=day).update(**values):
+        return DailyKPIRollup.objects.get(company_id=company_id, date=day)
+    return None
+
+
+def get_rollup(company_id, day=None):
+    """Read the rollup row for a company and day, building it on first access."""
+    day = day or timezone.localdate()
+    rollup = DailyKPIRollup.objects.filter(company_id=company_id, date=day).first()
+    if rollup is None:
+        rollup = refresh_rollup(company_id, day)
+    return rollup
+
+
+def mark_dirty(company_id, day=None):
+    """
+    Recompute a (company, day) rollup once the current transaction commits.
+    Today's row is created if missing; rows for other days are only
+    refreshed if they already exist.
+    """
+    if not company_id:
+        return
+    day = day or timezone.localdate()
+    transaction.on_commit(lambda: refresh_rollup(company_id, day, create=day == timezone.localdate()))
+
+
+def check_rollups(queryset):
+    """Yield (rollup, field, stored, expected) for every field that has drifted from the source tables."""
+    for rollup in queryset:
+        expected = compute_kpis(rollup.company_id, rollup.date)
+        for field, value in expected.items():
+            stored = getattr(rollup, field)
+            if isinstance(value, float) or isinstance(stored, float):
+                drifted = abs((stored or 0) - (value or 0)) > 0.01
+            else:
+                drifted = stored != value
+            if drifted:
+                yield rollup, field, stored, value
@@ -1,11 +1,13 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
-from accounts.utils import extract_first_last_name
+from accounts.utils import extract_first_last_name, OnboardingTokenGenerator
 from django.contrib.auth.password_validation import validate_password
 from accounts.models import UserRoles
-from core.email_templates import employee_add_template
+from core.email_templates import employee_add_email
 from django.conf import settings
-from core.utils import EmailThread
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+from core.outbox import enqueue_messages
 
 User = get_user_model()
 
@@ -16,6 +18,8 @@ class EmployeeSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ['id', 'full_name', 'email', 'password', 'phone_number', 'department', 'position', 'gender', 'salary', 'no_of_shifts', 'current_shifts_count']
+        # Maintained from completed shifts, see core.apps.scheduling.completion.
+        read_only_fields = ['current_shifts_count']
 
     def create(self, validated_data):
         first_name, last_name = extract_first_last_name(validated_data['full_name'])
@@ -37,24 +41,28 @@ class EmployeeSerializer(serializers.ModelSerializer):
             company=company,
             is_manager=False,
             salary=validated_data['salary'],
-            no_of_shifts=validated_data['no_of_shifts']
+            no_of_shifts=validated_data['no_of_shifts'],
+            current_shifts_count=0
         )
         self.send_email_to_user(employee)
         return employee
     
     def send_email_to_user(self, user):
-        subject = f'Welcome to {settings.SITE_NAME}'
-        message = employee_add_template.format(
+        # The password itself is never mailed: the message is stored in the
+        # outbox, so it carries a set-password link instead.
+        token = OnboardingTokenGenerator().make_token(user)
+        uidb64 = urlsafe_base64_encode(force_bytes(user.pk))
+        message = employee_add_email.message(
+            user.email,
             full_name=user.full_name,
             company_name=user.company.name if user.company else 'BitNBuild',
             email = user.email,
             salary = user.salary,
-            password = self.validated_data['password'],
+            set_password_url=f'{settings.FRONTEND_URL}/reset-password/{uidb64}/{token}',
+            link_valid_hours=settings.ONBOARDING_LINK_TIMEOUT // 3600,
             site_name=settings.SITE_NAME
         )
-        recipient_list = [user.email]
-        email_thread = EmailThread(subject, message, recipient_list)
-        email_thread.start()
+        enqueue_messages([message])
 
 class DashBoardSerializer(serializers.Serializer):
     number_of_employees = serializers.IntegerField()
@@ -0,0 +1,175 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_init, pre_save, post_save, post_delete, pre_delete, m2m_changed
+from django.dispatch import receiver
+from core.apps.employee.models import LeaveManagement, WellnessCheck
+from core.apps.employee.wellness import forget_check
+from core.apps.scheduling.models import Scheduling
+from core.apps.scheduling.completion import adjust_users, adjust_for_shifts, set_completed
+from core.rollups import mark_dirty
+from core.cache import bump_data_version
+
+User = get_user_model()
+
+# Fields of each model that feed the daily KPI rollup and the cached
+# dashboards. A snapshot is taken when an instance is loaded so saves that do
+# not touch them (e.g. last_login on every sign in) don't trigger a refresh.
+USER_KPI_FIELDS = ('company_id', 'is_manager', 'salary', 'no_of_shifts', 'current_shifts_count', 'date_joined')
+USER_DASHBOARD_FIELDS = USER_KPI_FIELDS + ('first_name', 'last_name', 'department', 'position', 'gender')
+LEAVE_KPI_FIELDS = ('user_id', 'date', 'approved')
+
+
+def _snapshot(instance, fields):
+    # Read through __dict__ so deferred fields are not fetched one by one.
+    return tuple(instance.__dict__.get(field) for field in fields)
+
+
+def _company_ids(user_ids):
+    return set(
+        User.objects.filter(id__in=user_ids, company__isnull=False).values_list('company_id', flat=True)
+    )
+
+
+def _changed(company_id, day=None):
+    # Refresh the rollup before bumping the version so a reader that sees the
+    # new version can't cache the old rollup under it.
+    mark_dirty(company_id, day)
+    bump_data_version(company_id)
+
+
+@receiver(post_init, sender=User)
+def snapshot_user(sender, instance, **kwargs):
+    instance._kpi_snapshot = _snapshot(instance, USER_DASHBOARD_FIELDS)
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, **kwargs):
+    current = _snapshot(instance, USER_DASHBOARD_FIELDS)
+    previous = instance._kpi_snapshot
+    kpi_fields = len(USER_KPI_FIELDS)
+    if created or current[:kpi_fields] != previous[:kpi_fields]:
+        _changed(instance.company_id)
+        if previous[0] != instance.company_id:
+            _changed(previous[0])
+    elif current != previous:
+        bump_data_version(instance.company_id)
+    instance._kpi_snapshot = current
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    _changed(instance.company_id)
+
+
+@receiver(post_init, sender=LeaveManagement)
+def snapshot_leave(sender, instance, **kwargs):
+    instance._kpi_snapshot = _snapshot(instance, LEAVE_KPI_FIELDS)
+
+
+@receiver(post_save, sender=LeaveManagement)
+def leave_saved(sender, instance, created, **kwargs):
+    current = _snapshot(instance, LEAVE_KPI_FIELDS)
+    previous = instance._kpi_snapshot
+    if current != previous and (instance.approved or previous[2]):
+        user_ids = {user_id for user_id in (instance.user_id, previous[0]) if user_id}
+        for company_id in _company_ids(user_ids):
+            if previous[1] and previous[1] != instance.date:
+                mark_dirty(company_id, previous[1])
+            _changed(company_id, instance.date)
+    instance._kpi_snapshot = current
+
+
+@receiver(post_delete, sender=LeaveManagement)
+def leave_deleted(sender, instance, **kwargs):
+    if instance.approved and instance.user_id:
+        for company_id in _company_ids([instance.user_id]):
+            _changed(company_id, instance.date)
+
+
+@receiver(post_init, sender=Scheduling)
+def snapshot_scheduling(sender, instance, **kwargs):
+    instance._kpi_date = instance.__dict__.get('date')
+    instance._was_completed = instance.__dict__.get('is_completed')
+
+
+@receiver(pre_save, sender=Scheduling)
+def scheduling_completing(sender, instance, update_fields=None, **kwargs):
+    # The in-memory snapshot can't tell two concurrent saves of the same
+    # transition apart, so the flag and the counters go through
+    # set_completed, which locks the row and skips it once it is already
+    # in that state: only one of the saves counts the shift.
+    if instance._state.adding or instance._was_completed is None or instance.is_completed == instance._was_completed:
+        return
+    if update_fields is None or 'is_completed' in update_fields:
+        set_completed(Scheduling.objects.filter(pk=instance.pk), instance.is_completed)
+
+
+@receiver(post_save, sender=Scheduling)
+def scheduling_saved(sender, instance, created, **kwargs):
+    if not created:
+        date_changed = instance.date != instance._kpi_date
+        for company_id in _company_ids(instance.user.values_list('id', flat=True)):
+            if date_changed:
+                mark_dirty(company_id, instance._kpi_date)
+                mark_dirty(company_id, instance.date)
+            bump_data_version(company_id)
+    instance._kpi_date = instance.date
+    instance._was_completed = instance.is_completed
+
+
+@receiver(pre_delete, sender=Scheduling)
+def scheduling_deleting(sender, instance, **kwargs):
+    # The through rows are gone by post_delete, so resolve companies up front.
+    for company_id in _company_ids(instance.user.values_list('id', flat=True)):
+        _changed(company_id, instance.date)
+    if instance.is_completed:
+        adjust_for_shifts([instance.pk], -1)
+
+
+@receiver(m2m_changed, sender=Scheduling.user.through)
+def scheduling_users_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if reverse:
+        # user.scheduling_set.add(...): instance is the user, pk_set are shifts.
+        if action == 'pre_clear':
+            dates = instance.scheduling_set.values_list('date', flat=True)
+        else:
+            dates = Scheduling.objects.filter(id__in=pk_set).values_list('date', flat=True)
+        for day in set(dates):
+            mark_dirty(instance.company_id, day)
+        bump_data_version(instance.company_id)
+        return
+    user_ids = instance.user.values_list('id', flat=True) if action == 'pre_clear' else pk_set
+    for company_id in _company_ids(user_ids):
+        _changed(company_id, instance.date)
+
+
+@receiver(m2m_changed, sender=Scheduling.user.through)
+def completed_assignees_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    # Assignees added to or removed from a completed shift gain or lose it
+    # from their shift counter.
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    sign = 1 if action == 'post_add' else -1
+    if reverse:
+        shifts = instance.scheduling_set.all() if action == 'pre_clear' else Scheduling.objects.filter(id__in=pk_set)
+        adjust_users([instance.pk], sign * shifts.filter(is_completed=True).count())
+    elif instance.is_completed:
+        if action == 'pre_clear':
+            adjust_for_shifts([instance.pk], -1)
+        else:
+            adjust_users(pk_set, sign)
+
+
+@receiver(post_save, sender=WellnessCheck)
+def wellness_changed(sender, instance, **kwargs):
+    for company_id in _company_ids([instance.user_id]):
+        bump_data_version(company_id)
+
+
+@receiver(post_delete, sender=WellnessCheck)
+def wellness_deleted(sender, instance, **kwargs):
+    # Deletes come from the admin and user cascades too, not only a view,
+    # so the summary is corrected here, before the version is bumped.
+    forget_check(instance)
+    wellness_changed(sender, instance)
@@ -0,0 +1,31 @@
+from django.test import TestCase
+from django.utils import timezone
+from core.apps.employee.burnout import score_company
+from core.apps.employee.models import BurnoutRiskScore, WellnessCheck
+from core.benchmarks import seed_company
+
+
+def stale_score(user_id):
+    return BurnoutRiskScore(user_id=user_id, score=95, level='high', computed_at=timezone.now())
+
+
+class ScoreCompanyTests(TestCase):
+    def setUp(self):
+        self.company, _, self.staff_ids = seed_company(3, name='Burnout Co')
+
+    def test_drops_scores_of_employees_without_recent_checks(self):
+        checked, unchecked = self.staff_ids[0], self.staff_ids[1]
+        _, _, other_ids = seed_company(1, name='Other Co')
+        BurnoutRiskScore.objects.bulk_create([stale_score(unchecked), stale_score(other_ids[0])])
+        WellnessCheck.objects.create(user_id=checked, mood=2, stress_level=4, work_life_balance=2)
+
+        self.assertEqual(score_company(self.company.pk), 1)
+
+        self.assertCountEqual(BurnoutRiskScore.objects.values_list('user_id', flat=True), [checked, other_ids[0]])
+
+    def test_company_without_checks_keeps_no_scores(self):
+        BurnoutRiskScore.objects.bulk_create([stale_score(self.staff_ids[0])])
+
+        self.assertEqual(score_company(self.company.pk), 0)
+
+        self.assertFalse(BurnoutRiskScore.objects.filter(user__company=self.company).exists())
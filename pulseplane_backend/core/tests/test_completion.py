@@ -0,0 +1,76 @@
+from io import StringIO
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from django.utils import timezone
+from core.apps.scheduling.models import Scheduling
+from core.apps.scheduling.views import SchedulingCompleteView
+from core.benchmarks import seed_company, run_view
+
+User = get_user_model()
+
+
+class ShiftCounterTests(TestCase):
+    def setUp(self):
+        company, self.manager, self.staff_ids = seed_company(3, name='Counter Co')
+        User.objects.filter(company=company).update(current_shifts_count=0)
+        self.day = timezone.localdate()
+
+    def shift(self, user_ids, start_time='06:00', end_time='14:00'):
+        shift = Scheduling.objects.create(date=self.day, shift_type='MORNING', start_time=start_time, end_time=end_time)
+        shift.user.set(user_ids)
+        return shift
+
+    def counts(self):
+        return list(User.objects.filter(id__in=self.staff_ids).order_by('id').values_list('current_shifts_count', flat=True))
+
+    def complete(self, **data):
+        response, _, _ = run_view(SchedulingCompleteView.as_view(), self.manager, method='post', data=data)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_completing_a_day_counts_each_assignment_once(self):
+        self.shift(self.staff_ids[:2])
+        self.shift(self.staff_ids[1:], '14:00', '22:00')
+
+        self.assertEqual(self.complete(date=str(self.day)).data['updated'], 2)
+        self.assertEqual(self.counts(), [1, 2, 1])
+
+        # Repeating the request changes nothing; reopening takes it back.
+        self.assertEqual(self.complete(date=str(self.day)).data['updated'], 0)
+        self.assertEqual(self.counts(), [1, 2, 1])
+        self.complete(date=str(self.day), completed=False)
+        self.assertEqual(self.counts(), [0, 0, 0])
+
+    def test_concurrent_saves_of_one_completion_count_it_once(self):
+        shift = self.shift(self.staff_ids[:1])
+        first, second = Scheduling.objects.get(pk=shift.pk), Scheduling.objects.get(pk=shift.pk)
+
+        first.is_completed = second.is_completed = True
+        first.save()
+        second.save()
+
+        self.assertEqual(self.counts(), [1, 0, 0])
+
+    def test_assignee_changes_and_deletes_follow_completed_shifts(self):
+        shift = self.shift(self.staff_ids[:1])
+        shift.is_completed = True
+        shift.save()
+
+        shift.user.add(self.staff_ids[1])
+        self.assertEqual(self.counts(), [1, 1, 0])
+        shift.user.remove(self.staff_ids[0])
+        self.assertEqual(self.counts(), [0, 1, 0])
+        shift.delete()
+        self.assertEqual(self.counts(), [0, 0, 0])
+
+    def test_reconcile_reports_and_fixes_drift(self):
+        shift = self.shift(self.staff_ids[:1])
+        self.complete(ids=[shift.pk])
+        User.objects.filter(id=self.staff_ids[1]).update(current_shifts_count=5)
+
+        with self.assertRaises(CommandError):
+            call_command('reconcile_shift_counts', stdout=StringIO())
+        call_command('reconcile_shift_counts', fix=True, stdout=StringIO())
+
+        self.assertEqual(self.counts(), [1, 0, 0])
@@ -0,0 +1,129 @@
+from datetime import timedelta
+from unittest import mock
+from django.utils import timezone
+from django.test import TestCase
+from core.apps.scheduling.models import RecurringShift, RecurringShiftException, Scheduling
+from core.apps.scheduling.views import (
+    RecurringShiftListCreateView, RecurringShiftRetrieveUpdateDestroyView, SchedulingListCreateView,
+    SchedulingRetrieveUpdateDestroyView,
+)
+from core.benchmarks import seed_company, run_view
+
+
+class ShiftConflictTests(TestCase):
+    def setUp(self):
+        _, self.manager, self.staff_ids = seed_company(2, name='Conflict Co')
+        self.day = timezone.localdate() + timedelta(days=3)
+
+    def create(self, start_time, end_time, user_ids):
+        response, _, _ = run_view(SchedulingListCreateView.as_view(), self.manager, method='post', data={
+            'date': str(self.day), 'shift_type': 'MORNING', 'start_time': start_time, 'end_time': end_time,
+            'user': user_ids,
+        })
+        return response
+
+    def test_overlapping_create_is_rejected(self):
+        booked = self.create('06:00', '14:00', [self.staff_ids[0]])
+        self.assertEqual(booked.status_code, 201)
+
+        response = self.create('13:00', '18:00', [self.staff_ids[0]])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn(f'existing shift {booked.data["id"]}', str(response.data['user']))
+        self.assertEqual(Scheduling.objects.count(), 1)
+
+    def test_assignees_are_locked_for_the_check(self):
+        with mock.patch('core.apps.scheduling.serializers.lock_assignees') as lock:
+            self.create('06:00', '14:00', self.staff_ids)
+
+        lock.assert_called_once_with(self.staff_ids)
+
+    def test_back_to_back_shifts_are_allowed(self):
+        self.create('06:00', '14:00', [self.staff_ids[0]])
+
+        self.assertEqual(self.create('14:00', '22:00', [self.staff_ids[0]]).status_code, 201)
+
+    def test_update_adding_a_booked_assignee_is_rejected(self):
+        self.create('06:00', '14:00', [self.staff_ids[0]])
+        other = self.create('10:00', '18:00', [self.staff_ids[1]])
+
+        response, _, _ = run_view(
+            SchedulingRetrieveUpdateDestroyView.as_view(), self.manager, method='patch',
+            data={'user': self.staff_ids}, pk=other.data['id'],
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(list(Scheduling.objects.get(pk=other.data['id']).user.values_list('id', flat=True)), [self.staff_ids[1]])
+
+    def test_update_of_the_shift_itself_is_not_a_conflict(self):
+        shift = self.create('06:00', '14:00', [self.staff_ids[0]])
+
+        response, _, _ = run_view(
+            SchedulingRetrieveUpdateDestroyView.as_view(), self.manager, method='patch',
+            data={'end_time': '15:00'}, pk=shift.data['id'],
+        )
+
+        self.assertEqual(response.status_code, 200)
+
+
+class RecurringShiftConflictTests(TestCase):
+    def setUp(self):
+        _, self.manager, self.staff_ids = seed_company(2, name='Recurring Conflict Co')
+        self.day = timezone.localdate() + timedelta(days=3)
+        response, _, _ = run_view(SchedulingListCreateView.as_view(), self.manager, method='post', data={
+            'date': str(self.day), 'shift_type': 'MORNING', 'start_time': '06:00', 'end_time': '14:00',
+            'user': [self.staff_ids[0]],
+        })
+        self.booked = response.data['id']
+
+    def create(self, user_ids, **fields):
+        data = {
+            'start_time': '07:00', 'end_time': '15:00', 'weekdays': [self.day.weekday()],
+            'start_date': str(timezone.localdate()), 'user': user_ids, **fields,
+        }
+        response, _, _ = run_view(RecurringShiftListCreateView.as_view(), self.manager, method='post', data=data)
+        return response
+
+    def update(self, pk, data):
+        response, _, _ = run_view(RecurringShiftRetrieveUpdateDestroyView.as_view(), self.manager, method='patch', data=data, pk=pk)
+        return response
+
+    def test_template_over_a_booked_shift_is_rejected(self):
+        response = self.create([self.staff_ids[0]])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn(f'{self.day}: ', str(response.data['user']))
+        self.assertIn(f'existing shift {self.booked}', str(response.data['user']))
+        self.assertFalse(RecurringShift.objects.exists())
+
+    def test_template_for_someone_else_is_allowed(self):
+        self.assertEqual(self.create([self.staff_ids[1]]).status_code, 201)
+
+    def test_shift_over_a_template_occurrence_is_rejected(self):
+        self.create([self.staff_ids[1]])
+
+        response, _, _ = run_view(SchedulingListCreateView.as_view(), self.manager, method='post', data={
+            'date': str(self.day), 'shift_type': 'EVENING', 'start_time': '12:00', 'end_time': '20:00',
+            'user': [self.staff_ids[1]],
+        })
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_update_moving_the_rule_onto_a_booking_is_rejected(self):
+        template = self.create([self.staff_ids[0]], start_time='15:00', end_time='20:00')
+        self.assertEqual(template.status_code, 201)
+
+        self.assertEqual(self.update(template.data['id'], {'start_time': '13:00'}).status_code, 400)
+        self.assertEqual(self.update(template.data['id'], {'priority': 'HIGH'}).status_code, 200)
+
+    def test_cancelled_occurrences_are_not_conflicts(self):
+        template = self.create([self.staff_ids[0]], start_time='15:00', end_time='20:00')
+        RecurringShiftException.objects.create(template_id=template.data['id'], date=self.day)
+
+        self.assertEqual(self.update(template.data['id'], {'start_time': '13:00'}).status_code, 200)
+
+    def test_assignees_are_locked_for_the_check(self):
+        with mock.patch('core.apps.scheduling.serializers.lock_assignees') as lock:
+            self.create([self.staff_ids[1]])
+
+        lock.assert_called_once_with([self.staff_ids[1]])
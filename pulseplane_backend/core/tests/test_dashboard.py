@@ -0,0 +1,32 @@
+from django.test import TestCase, override_settings
+from rest_framework.test import APIRequestFactory, force_authenticate
+from core.benchmarks import seed_company
+from core.views import DashboardView, DashboardView2, DashboardGraphData
+
+
+# The response cache would answer the second request without any query.
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}})
+class DashboardQueryCountTests(TestCase):
+    def setUp(self):
+        company, self.manager, staff_ids = seed_company(20, name='Dashboard Co')
+        self.employee = company.customuser_set.get(id=staff_ids[0])
+
+    def get(self, view, user):
+        request = APIRequestFactory().get('/')
+        force_authenticate(request, user=user)
+        return view.as_view()(request)
+
+    def assert_warm_queries(self, view, user, count):
+        # The first request builds today's rollup row; later ones only read it.
+        self.assertEqual(self.get(view, user).status_code, 200)
+        with self.assertNumQueries(count):
+            self.assertEqual(self.get(view, user).status_code, 200)
+
+    def test_manager_dashboard_is_one_query(self):
+        self.assert_warm_queries(DashboardView, self.manager, 1)
+
+    def test_employee_dashboard_is_one_query(self):
+        self.assert_warm_queries(DashboardView2, self.employee, 1)
+
+    def test_graph_data_is_one_query(self):
+        self.assert_warm_queries(DashboardGraphData, self.manager, 1)
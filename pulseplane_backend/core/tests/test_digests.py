@@ -0,0 +1,65 @@
+from datetime import timedelta
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from core.benchmarks import seed_company
+from core.digests import coalesce, flush_digests
+from core.models import NotificationEvent, OutboxEmail
+
+Kind = NotificationEvent.Kind
+
+
+class DigestTests(TestCase):
+    def setUp(self):
+        _, _, (self.user_id, self.other_id) = seed_company(2, name='Digest Co')
+        self.start = timezone.now() - timedelta(minutes=10)
+
+    def events(self, *changes, user_id=None):
+        """Save (kind, key) changes a second apart, oldest first."""
+        return NotificationEvent.objects.bulk_create([
+            NotificationEvent(
+                user_id=user_id or self.user_id, kind=kind, key=key, summary=f'{kind} {key}',
+                created_at=self.start + timedelta(seconds=i),
+            )
+            for i, (kind, key) in enumerate(changes)
+        ])
+
+    def test_added_then_removed_cancels_out(self):
+        events = self.events((Kind.SHIFT_ADDED, 'scheduling:1'), (Kind.SHIFT_REMOVED, 'scheduling:1'))
+
+        self.assertEqual(coalesce(events), [])
+
+    def test_removed_then_added_back_cancels_out(self):
+        events = self.events((Kind.SHIFT_REMOVED, 'scheduling:1'), (Kind.SHIFT_ADDED, 'scheduling:1'))
+
+        self.assertEqual(coalesce(events), [])
+
+    def test_only_the_latest_change_to_an_item_is_kept(self):
+        events = self.events(
+            (Kind.LEAVE_APPROVED, 'leave:1'),
+            (Kind.SHIFT_ADDED, 'scheduling:2'),
+            (Kind.LEAVE_DECLINED, 'leave:1'),
+            (Kind.SHIFT_ADDED, 'scheduling:3'),
+        )
+
+        self.assertEqual(coalesce(events), [events[1], events[2], events[3]])
+
+    def test_added_removed_and_added_again_is_reported_once(self):
+        events = self.events(
+            (Kind.SHIFT_ADDED, 'scheduling:1'), (Kind.SHIFT_REMOVED, 'scheduling:1'), (Kind.SHIFT_ADDED, 'scheduling:1'),
+        )
+
+        self.assertEqual(coalesce(events), [events[2]])
+
+    @override_settings(NOTIFICATION_DIGEST_WINDOW=300)
+    def test_flush_sends_one_digest_per_due_user(self):
+        self.events((Kind.SHIFT_ADDED, 'scheduling:1'), (Kind.SHIFT_ADDED, 'scheduling:2'), (Kind.LEAVE_APPROVED, 'leave:1'))
+        # Still inside the window: left for a later flush.
+        NotificationEvent.objects.create(user_id=self.other_id, kind=Kind.SHIFT_ADDED, key='scheduling:1', summary='new')
+
+        self.assertEqual(flush_digests(), 1)
+
+        digest = OutboxEmail.objects.get()
+        self.assertIn('3 schedule updates', digest.subject)
+        self.assertIn('Shifts added:', digest.body)
+        self.assertIn('Leave approved:', digest.body)
+        self.assertEqual(list(NotificationEvent.objects.values_list('user_id', flat=True)), [self.other_id])
@@ -0,0 +1,43 @@
+from django.core.mail import BadHeaderError, EmailMessage
+from django.test import SimpleTestCase, TestCase, override_settings
+from core.email_executor import EmailExecutor
+from core.models import OutboxEmail
+from core.outbox import OutboxWorker, enqueue
+
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+class EmailExecutorTests(SimpleTestCase):
+    def setUp(self):
+        self.executor = EmailExecutor(workers=1, queue_size=10)
+        self.addCleanup(self.executor.shutdown, 1)
+
+    def test_message_that_cannot_be_built_is_a_failed_send(self):
+        # A newline in the subject makes message() raise BadHeaderError.
+        self.executor.submit('bad', EmailMessage('Bad\nsubject', 'body', 'from@example.com', ['to@example.com']))
+        self.executor.submit('good', EmailMessage('Subject', 'body', 'from@example.com', ['to@example.com']))
+
+        self.assertTrue(self.executor.wait(5))
+        results = dict(self.executor.finished())
+        self.assertIsInstance(results['bad'], BadHeaderError)
+        self.assertIsNone(results['good'])
+        stats = self.executor.stats()
+        self.assertEqual((stats['sent'], stats['failed'], stats['in_flight']), (1, 1, 0))
+        self.assertTrue(all(thread.is_alive() for thread in self.executor.threads))
+
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+class OutboxWorkerTests(TestCase):
+    def test_row_that_cannot_be_built_is_retried(self):
+        row = enqueue('Bad\nsubject', 'body', ['to@example.com'])
+        executor = EmailExecutor(workers=1, queue_size=10)
+        self.addCleanup(executor.shutdown, 1)
+        worker = OutboxWorker(max_attempts=3, executor=executor)
+
+        self.assertEqual(worker.run_batch(), 1)
+        self.assertTrue(worker.wait(5))
+
+        row.refresh_from_db()
+        self.assertEqual(row.status, OutboxEmail.Status.PENDING)
+        self.assertEqual(row.attempts, 1)
+        self.assertIn('BadHeaderError', row.last_error)
+        self.assertEqual(worker.retried, 1)
@@ -0,0 +1,51 @@
+import datetime
+from django.test import TestCase
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from core.apps.employee.models import LeaveManagement
+from core.pagination import KeysetPagination
+
+
+class LeaveListView:
+    keyset_ordering = ('-date', '-id')
+
+
+class KeysetPaginationTests(TestCase):
+    def paginate(self, params):
+        paginator = KeysetPagination()
+        request = Request(APIRequestFactory().get('/', params))
+        rows = paginator.paginate_queryset(LeaveManagement.objects.all(), request, LeaveListView())
+        return paginator, rows
+
+    def test_cursor_bounds_the_leading_column(self):
+        paginator = KeysetPagination()
+        queryset = LeaveManagement.objects.all()
+        fields = paginator._fields(queryset, LeaveListView.keyset_ordering)
+        sql = str(queryset.filter(paginator._after(fields, ['2026-01-05', 42])).query)
+
+        # ANDed next to the OR of the per-column branches, so the index
+        # scan can start at the cursor.
+        self.assertIn('AND "employee_leavemanagement"."date" <= 2026-01-05', sql)
+
+    def test_pages_cover_every_row_once(self):
+        start = datetime.date(2026, 1, 1)
+        LeaveManagement.objects.bulk_create([
+            LeaveManagement(date=start + datetime.timedelta(days=i // 3)) for i in range(10)
+        ])
+        expected = list(LeaveManagement.objects.order_by('-date', '-id').values_list('id', flat=True))
+
+        seen, params = [], {'page_size': 4}
+        while True:
+            paginator, rows = self.paginate(params)
+            seen += [row.pk for row in rows]
+            if not paginator.next_cursor:
+                break
+            params = {'page_size': 4, 'cursor': paginator.next_cursor}
+        self.assertEqual(seen, expected)
+
+    def test_cursor_with_values_of_the_wrong_type_is_not_found(self):
+        paginator = KeysetPagination()
+        for values in (['garbage', 1], [{'date': 1}, 1], ['2026-01-05', 'x']):
+            with self.subTest(values=values), self.assertRaises(NotFound):
+                self.paginate({'cursor': paginator.encode_cursor(values)})
@@ -0,0 +1,101 @@
+from datetime import timedelta
+from django.contrib.auth import get_user_model
+from django.db.models import Count, Sum, F, Q, FloatField, DateField, ExpressionWrapper
+from django.db.models.functions import Trunc, Cast
+from core.apps.employee.models import LeaveManagement
+from core.apps.scheduling.models import Scheduling
+
+User = get_user_model()
+
+BUCKETS = ('day', 'week', 'month')
+# Longest series a request can ask for, in buckets of its kind: two years of
+# daily buckets, both ends and a leap day included.
+MAX_BUCKETS = 732
+
+
+def bucket_start(day, bucket):
+    """Python equivalent of the database's date truncation for a bucket kind."""
+    if bucket == 'week':
+        return day - timedelta(days=day.weekday())
+    if bucket == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def bucket_count(start_date, end_date, bucket):
+    """How many buckets bucket_range yields for the range, without building them."""
+    first, last = bucket_start(start_date, bucket), bucket_start(end_date, bucket)
+    if bucket == 'month':
+        return (last.year - first.year) * 12 + last.month - first.month + 1
+    return (last - first).days // (7 if bucket == 'week' else 1) + 1
+
+
+def bucket_range(start_date, end_date, bucket):
+    current = bucket_start(start_date, bucket)
+    while current <= end_date:
+        yield current
+        if bucket == 'month':
+            current = (current.replace(day=28) + timedelta(days=4)).replace(day=1)
+        elif bucket == 'week':
+            current += timedelta(days=7)
+        else:
+            current += timedelta(days=1)
+
+
+def _grouped(queryset, field, bucket, **aggregates):
+    rows = queryset.annotate(
+        bucket=Trunc(field, bucket, output_field=DateField())
+    ).values('bucket').annotate(**aggregates).order_by('bucket')
+    return {row['bucket']: row for row in rows}
+
+
+def company_time_series(company_id, start_date, end_date, bucket='day'):
+    """
+    Headcount, approved leaves, shifts worked and accrued payroll for a
+    company, bucketed by day/week/month. Each metric family is one grouped
+    query regardless of the length of the range.
+    """
+    employees = User.objects.filter(company_id=company_id, is_manager=False)
+    joined = _grouped(
+        employees.filter(date_joined__date__lte=end_date),
+        'date_joined', bucket, count=Count('id'),
+    )
+    leaves = _grouped(
+        LeaveManagement.objects.filter(
+            user__company_id=company_id,
+            user__is_manager=False,
+            approved=True,
+            date__range=(start_date, end_date),
+        ),
+        'date', bucket, count=Count('id'),
+    )
+    shifts = _grouped(
+        Scheduling.user.through.objects.filter(
+            customuser__company_id=company_id,
+            scheduling__is_completed=True,
+            scheduling__date__range=(start_date, end_date),
+        ),
+        'scheduling__date', bucket,
+        count=Count('id'),
+        payroll=Sum(
+            ExpressionWrapper(
+                Cast('customuser__salary', FloatField()) / F('customuser__no_of_shifts'),
+                output_field=FloatField()
+            ),
+            filter=Q(customuser__no_of_shifts__gt=0),
+        ),
+    )
+
+    buckets = list(bucket_range(start_date, end_date, bucket))
+    first = buckets[0] if buckets else None
+    headcount = sum(row['count'] for key, row in joined.items() if first is None or key < first)
+    series = {'buckets': [], 'headcount': [], 'approved_leaves': [], 'shifts_worked': [], 'payroll': []}
+    for key in buckets:
+        headcount += joined.get(key, {}).get('count', 0)
+        shift_row = shifts.get(key, {})
+        series['buckets'].append(key.isoformat())
+        series['headcount'].append(headcount)
+        series['approved_leaves'].append(leaves.get(key, {}).get('count', 0))
+        series['shifts_worked'].append(shift_row.get('count', 0))
+        series['payroll'].append(round(shift_row.get('payroll') or 0, 2))
+    return series
@@ -4,19 +4,31 @@ from django.contrib.auth import get_user_model
 from rest_framework.response import Response
 from rest_framework import status
 from datetime import datetime, timedelta
+from django.utils import timezone
 from django.utils.timezone import make_aware
 from core.apps.scheduling.models import Scheduling
 from core.apps.employee.models import LeaveManagement, Feedback
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
-from django.db.models import Count, Sum, F, FloatField, ExpressionWrapper, Avg
+from django.db.models import Q
+from core.aggregation import aggregate_metrics, grouped_metrics, CountMetric, AvgMetric
+from core.rollups import get_rollup
+from core.cache import cached_response
+from core.timeseries import company_time_series, bucket_count, BUCKETS, MAX_BUCKETS
 
 
 User = get_user_model()
 
+def _as_date(value):
+    return value.date() if isinstance(value, datetime) else value
+
+def _nulls_last(item):
+    return (item[0] is None, item[0] or '')
+
 class EmployeeListCreateView(generics.ListCreateAPIView):
     queryset = User.objects.filter(is_manager=False)
     serializer_class = EmployeeSerializer
+    keyset_ordering = ('id',)
 
     def get_serializer_context(self):
         context = super().get_serializer_context()
@@ -27,54 +39,29 @@ class EmployeeRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
     queryset = User.objects.filter(is_manager=False)
     serializer_class = EmployeeSerializer
 
-    def perform_update(self, serializer):
-        cr = self.request.data.get('current_shifts_count', 0)
-        if cr:
-            data = serializer.save(current_shifts_count=cr)
-        else:
-            data = serializer.save()
-        data.save()
-        return data
-        
 
 class DashboardView(generics.GenericAPIView):
     permissions = [permissions.IsAuthenticated,]
     serializer_class = DashBoardSerializer
 
     def get_dashboard_data(self, user, start_date, end_date):
-        today = datetime.now().date()
-        number_of_employees = User.objects.filter(company=user.company, is_manager=False).count()
-        leaves = LeaveManagement.objects.filter(date = today, approved=True).count()
-        number_of_present_employees = number_of_employees - leaves
-        number_of_absent_employees = leaves
-        new_hiring_applications = 0
-        total_salary = User.objects.filter(
-            company=user.company,
-            is_manager=False,
-            salary__isnull=False
-        ).aggregate(total_salary=Sum('salary'))['total_salary']
-        total_payroll = User.objects.filter(
-            company=user.company,
-            is_manager=False,
-            salary__isnull=False,
-            no_of_shifts__isnull=False,
-            current_shifts_count__isnull=False
-        ).aggregate(
-            total_payroll=Sum(
-                ExpressionWrapper(
-                    (F('salary') / F('no_of_shifts')) * F('current_shifts_count'),
-                    output_field=FloatField()
-                )
-            )
-        )['total_payroll']
-
+        rollup = get_rollup(user.company_id) if user.company_id else None
+        if rollup is None:
+            return {
+                'number_of_employees': 0,
+                'number_of_present_employees': 0,
+                'number_of_absent_employees': 0,
+                'new_hiring_applications': 0,
+                'total_salary': 0,
+                'total_payroll': 0
+            }
         return {
-            'number_of_employees': number_of_employees,
-            'number_of_present_employees': number_of_present_employees,
-            'number_of_absent_employees': number_of_absent_employees,
-            'new_hiring_applications': new_hiring_applications,
-            'total_salary': total_salary,
-            'total_payroll': total_payroll
+            'number_of_employees': rollup.headcount,
+            'number_of_present_employees': rollup.present,
+            'number_of_absent_employees': rollup.absent,
+            'new_hiring_applications': 0,
+            'total_salary': rollup.total_salary,
+            'total_payroll': rollup.total_payroll
         }
 
     @swagger_auto_schema(
@@ -106,7 +93,10 @@ class DashboardView(generics.GenericAPIView):
         if isinstance(start_date, str):
             start_date = make_aware(datetime.strptime(start_date, '%Y-%m-%d'))
         try:
-            dashboard_data = self.get_dashboard_data(user, start_date, end_date)
+            dashboard_data = cached_response(
+                'dashboard', user.company_id, {'date': timezone.localdate()},
+                lambda: self.get_dashboard_data(user, start_date, end_date)
+            )
             serialized_data = self.serializer_class(data=dashboard_data)
             if serialized_data.is_valid():
                 return Response(serialized_data.data, status=status.HTTP_200_OK)
@@ -119,12 +109,24 @@ class DashboardView2(generics.GenericAPIView):
     serializer_class = DashBoardSerializer2
 
     def get_dashboard_data(self, user, start_date, end_date):
-        leaves = LeaveManagement.objects.filter(approved=True, user=user).count()
+        # Leaves and feedback are both LEFT JOINed onto the single user row.
+        # The join repeats every feedback row once per leave row, which leaves
+        # the average unchanged, and leaves are counted distinct.
+        totals = aggregate_metrics(User.objects.filter(pk=user.pk), [
+            CountMetric(
+                'days_absent',
+                'leavemanagement',
+                distinct=True,
+                filter=Q(
+                    leavemanagement__approved=True,
+                    leavemanagement__date__range=(_as_date(start_date), _as_date(end_date))
+                )
+            ),
+            AvgMetric('feedback_avg', 'feedback__feedback', default=0),
+        ])
+        leaves = totals['days_absent']
+        average_feedback = totals['feedback_avg']
         employee = user
-        average_feedback = Feedback.objects.filter(user=user).aggregate(Avg('feedback'))['feedback__avg']
-
-        if average_feedback is None:
-            average_feedback = 0
 
         return {
             'total_working_shifts': employee.current_shifts_count,
@@ -176,24 +178,20 @@ class DashboardGraphData(generics.GenericAPIView):
     serializer_class = DashBoardGraphSerializer
 
     def get_dashboard_data(self, user, start_date, end_date):
-        emp_data_by_position = User.objects.filter(
-            company=user.company, 
-            is_manager=False,
-        ).values('position').annotate(count=Count('id')).order_by('position')
-        response_data = [
-            {'position': item['position'], 'count': item['count']} for item in emp_data_by_position
-        ]
-        return response_data
-    
-    def get_dashboard_data2(self, user, start_date, end_date):
-        emp_by_gender = User.objects.filter(
-            company=user.company,
-            is_manager=False,
-        ).values('gender').annotate(count=Count('id')).order_by('gender')
-        response_data = [
-            {'gender': item['gender'], 'count': item['count']} for item in emp_by_gender
-        ]
-        return response_data
+        rows = grouped_metrics(
+            User.objects.filter(company=user.company, is_manager=False),
+            ('position', 'gender'),
+            [CountMetric('count')]
+        )
+        by_position = {}
+        by_gender = {}
+        for row in rows:
+            by_position[row['position']] = by_position.get(row['position'], 0) + row['count']
+            by_gender[row['gender']] = by_gender.get(row['gender'], 0) + row['count']
+        return {
+            'chart1': [{'position': key, 'count': value} for key, value in sorted(by_position.items(), key=_nulls_last)],
+            'chart2': [{'gender': key, 'count': value} for key, value in sorted(by_gender.items(), key=_nulls_last)],
+        }
 
     @swagger_auto_schema(
         manual_parameters=[
@@ -225,16 +223,73 @@ class DashboardGraphData(generics.GenericAPIView):
         if isinstance(start_date, str):
             start_date = make_aware(datetime.strptime(start_date, '%Y-%m-%d'))
         try:
-            dashboard_data = self.get_dashboard_data(user, start_date, end_date)
-            dashboard_data2 = self.get_dashboard_data2(user, start_date, end_date)
-            new_data = {
-                'chart1': dashboard_data,
-                'chart2': dashboard_data2,
-            }
+            new_data = cached_response(
+                'dashboard-graph', user.company_id, {},
+                lambda: self.get_dashboard_data(user, start_date, end_date)
+            )
             serialized_data = self.serializer_class(data=new_data)
             if serialized_data.is_valid():
                 return Response(serialized_data.data, status=status.HTTP_200_OK)
             else:
                 return Response(serialized_data.errors, status=status.HTTP_400_BAD_REQUEST)
         except Exception:
-            return Response({'error': 'Invalid date format'}, status=status.HTTP_400_BAD_REQUEST)
\ No newline at end of file
+            return Response({'error': 'Invalid date format'}, status=status.HTTP_400_BAD_REQUEST)
+
+
+class DashboardTimeSeriesView(generics.GenericAPIView):
+    permissions = [permissions.IsAuthenticated,]
+
+    @swagger_auto_schema(
+        manual_parameters=[
+            openapi.Parameter(
+                'start_date', 
+                openapi.IN_QUERY, 
+                description="Start date for filtering (YYYY-MM-DD)", 
+                type=openapi.TYPE_STRING, 
+                format='date', 
+                default=(datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d')
+            ),
+            openapi.Parameter(
+                'end_date', 
+                openapi.IN_QUERY, 
+                description="End date for filtering (YYYY-MM-DD)", 
+                type=openapi.TYPE_STRING, 
+                format='date', 
+                default=datetime.now().strftime('%Y-%m-%d')
+            ),
+            openapi.Parameter(
+                'bucket', 
+                openapi.IN_QUERY, 
+                description="Bucket size: day, week or month", 
+                type=openapi.TYPE_STRING, 
+                enum=list(BUCKETS),
+                default='day'
+            ),
+        ]
+    )
+    def get(self, request):
+        user = request.user
+        bucket = request.query_params.get('bucket', 'day')
+        if bucket not in BUCKETS:
+            return Response({'error': f"bucket must be one of {', '.join(BUCKETS)}"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            end_date = datetime.strptime(request.query_params['end_date'], '%Y-%m-%d').date() if 'end_date' in request.query_params else datetime.now().date()
+            start_date = datetime.strptime(request.query_params['start_date'], '%Y-%m-%d').date() if 'start_date' in request.query_params else end_date - timedelta(days=30)
+        except ValueError:
+            return Response({'error': 'Invalid date format'}, status=status.HTTP_400_BAD_REQUEST)
+        if start_date > end_date:
+            return Response({'error': 'start_date must be before end_date'}, status=status.HTTP_400_BAD_REQUEST)
+        if bucket_count(start_date, end_date, bucket) > MAX_BUCKETS:
+            return Response(
+                {'error': f'The range can span at most {MAX_BUCKETS} {bucket} buckets'}, status=status.HTTP_400_BAD_REQUEST
+            )
+        series = cached_response(
+            'dashboard-time-series', user.company_id, {'start_date': start_date, 'end_date': end_date, 'bucket': bucket},
+            lambda: company_time_series(user.company_id, start_date, end_date, bucket)
+        )
+        return Response({
+            'start_date': start_date,
+            'end_date': end_date,
+            'bucket': bucket,
+            **series
+        }, status=status.HTTP_200_OK)
@@ -33,6 +33,7 @@ INSTALLED_APPS = [
 
     # Local apps
     'accounts',
+    'core',
     'core.apps.scheduling',
     'core.apps.employee',
 ]
@@ -91,13 +92,36 @@ SITE_VERSION = 'v1'
 FRONTEND_URL = config('FRONTEND_URL')
 
 PASSWORD_RESET_TIMEOUT = 600
+# Seconds the set-password link in the onboarding email stays valid. The email
+# goes through the outbox, so this must outlast its retries (see OUTBOX_*).
+ONBOARDING_LINK_TIMEOUT = config('ONBOARDING_LINK_TIMEOUT', default=72 * 3600, cast=int)
 
 # Cache
-CACHES = {
-    'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+# Shared by every gunicorn worker: Redis when REDIS_URL is set, otherwise a
+# file based cache on local disk.
+REDIS_URL = config('REDIS_URL', default='')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': config('CACHE_DIR', default=os.path.join(BASE_DIR, 'cache')),
+        }
     }
-}
+
+# Where pending OTPs are kept, see accounts.otp: 'cache' needs Redis for atomic
+# attempt counting, 'table' uses a small PendingOTP table.
+OTP_STORE = config('OTP_STORE', default='cache' if REDIS_URL else 'table')
+
+# Seconds a dashboard/analytics response may be served from cache. Entries are
+# also invalidated as soon as the company's data changes.
+DASHBOARD_CACHE_TIMEOUT = config('DASHBOARD_CACHE_TIMEOUT', default=300, cast=int)
 
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
@@ -146,8 +170,14 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    # Opt-in per request with ?page_size= or ?cursor=; see core/pagination.py.
+    'DEFAULT_PAGINATION_CLASS': 'core.pagination.KeysetPagination',
+    'PAGE_SIZE': config('PAGE_SIZE', default=50, cast=int),
 }
 
+# Upper bound on ?page_size= for paginated list endpoints.
+MAX_PAGE_SIZE = config('MAX_PAGE_SIZE', default=200, cast=int)
+
 # Simple JWT
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=30),
@@ -192,6 +222,21 @@ EMAIL_PORT = config('EMAIL_PORT', cast=int)
 EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD')
 DEFAULT_FROM_EMAIL = EMAIL_FROM_EMAIL
 
+# Outgoing mail is queued in core.models.OutboxEmail and sent by `manage.py send_outbox`.
+OUTBOX_BATCH_SIZE = config('OUTBOX_BATCH_SIZE', default=100, cast=int)
+OUTBOX_MAX_ATTEMPTS = config('OUTBOX_MAX_ATTEMPTS', default=8, cast=int)
+# Retries wait OUTBOX_RETRY_DELAY seconds, doubling per attempt up to OUTBOX_MAX_RETRY_DELAY.
+OUTBOX_RETRY_DELAY = config('OUTBOX_RETRY_DELAY', default=30, cast=int)
+OUTBOX_MAX_RETRY_DELAY = config('OUTBOX_MAX_RETRY_DELAY', default=3600, cast=int)
+OUTBOX_POLL_INTERVAL = config('OUTBOX_POLL_INTERVAL', default=2, cast=float)
+# Sender threads (one SMTP connection each) and the bounded queue in front of them, see core.email_executor.
+OUTBOX_SENDER_THREADS = config('OUTBOX_SENDER_THREADS', default=1, cast=int)
+OUTBOX_QUEUE_SIZE = config('OUTBOX_QUEUE_SIZE', default=200, cast=int)
+# 'block' makes the worker wait for room; 'reject' hands overflow back to the outbox for another worker.
+OUTBOX_QUEUE_OVERFLOW = config('OUTBOX_QUEUE_OVERFLOW', default='block')
+# Seconds to buffer schedule/leave notifications per user and mail them as one digest (0 sends each change right away).
+NOTIFICATION_DIGEST_WINDOW = config('NOTIFICATION_DIGEST_WINDOW', default=0, cast=int)
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 